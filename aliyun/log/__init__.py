@@ -1,6 +1,10 @@
 
+import six
+
 from .logclient import LogClient
 from .logexception import LogException
+from .retry_policy import RetryPolicy
+from .json_backend import set_json_backend, get_json_backend
 from .gethistogramsrequest import GetHistogramsRequest
 from .getlogsrequest import GetLogsRequest, GetProjectLogsRequest
 from .index_config import IndexConfig, IndexKeyConfig, IndexLineConfig
@@ -59,3 +63,6 @@ from .object_response import PutObjectResponse, GetObjectResponse
 from .store_view import StoreView, StoreViewStore
 from .store_view_response import CreateStoreViewResponse, UpdateStoreViewResponse, DeleteStoreViewResponse, ListStoreViewsResponse, GetStoreViewResponse
 from .submit_async_sql_request import SubmitAsyncSqlRequest
+
+if six.PY3:
+    from .async_logclient import AsyncLogClient
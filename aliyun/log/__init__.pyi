@@ -1,5 +1,8 @@
 from .logclient import LogClient as LogClient
+from .async_logclient import AsyncLogClient as AsyncLogClient
 from .logexception import LogException as LogException
+from .retry_policy import RetryPolicy as RetryPolicy
+from .json_backend import set_json_backend as set_json_backend, get_json_backend as get_json_backend
 from .gethistogramsrequest import GetHistogramsRequest as GetHistogramsRequest
 from .getlogsrequest import GetLogsRequest as GetLogsRequest, GetProjectLogsRequest as GetProjectLogsRequest
 from .index_config import IndexConfig as IndexConfig, IndexKeyConfig as IndexKeyConfig, IndexLineConfig as IndexLineConfig
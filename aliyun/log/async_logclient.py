@@ -0,0 +1,486 @@
+# -*- encoding: utf-8 -*-
+"""
+AsyncLogClient mirrors the data plane APIs of LogClient (put/pull/query logs, cursors and
+consumer group calls) on top of asyncio, so that thousands of requests can be in flight
+from one event loop without holding a thread each.
+
+It shares signing, compression and response parsing with LogClient, only the I/O is different.
+It requires Python 3 and the aiohttp library (pip install aiohttp).
+
+:Author: Aliyun
+"""
+
+import asyncio
+import logging
+
+try:
+    import aiohttp
+    aiohttp_available = True
+except ImportError:
+    aiohttp_available = False
+
+from .auth import AUTH_VERSION_1
+from .consumer_group_request import ConsumerGroupGetCheckPointRequest, ConsumerGroupHeartBeatRequest, \
+    ConsumerGroupUpdateCheckPointRequest
+from .consumer_group_response import ConsumerGroupCheckPointResponse, ConsumerGroupHeartBeatResponse, \
+    ConsumerGroupUpdateCheckPointResponse
+from .cursor_response import GetCursorResponse
+from .logclient import LogClient, DEFAULT_QUERY_RETRY_COUNT, DEFAULT_QUERY_RETRY_INTERVAL, MAX_GET_LOG_PAGING_SIZE
+from .logexception import LogException
+from .putlogsresponse import PutLogsResponse
+from .shard_response import ListShardResponse
+from .util import parse_timestamp, is_stats_query
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 100
+
+
+class AsyncLogClient(object):
+    """ Construct the AsyncLogClient with endpoint, accessKeyId, accessKey.
+    All the API methods are coroutines, call `close` (or use `async with`) to release the connections.
+
+    :type endpoint: string
+    :param endpoint: log service host name, for example, ch-hangzhou.log.aliyuncs.com or https://cn-beijing.log.aliyuncs.com
+
+    :type accessKeyId: string
+    :param accessKeyId: aliyun accessKeyId
+
+    :type accessKey: string
+    :param accessKey: aliyun accessKey
+
+    :type max_connections: int
+    :param max_connections: max number of connections kept by the pool, by default is 100
+
+    :type max_connections_per_host: int
+    :param max_connections_per_host: max number of connections to one project host, 0 means no limitation
+    """
+
+    def __init__(self, endpoint, accessKeyId=None, accessKey=None, securityToken=None, source=None,
+                 auth_version=AUTH_VERSION_1, region='', credentials_provider=None,
+                 max_connections=DEFAULT_MAX_CONNECTIONS, max_connections_per_host=0):
+        if not aiohttp_available:
+            raise LogException('MissingDependency', 'AsyncLogClient requires aiohttp, install it via "pip install aiohttp"')
+
+        # request building, signing and response parsing are delegated to a LogClient
+        self._client = LogClient(endpoint, accessKeyId, accessKey, securityToken=securityToken, source=source,
+                                 auth_version=auth_version, region=region,
+                                 credentials_provider=credentials_provider)
+        self._max_connections = max_connections
+        self._max_connections_per_host = max_connections_per_host
+        self._session = None
+
+    @property
+    def timeout(self):
+        return self._client.timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        self._client.timeout = value
+
+    def set_user_agent(self, user_agent):
+        """
+        set user agent
+
+        :type user_agent: string
+        :param user_agent: user agent
+
+        :return: None
+
+        """
+        self._client.set_user_agent(user_agent)
+
+    def set_source(self, source):
+        """
+        Set the source of the log client
+
+        :type source: string
+        :param source: new source
+
+        :return: None
+        """
+        self._client.set_source(source)
+
+    def set_credentials_auto_refresher(self, refresher):
+        self._client.set_credentials_auto_refresher(refresher)
+
+    def set_retry_policy(self, retry_policy):
+        """
+        set the policy deciding if and when a failed request is retried
+
+        :type retry_policy: RetryPolicy
+        :param retry_policy: the retry policy
+
+        :return: None
+        """
+        self._client.set_retry_policy(retry_policy)
+
+    def get_retry_stats(self):
+        """
+        get the counters of the retries of the client
+
+        :return: dict, see RetryPolicy.get_stats
+        """
+        return self._client.get_retry_stats()
+
+    def set_compression(self, compress_type=None, level=None):
+        """
+        set the compression of put_log_raw and put_logs, see LogClient.set_compression
+
+        :type compress_type: string
+        :param compress_type: lz4 (default) or zstd
+
+        :type level: int
+        :param level: compression level of compress_type, default is the one of the codec
+
+        :return: None
+        """
+        self._client.set_compression(compress_type, level)
+
+    def set_sign_payload(self, sign_payload):
+        """
+        set if the request body is covered by the signature, see LogClient.set_sign_payload
+
+        :type sign_payload: bool
+        :param sign_payload: sign the request body or not
+
+        :return: None
+        """
+        self._client.set_sign_payload(sign_payload)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """ close the connection pool of the client
+
+        :return: None
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._max_connections,
+                                             limit_per_host=self._max_connections_per_host)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    @staticmethod
+    def _to_query_params(params):
+        # aiohttp only accepts str/int/float values, keep the same text as requests does
+        if not params:
+            return None
+        return dict((k, v if isinstance(v, str) else str(v)) for k, v in params.items())
+
+    async def _getHttpResponse(self, method, url, params, body, headers):
+        headers['User-Agent'] = self._client._user_agent
+        timeout = aiohttp.ClientTimeout(total=self._client.timeout)
+        try:
+            async with self._get_session().request(method, url, params=self._to_query_params(params), data=body,
+                                                   headers=headers, timeout=timeout) as r:
+                content = await r.read()
+                return r.status, content, r.headers
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            raise
+        except Exception as ex:
+            raise LogException('LogRequestError', str(ex))
+
+    async def _send(self, method, project, body, resource, params, headers, respons_body_type='json',
+                    compute_content_hash=True):
+        client = self._client
+        url = client._prepare_request(project, body, resource, headers)
+        content_hash = client._get_content_hash(body, compute_content_hash)
+
+        retry_policy = client._retry_policy
+        last_err = None
+        for attempt in client._get_retry_times():
+            try:
+                headers2, params2 = client._sign_request(method, resource, params, headers, body,
+                                                         compute_content_hash=compute_content_hash,
+                                                         content_hash=content_hash)
+                (resp_status, resp_body, resp_header) = await self._getHttpResponse(method, url, params2, body,
+                                                                                    headers2)
+                result = client._handle_response(resp_status, resp_body, resp_header, respons_body_type)
+                retry_policy.on_success()
+                return result
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as ex:
+                last_err = LogException('LogRequestError', repr(ex))
+                delay = client._get_retry_delay(last_err, attempt, retryable=True)
+                if delay is None:
+                    raise last_err
+                await asyncio.sleep(delay)
+                continue
+            except LogException as ex:
+                last_err = ex
+                delay = client._get_retry_delay(ex, attempt)
+                if delay is not None:
+                    await asyncio.sleep(delay)
+                    continue
+                elif client._need_refresh_credentials(ex):
+                    # refreshing may wait and call user code, keep it out of the event loop
+                    await asyncio.get_running_loop().run_in_executor(None, client._replace_credentials)
+                    continue
+                raise
+
+        raise last_err
+
+    async def put_log_raw(self, project, logstore, log_group, compress=None):
+        """ Put logs to log service. using raw data in protobuf
+
+        :type project: string
+        :param project: the Project name
+
+        :type logstore: string
+        :param logstore: the logstore name
+
+        :type log_group: LogGroup
+        :param log_group: log group structure, or the serialized LogGroup bytes to send as they are
+
+        :type compress: boolean
+        :param compress: compress or not, by default is True
+
+        :return: PutLogsResponse
+
+        :raise: LogException
+        """
+        (resource, params, headers, body) = self._client._build_put_log_raw_request(logstore, log_group, compress)
+        (resp, header) = await self._send('POST', project, body, resource, params, headers)
+        return PutLogsResponse(header, resp)
+
+    async def put_logs(self, request):
+        """ Put logs to log service. up to 512000 logs up to 10MB size
+        Unsuccessful operation will cause an LogException.
+
+        :type request: PutLogsRequest
+        :param request: the PutLogs request parameters class
+
+        :return: PutLogsResponse
+
+        :raise: LogException
+        """
+        (resource, params, headers, body) = self._client._build_put_logs_request(request)
+        (resp, header) = await self._send('POST', request.get_project(), body, resource, params, headers)
+        return PutLogsResponse(header, resp)
+
+    async def get_log(self, project, logstore, from_time, to_time, topic=None,
+                      query=None, reverse=False, offset=0, size=100, power_sql=False, scan=False, forward=True,
+                      accurate_query=True, from_time_nano_part=0, to_time_nano_part=0):
+        """ Get logs from log service, refer to LogClient.get_log for the parameters.
+        will retry DEFAULT_QUERY_RETRY_COUNT when incomplete.
+        Unsuccessful operation will cause an LogException.
+
+        :return: GetLogsResponse
+
+        :raise: LogException
+        """
+        size, offset = int(size), int(offset)
+        if not is_stats_query(query) and (size == -1 or size > MAX_GET_LOG_PAGING_SIZE):
+            return await self._query_more(offset, size, MAX_GET_LOG_PAGING_SIZE,
+                                          project=project, logstore=logstore, from_time=from_time,
+                                          to_time=to_time, topic=topic, query=query, reverse=reverse,
+                                          accurate_query=accurate_query, from_time_nano_part=from_time_nano_part,
+                                          to_time_nano_part=to_time_nano_part)
+
+        ret = None
+        for _c in range(DEFAULT_QUERY_RETRY_COUNT):
+            (method, body_str, resource, params, headers, respons_body_type) = self._client._build_get_log_request(
+                logstore, from_time, to_time, topic=topic, query=query, reverse=reverse, offset=offset, size=size,
+                power_sql=power_sql, scan=scan, forward=forward, accurate_query=accurate_query,
+                from_time_nano_part=from_time_nano_part, to_time_nano_part=to_time_nano_part)
+            (resp, header) = await self._send(method, project, body_str, resource, params, headers,
+                                              respons_body_type=respons_body_type)
+            ret = self._client._to_get_logs_response(resp, header)
+            if ret.is_completed():
+                break
+
+            await asyncio.sleep(DEFAULT_QUERY_RETRY_INTERVAL)
+
+        return ret
+
+    async def _query_more(self, offset, size, batch_size, **kwargs):
+        if size < 0:
+            expected_total_size = None
+        else:
+            expected_total_size = size
+            batch_size = min(size, batch_size)
+
+        response = None
+        total_count_got = 0
+        while True:
+            ret = await self.get_log(offset=offset, size=batch_size, **kwargs)
+            if response is None:
+                response = ret
+            else:
+                response.merge(ret)
+
+            # if incompete, exit
+            if not ret.is_completed():
+                break
+
+            count = ret.get_count()
+            offset += count
+            total_count_got += count
+            if expected_total_size is not None:
+                batch_size = min(batch_size, expected_total_size - total_count_got)
+                if total_count_got >= expected_total_size:
+                    break
+            if count == 0:
+                break
+
+        return response
+
+    async def get_logs(self, request):
+        """ Get logs from log service.
+        will retry DEFAULT_QUERY_RETRY_COUNT when incomplete.
+        Unsuccessful operation will cause an LogException.
+
+        :type request: GetLogsRequest
+        :param request: the GetLogs request parameters class.
+
+        :return: GetLogsResponse
+
+        :raise: LogException
+        """
+        return await self.get_log(request.get_project(), request.get_logstore(), request.get_from(),
+                                  request.get_to(), request.get_topic(), request.get_query(),
+                                  request.get_reverse(), request.get_offset(), request.get_line(),
+                                  request.get_power_sql(), request.get_scan(), request.get_forward(),
+                                  request.get_accurate_query(), request.get_from_time_nano_part(),
+                                  request.get_to_time_nano_part())
+
+    async def get_cursor(self, project_name, logstore_name, shard_id, start_time):
+        """ Get cursor from log service for batch pull logs
+        Unsuccessful operation will cause an LogException.
+
+        :type project_name: string
+        :param project_name: the Project name
+
+        :type logstore_name: string
+        :param logstore_name: the logstore name
+
+        :type shard_id: int
+        :param shard_id: the shard id
+
+        :type start_time: string/int
+        :param start_time: the start time of cursor, e.g 1441093445 or "begin"/"end", or readable time like "%Y-%m-%d %H:%M:%S<time_zone>"
+
+        :return: GetCursorResponse
+
+        :raise: LogException
+        """
+        headers = {'Content-Type': 'application/json'}
+        params = {'type': 'cursor',
+                  'from': str(start_time) if start_time in ("begin", "end") else parse_timestamp(start_time)}
+
+        resource = "/logstores/" + logstore_name + "/shards/" + str(shard_id)
+        (resp, header) = await self._send("GET", project_name, None, resource, params, headers)
+        return GetCursorResponse(resp, header)
+
+    async def get_begin_cursor(self, project_name, logstore_name, shard_id):
+        """ Get begin cursor from log service for batch pull logs
+
+        :return: GetCursorResponse
+
+        :raise: LogException
+        """
+        return await self.get_cursor(project_name, logstore_name, shard_id, "begin")
+
+    async def get_end_cursor(self, project_name, logstore_name, shard_id):
+        """ Get end cursor from log service for batch pull logs
+
+        :return: GetCursorResponse
+
+        :raise: LogException
+        """
+        return await self.get_cursor(project_name, logstore_name, shard_id, "end")
+
+    async def pull_logs(self, project_name, logstore_name, shard_id, cursor, count=None, end_cursor=None,
+                        compress=None, query=None, accept_compress_type=None, processor=None):
+        """ batch pull log data from log service, refer to LogClient.pull_logs for the parameters.
+        Unsuccessful operation will cause an LogException.
+
+        :return: PullLogResponse
+
+        :raise: LogException
+        """
+        (resource, params, headers) = self._client._build_pull_logs_request(
+            logstore_name, shard_id, cursor, count=count, end_cursor=end_cursor, compress=compress, query=query,
+            accept_compress_type=accept_compress_type, processor=processor)
+        (resp, header) = await self._send("GET", project_name, None, resource, params, headers, "binary")
+        return self._client._to_pull_log_response(resp, header)
+
+    async def list_shards(self, project_name, logstore_name):
+        """ list the shard meta of a logstore
+        Unsuccessful operation will cause an LogException.
+
+        :type project_name: string
+        :param project_name: the Project name
+
+        :type logstore_name: string
+        :param logstore_name: the logstore name
+
+        :return: ListShardResponse
+
+        :raise: LogException
+        """
+        resource = "/logstores/" + logstore_name + "/shards"
+        (resp, header) = await self._send("GET", project_name, None, resource, {}, {})
+        return ListShardResponse(resp, header)
+
+    async def heart_beat(self, project, logstore, consumer_group, consumer, shards=None):
+        """ Heatbeat consumer group
+
+        :type shards: int list
+        :param shards: shard id list e.g. [0,1,2]
+
+        :return: ConsumerGroupHeartBeatResponse
+        """
+        if shards is None:
+            shards = []
+        request = ConsumerGroupHeartBeatRequest(project, logstore, consumer_group, consumer, shards)
+        body_str = request.get_request_body()
+        params = request.get_params()
+        headers = {"Content-Type": "application/json"}
+        resource = "/logstores/" + logstore + "/consumergroups/" + consumer_group
+        (resp, header) = await self._send('POST', project, body_str, resource, params, headers)
+        return ConsumerGroupHeartBeatResponse(resp, header)
+
+    async def update_check_point(self, project, logstore, consumer_group, shard, check_point,
+                                 consumer='', force_success=True):
+        """ Update check point
+
+        :type shard: int
+        :param shard: shard id
+
+        :type check_point: string
+        :param check_point: checkpoint name
+
+        :return: ConsumerGroupUpdateCheckPointResponse
+        """
+        request = ConsumerGroupUpdateCheckPointRequest(project, logstore, consumer_group,
+                                                       consumer, shard, check_point, force_success)
+        params = request.get_request_params()
+        body_str = request.get_request_body()
+        headers = {"Content-Type": "application/json"}
+        resource = "/logstores/" + logstore + "/consumergroups/" + consumer_group
+        (resp, header) = await self._send("POST", project, body_str, resource, params, headers)
+        return ConsumerGroupUpdateCheckPointResponse(header, resp)
+
+    async def get_check_point(self, project, logstore, consumer_group, shard=-1):
+        """ Get check point
+
+        :type shard: int
+        :param shard: shard id, -1 means all shards
+
+        :return: ConsumerGroupCheckPointResponse
+        """
+        request = ConsumerGroupGetCheckPointRequest(project, logstore, consumer_group, shard)
+        params = request.get_params()
+        resource = "/logstores/" + logstore + "/consumergroups/" + consumer_group
+        (resp, header) = await self._send("GET", project, None, resource, params, {})
+        return ConsumerGroupCheckPointResponse(resp, header)
@@ -0,0 +1,45 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .consumer_group_response import ConsumerGroupCheckPointResponse, ConsumerGroupHeartBeatResponse, ConsumerGroupUpdateCheckPointResponse
+from .credentials import CredentialsProvider
+from .cursor_response import GetCursorResponse
+from .getlogsrequest import GetLogsRequest
+from .getlogsresponse import GetLogsResponse
+from .proto import LogGroupRaw as LogGroup
+from .pulllog_response import PullLogResponse
+from .putlogsrequest import PutLogsRequest
+from .putlogsresponse import PutLogsResponse
+from .retry_policy import RetryPolicy
+from .shard_response import ListShardResponse
+
+aiohttp_available: bool
+DEFAULT_MAX_CONNECTIONS: int
+
+class AsyncLogClient(object):
+    def __init__(self, endpoint: str, accessKeyId: Optional[str] = ..., accessKey: Optional[str] = ..., securityToken: Optional[str] = ..., source: Optional[str] = ..., auth_version: str = ..., region: str = ..., credentials_provider: Optional[CredentialsProvider] = ..., max_connections: int = ..., max_connections_per_host: int = ...) -> None: ...
+    @property
+    def timeout(self) -> int: ...
+    @timeout.setter
+    def timeout(self, value: int) -> None: ...
+    def set_user_agent(self, user_agent: str) -> None: ...
+    def set_source(self, source: str) -> None: ...
+    def set_credentials_auto_refresher(self, refresher: Callable[[], Tuple[str, str, Optional[str]]]) -> None: ...
+    def set_retry_policy(self, retry_policy: RetryPolicy) -> None: ...
+    def get_retry_stats(self) -> Dict[str, Any]: ...
+    def set_compression(self, compress_type: Optional[str] = ..., level: Optional[int] = ...) -> None: ...
+    def set_sign_payload(self, sign_payload: bool) -> None: ...
+    async def __aenter__(self) -> AsyncLogClient: ...
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None: ...
+    async def close(self) -> None: ...
+    async def put_log_raw(self, project: str, logstore: str, log_group: Union[LogGroup, bytes], compress: Optional[bool] = ...) -> PutLogsResponse: ...
+    async def put_logs(self, request: PutLogsRequest) -> PutLogsResponse: ...
+    async def get_log(self, project: str, logstore: str, from_time: Union[int, str], to_time: Union[int, str], topic: Optional[str] = ..., query: Optional[str] = ..., reverse: bool = ..., offset: int = ..., size: int = ..., power_sql: bool = ..., scan: bool = ..., forward: bool = ..., accurate_query: bool = ..., from_time_nano_part: int = ..., to_time_nano_part: int = ...) -> GetLogsResponse: ...
+    async def get_logs(self, request: GetLogsRequest) -> GetLogsResponse: ...
+    async def get_cursor(self, project_name: str, logstore_name: str, shard_id: int, start_time: Union[int, str]) -> GetCursorResponse: ...
+    async def get_begin_cursor(self, project_name: str, logstore_name: str, shard_id: int) -> GetCursorResponse: ...
+    async def get_end_cursor(self, project_name: str, logstore_name: str, shard_id: int) -> GetCursorResponse: ...
+    async def pull_logs(self, project_name: str, logstore_name: str, shard_id: int, cursor: str, count: Optional[int] = ..., end_cursor: Optional[str] = ..., compress: Optional[bool] = ..., query: Optional[str] = ..., accept_compress_type: Optional[str] = ..., processor: Optional[str] = ...) -> PullLogResponse: ...
+    async def list_shards(self, project_name: str, logstore_name: str) -> ListShardResponse: ...
+    async def heart_beat(self, project: str, logstore: str, consumer_group: str, consumer: str, shards: Optional[List[int]] = ...) -> ConsumerGroupHeartBeatResponse: ...
+    async def update_check_point(self, project: str, logstore: str, consumer_group: str, shard: int, check_point: str, consumer: str = ..., force_success: bool = ...) -> ConsumerGroupUpdateCheckPointResponse: ...
+    async def get_check_point(self, project: str, logstore: str, consumer_group: str, shard: int = ...) -> ConsumerGroupCheckPointResponse: ...
@@ -4,7 +4,7 @@
 # Copyright (C) Alibaba Cloud Computing
 # All rights reserved.
 
-import locale
+import time
 from hashlib import sha256
 
 from .util import *
@@ -31,6 +31,37 @@ elif is_py3:
 AUTH_VERSION_1 = 'v1'
 AUTH_VERSION_4 = 'v4'
 
+_WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+# (second, formatted date) of V1 and V4, replaced as a whole so it's safe to share between threads
+_gmt_cache = (None, None)
+_v4_time_cache = (None, None)
+
+# header name => lower case name if it's signed by V4, otherwise None
+_MAX_SIGN_HEADER_CACHE_SIZE = 1024
+_sign_header_cache = {}
+
+
+def _format_gmt(timestamp):
+    """ RFC 1123 date, e.g. "Mon, 08 Aug 2022 03:23:30 GMT", not affected by the locale like strftime """
+    t = time.gmtime(timestamp)
+    return '%s, %02d %s %04d %02d:%02d:%02d GMT' % (_WEEKDAYS[t.tm_wday], t.tm_mday, _MONTHS[t.tm_mon - 1],
+                                                   t.tm_year, t.tm_hour, t.tm_min, t.tm_sec)
+
+
+def _get_v4_sign_header(key):
+    try:
+        return _sign_header_cache[key]
+    except KeyError:
+        pass
+    lower_key = key.lower()
+    if not (lower_key == 'content-type' or lower_key == 'host' or Util._is_extra_sign_header(lower_key)):
+        lower_key = None
+    if len(_sign_header_cache) < _MAX_SIGN_HEADER_CACHE_SIZE:
+        _sign_header_cache[key] = lower_key
+    return lower_key
+
 
 def make_auth(credentials_provider, auth_version=AUTH_VERSION_1, region=''):
     if auth_version == AUTH_VERSION_4:
@@ -46,6 +77,12 @@ class AuthBase(object):
     def sign_request(self, method, resource, params, headers, body):
         pass
 
+    def get_content_hash(self, body):
+        """ digest of the body used by sign_request, compute it once and pass it as content_hash to sign the
+        same body again, e.g. when retrying
+        """
+        return None
+
 
 class AuthV1(AuthBase):
 
@@ -54,13 +91,18 @@ class AuthV1(AuthBase):
 
     @staticmethod
     def _getGMT():
-        try:
-            locale.setlocale(locale.LC_TIME, "C")
-        except Exception as ex:
-            logger.warning("failed to set locale time to C. skip it: {0}".format(ex))
-        return datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S GMT')
-
-    def sign_request(self, method, resource, params, headers, body, compute_content_hash=True):
+        global _gmt_cache
+        now = int(time.time())
+        second, gmt = _gmt_cache
+        if second != now:
+            gmt = _format_gmt(now)
+            _gmt_cache = (now, gmt)
+        return gmt
+
+    def get_content_hash(self, body):
+        return Util.cal_md5(body)
+
+    def sign_request(self, method, resource, params, headers, body, compute_content_hash=True, content_hash=None):
         credentials = self.credentials_provider.get_credentials()
         if credentials.get_security_token():
             headers['x-acs-security-token'] = credentials.get_security_token()
@@ -71,7 +113,7 @@ class AuthV1(AuthBase):
         content_md5 = None
         # we don't need content-md5 in signature if compute_content_hash is False
         if body and compute_content_hash:
-            content_md5 = Util.cal_md5(body)
+            content_md5 = content_hash if content_hash is not None else self.get_content_hash(body)
             headers['Content-MD5'] = content_md5
 
         if not credentials.get_access_key_secret():
@@ -97,20 +139,32 @@ class AuthV4(AuthBase):
     def __init__(self, credentials_provider, region):
         AuthBase.__init__(self, credentials_provider)
         self._region = region
-
-    def sign_request(self, method, resource, params, headers, body, compute_content_hash=True):
-        current_time = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-        headers['Authorization'] = self._do_sign_request(method, resource, params, headers, body, current_time, compute_content_hash=compute_content_hash)
-
-    def _do_sign_request(self, method, resource, params, headers, body, current_time, compute_content_hash=True):
+        # (secret, region, date, sign key), the derived key only changes by day
+        self._sign_key_cache = None
+
+    def get_content_hash(self, body):
+        return sha256(body).hexdigest()
+
+    def sign_request(self, method, resource, params, headers, body, compute_content_hash=True, content_hash=None):
+        global _v4_time_cache
+        now = int(time.time())
+        second, current_time = _v4_time_cache
+        if second != now:
+            current_time = time.strftime('%Y%m%dT%H%M%SZ', time.gmtime(now))
+            _v4_time_cache = (now, current_time)
+        headers['Authorization'] = self._do_sign_request(method, resource, params, headers, body, current_time, compute_content_hash=compute_content_hash,
+                                                         content_hash=content_hash)
+
+    def _do_sign_request(self, method, resource, params, headers, body, current_time, compute_content_hash=True,
+                         content_hash=None):
         credentials = self.credentials_provider.get_credentials()
 
         if credentials.get_security_token():
             headers['x-acs-security-token'] = credentials.get_security_token()
 
         content_sha256 = _EMPTY_CONTENT_SHA256
-        if compute_content_hash and body: 
-            content_sha256 = sha256(body).hexdigest()
+        if compute_content_hash and body:
+            content_sha256 = content_hash if content_hash is not None else self.get_content_hash(body)
 
         headers['x-log-content-sha256'] = content_sha256
         headers['x-log-date'] = current_time
@@ -118,12 +172,8 @@ class AuthV4(AuthBase):
         canonical_headers = {}
         signed_headers = ''
         for original_key, value in headers.items():
-            key = original_key.lower()
-            if (
-                key == "content-type"
-                or key == "host"
-                or Util._is_extra_sign_header(key)
-            ):
+            key = _get_v4_sign_header(original_key)
+            if key is not None:
                 canonical_headers[key] = value
         headers_to_string = ''
         for key, value in sorted(canonical_headers.items()):
@@ -139,8 +189,8 @@ class AuthV4(AuthBase):
                          + current_time + '\n' \
                          + scope + '\n' \
                          + sha256(canonical_request.encode('utf-8')).hexdigest()
-        signature = self.build_sign_key(credentials.get_access_key_secret(),
-                                        self._region, current_date, string_to_sign)
+        sign_key = self._get_sign_key(credentials.get_access_key_secret(), self._region, current_date)
+        signature = hmac.new(sign_key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
         return 'SLS4-HMAC-SHA256 Credential=%s/%s,Signature=%s' % (credentials.get_access_key_id(), scope, signature)
 
     @staticmethod
@@ -174,11 +224,23 @@ class AuthV4(AuthBase):
             data = u'{0}'.format(raw_text).encode('utf-8')
         return urlquote(data, safe='~')
 
+    def _get_sign_key(self, key, region, date):
+        cached = self._sign_key_cache
+        if cached is not None and cached[0] == key and cached[1] == region and cached[2] == date:
+            return cached[3]
+        sign_key = self._derive_sign_key(key, region, date)
+        self._sign_key_cache = (key, region, date, sign_key)
+        return sign_key
+
     @staticmethod
-    def build_sign_key(key, region, date, string_to_sign):
+    def _derive_sign_key(key, region, date):
         sign_key = 'aliyun_v4' + key
         sign_date = hmac.new(sign_key.encode('utf-8'), date.encode('utf-8'), hashlib.sha256).digest()
         sign_region = hmac.new(sign_date, region.encode('utf-8'), hashlib.sha256).digest()
         sign_service = hmac.new(sign_region, 'sls'.encode('utf-8'), hashlib.sha256).digest()
-        sign_request = hmac.new(sign_service, 'aliyun_v4_request'.encode('utf-8'), hashlib.sha256).digest()
-        return hmac.new(sign_request, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+        return hmac.new(sign_service, 'aliyun_v4_request'.encode('utf-8'), hashlib.sha256).digest()
+
+    @staticmethod
+    def build_sign_key(key, region, date, string_to_sign):
+        sign_key = AuthV4._derive_sign_key(key, region, date)
+        return hmac.new(sign_key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+
+from array import array
+from collections import OrderedDict
+
+import six
+
+from .logexception import LogException
+
+TIME_COLUMN = u'__time__'
+TIME_NS_COLUMN = u'__time_ns_part__'
+TOPIC_COLUMN = u'__topic__'
+SOURCE_COLUMN = u'__source__'
+TAG_COLUMN_PREFIX = u'__tag__:'
+
+# int64 typecode, 'q' is not supported by array in python2
+_INT64 = 'q' if six.PY3 else 'l'
+_MISSING_CODE = -1
+
+
+def is_dictionary_column(name):
+    """ columns repeated by all logs of a log group, they are dictionary encoded """
+    return name in (TOPIC_COLUMN, SOURCE_COLUMN) or name.startswith(TAG_COLUMN_PREFIX)
+
+
+class DictionaryColumn(object):
+    """ Dictionary encoded column, value of row i is dictionary[codes[i]], code -1 means missing.
+
+    :type dictionary: list
+    :param dictionary: distinct values
+
+    :type codes: array
+    :param codes: int32 index into dictionary per row
+    """
+
+    def __init__(self, dictionary=None, codes=None):
+        self.dictionary = dictionary if dictionary is not None else []
+        self.codes = codes if codes is not None else array('i')
+        self._index = dict((v, i) for i, v in enumerate(self.dictionary))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def code_of(self, value):
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.dictionary)
+            self.dictionary.append(value)
+        return code
+
+    def append(self, value, count=1):
+        code = _MISSING_CODE if value is None else self.code_of(value)
+        self.codes.extend(array('i', [code]) * count)
+
+    def to_list(self):
+        dictionary = self.dictionary
+        return [None if code == _MISSING_CODE else dictionary[code] for code in self.codes]
+
+
+class LogColumns(object):
+    """ Logs in columnar layout: __time__ (and __time_ns_part__ for pulled logs) are contiguous int64 arrays,
+    __topic__, __source__ and __tag__:* are DictionaryColumn, other keys are lists with None for missing values.
+    """
+
+    def __init__(self):
+        self.columns = OrderedDict()
+        self.row_count = 0
+
+    def __len__(self):
+        return self.row_count
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def keys(self):
+        return list(self.columns.keys())
+
+    def _column(self, name):
+        column = self.columns.get(name)
+        if column is None:
+            if name in (TIME_COLUMN, TIME_NS_COLUMN):
+                column = array(_INT64, [0]) * self.row_count
+            elif is_dictionary_column(name):
+                column = DictionaryColumn()
+                column.append(None, self.row_count)
+            else:
+                column = [None] * self.row_count
+            self.columns[name] = column
+        return column
+
+    def _fill_missing(self):
+        row_count = self.row_count
+        for name, column in six.iteritems(self.columns):
+            missing = row_count - len(column)
+            if missing <= 0:
+                continue
+            if isinstance(column, DictionaryColumn):
+                column.append(None, missing)
+            elif isinstance(column, array):
+                column.extend(array(_INT64, [0]) * missing)
+            else:
+                column.extend([None] * missing)
+
+    def add_log_group(self, logs, topic=None, source=None, tags=None):
+        """ append logs sharing topic, source and tags, they are encoded once for the whole group
+
+        :type logs: iterable
+        :param logs: (time, time_ns, contents) per log, contents is a tuple(key-value) list or dict
+
+        :type topic: string
+        :param topic: topic of the logs
+
+        :type source: string
+        :param source: source of the logs
+
+        :type tags: dict
+        :param tags: tags of the logs
+        """
+        start = self.row_count
+        times = self._column(TIME_COLUMN)
+        times_ns = self._column(TIME_NS_COLUMN)
+        columns = self.columns
+        row = start
+        for log_time, time_ns, contents in logs:
+            times.append(int(log_time))
+            times_ns.append(int(time_ns or 0))
+            if isinstance(contents, dict):
+                contents = six.iteritems(contents)
+            for key, value in contents:
+                column = columns.get(key)
+                if column is None:
+                    column = self._column(key)
+                if isinstance(column, list) and len(column) == row:
+                    column.append(value)
+                else:
+                    self._append_special(key, column, value, row)
+            row += 1
+        count = row - start
+
+        for name, value in ((TOPIC_COLUMN, topic), (SOURCE_COLUMN, source)):
+            if value is not None:
+                self._column(name).append(value, count)
+        for key, value in six.iteritems(tags or {}):
+            self._column(TAG_COLUMN_PREFIX + key).append(value, count)
+        self.row_count = row
+        self._fill_missing()
+
+    @staticmethod
+    def _append_special(key, column, value, row):
+        """ set value of the row for columns with gaps, duplicated keys, or named as a dictionary or time column,
+        e.g. __topic__ of queried logs. the last value wins for duplicated keys.
+        """
+        if isinstance(column, DictionaryColumn):
+            if len(column) > row:
+                column.codes[row] = column.code_of(value)
+            else:
+                column.append(None, row - len(column))
+                column.append(value)
+        elif isinstance(column, array):
+            if len(column) > row:
+                column[row] = int(value)
+            else:
+                column.extend(array(_INT64, [0]) * (row - len(column)))
+                column.append(int(value))
+        elif len(column) > row:
+            column[row] = value
+        else:
+            column.extend([None] * (row - len(column)))
+            column.append(value)
+
+    def add_rows(self, rows):
+        """ append logs as dicts, e.g. rows of GetLogsResponse
+
+        :type rows: iterable
+        :param rows: dict or tuple(key-value) iterable per log
+        """
+        start = self.row_count
+        columns = self.columns
+        row = start
+        for item in rows:
+            if isinstance(item, dict):
+                item = six.iteritems(item)
+            for key, value in item:
+                column = columns.get(key)
+                if column is None:
+                    column = self._column(key)
+                if isinstance(column, list) and len(column) == row:
+                    column.append(value)
+                else:
+                    self._append_special(key, column, value, row)
+            row += 1
+        self.row_count = row
+        self._fill_missing()
+
+    def extend(self, other):
+        """ append all rows of another LogColumns, dictionaries are merged
+
+        :type other: LogColumns
+        :param other: the columns to append
+
+        :return: self
+        """
+        start = self.row_count
+        for name, column in six.iteritems(other.columns):
+            target = self._column(name)
+            if isinstance(target, DictionaryColumn):
+                codes = [target.code_of(value) for value in column.dictionary]
+                target.append(None, start - len(target))
+                target.codes.extend(array('i', [_MISSING_CODE if code == _MISSING_CODE else codes[code]
+                                               for code in column.codes]))
+            elif isinstance(target, array):
+                target.extend(array(_INT64, [0]) * (start - len(target)))
+                target.extend(column)
+            else:
+                target.extend([None] * (start - len(target)))
+                target.extend(column)
+        self.row_count = start + other.row_count
+        self._fill_missing()
+        return self
+
+    @staticmethod
+    def concat(columns_list):
+        """ concatenate multiple LogColumns into a new one
+
+        :type columns_list: list<LogColumns>
+        :param columns_list: the columns
+
+        :return: LogColumns
+        """
+        result = LogColumns()
+        for columns in columns_list:
+            result.extend(columns)
+        return result
+
+    def to_dict(self):
+        """ decode to plain dict of column name -> list """
+        result = OrderedDict()
+        for name, column in six.iteritems(self.columns):
+            result[name] = column.to_list() if isinstance(column, DictionaryColumn) else list(column)
+        return result
+
+    def to_pandas(self):
+        """ convert to pandas.DataFrame, dictionary columns are converted to categorical
+
+        :return: pandas.DataFrame
+
+        :raise: LogException
+        """
+        # imported on demand, pandas is heavy and optional
+        try:
+            import pandas
+        except ImportError:
+            raise LogException('MissingDependency', 'to_pandas requires pandas, install it via "pip install pandas"')
+        data = OrderedDict()
+        for name, column in six.iteritems(self.columns):
+            if isinstance(column, DictionaryColumn):
+                data[name] = pandas.Categorical.from_codes(column.codes, categories=column.dictionary)
+            else:
+                data[name] = column
+        return pandas.DataFrame(data, columns=list(data.keys()))
+
+    def to_arrow(self):
+        """ convert to pyarrow.Table, dictionary columns are converted to DictionaryArray
+
+        :return: pyarrow.Table
+
+        :raise: LogException
+        """
+        try:
+            import pyarrow
+        except ImportError:
+            raise LogException('MissingDependency', 'to_arrow requires pyarrow, install it via "pip install pyarrow"')
+        arrays = []
+        for name, column in six.iteritems(self.columns):
+            if isinstance(column, DictionaryColumn):
+                codes = pyarrow.array(column.codes, type=pyarrow.int32(),
+                                      mask=[code == _MISSING_CODE for code in column.codes])
+                arrays.append(pyarrow.DictionaryArray.from_arrays(codes, pyarrow.array(column.dictionary)))
+            elif isinstance(column, array):
+                arrays.append(pyarrow.array(column, type=pyarrow.int64()))
+            else:
+                arrays.append(pyarrow.array(column))
+        return pyarrow.Table.from_arrays(arrays, names=list(self.columns.keys()))
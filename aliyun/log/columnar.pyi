@@ -0,0 +1,36 @@
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+TIME_COLUMN: str
+TIME_NS_COLUMN: str
+TOPIC_COLUMN: str
+SOURCE_COLUMN: str
+TAG_COLUMN_PREFIX: str
+
+def is_dictionary_column(name: str) -> bool: ...
+
+class DictionaryColumn:
+    dictionary: List[Any]
+    codes: array
+    def __init__(self, dictionary: Optional[List[Any]] = ..., codes: Optional[array] = ...) -> None: ...
+    def __len__(self) -> int: ...
+    def code_of(self, value: Any) -> int: ...
+    def append(self, value: Any, count: int = ...) -> None: ...
+    def to_list(self) -> List[Any]: ...
+
+class LogColumns:
+    columns: Dict[str, Union[array, DictionaryColumn, List[Any]]]
+    row_count: int
+    def __init__(self) -> None: ...
+    def __len__(self) -> int: ...
+    def __getitem__(self, name: str) -> Union[array, DictionaryColumn, List[Any]]: ...
+    def __contains__(self, name: str) -> bool: ...
+    def keys(self) -> List[str]: ...
+    def add_log_group(self, logs: Iterable[Tuple[int, int, Any]], topic: Optional[str] = ..., source: Optional[str] = ..., tags: Optional[Dict[str, str]] = ...) -> None: ...
+    def add_rows(self, rows: Iterable[Any]) -> None: ...
+    def extend(self, other: LogColumns) -> LogColumns: ...
+    @staticmethod
+    def concat(columns_list: Iterable[LogColumns]) -> LogColumns: ...
+    def to_dict(self) -> Dict[str, List[Any]]: ...
+    def to_pandas(self) -> Any: ...
+    def to_arrow(self) -> Any: ...
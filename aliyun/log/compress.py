@@ -1,4 +1,5 @@
 
+import threading
 import zlib
 from enum import Enum
 from .logexception import LogException
@@ -12,26 +13,134 @@ try:
 except ImportError:
     zstd_available = False
 
-def lz_decompress(raw_size, data):
-    return lz4.block.decompress(data, uncompressed_size=raw_size)
+# zstandard supports reusable contexts, it's preferred when both are installed
+try:
+    import zstandard
+    zstandard_available = True
+    zstd_available = True
+except ImportError:
+    zstandard_available = False
 
-def lz_compresss(data):
-    return lz4.block.compress(data)[4:]
 
-def zstd_compress(data):
+def _check_zstd():
     if not zstd_available:
         raise LogException('UnsupportedCompressType',
                            'Unsupported compress type zstd, library zstd not installed')
-    return zstd.compress(data, 1)
+
+
+class Lz4Codec(object):
+    """ lz4 block format, level > 0 is the high compression mode (1~12, slower and smaller), level < 0 is the fast
+    mode with acceleration -level (faster and larger), default is the default mode
+    """
+    name = 'lz4'
+
+    def compress(self, data, level=None):
+        if not level:
+            return lz4.block.compress(data, store_size=False)
+        if level > 0:
+            return lz4.block.compress(data, mode='high_compression', compression=level, store_size=False)
+        return lz4.block.compress(data, mode='fast', acceleration=-level, store_size=False)
+
+    def decompress(self, data, raw_size):
+        return lz4.block.decompress(data, uncompressed_size=raw_size)
+
+
+class ZstdCodec(object):
+    """ zstd, level is 1~22 or negative for the faster ones, default is 1. with zstandard installed, the compression
+    contexts are created once per thread and level and reused
+    """
+    name = 'zstd'
+    default_level = 1
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _get_compressor(self, level):
+        compressors = getattr(self._local, 'compressors', None)
+        if compressors is None:
+            compressors = self._local.compressors = {}
+        compressor = compressors.get(level)
+        if compressor is None:
+            compressor = compressors[level] = zstandard.ZstdCompressor(level=level)
+        return compressor
+
+    def _get_decompressor(self):
+        decompressor = getattr(self._local, 'decompressor', None)
+        if decompressor is None:
+            decompressor = self._local.decompressor = zstandard.ZstdDecompressor()
+        return decompressor
+
+    def compress(self, data, level=None):
+        _check_zstd()
+        level = self.default_level if level is None else level
+        if zstandard_available:
+            return self._get_compressor(level).compress(data)
+        return zstd.compress(data, level)
+
+    def decompress(self, data, raw_size):
+        _check_zstd()
+        if zstandard_available:
+            # the output is allocated once by raw_size if the frame doesn't record the size
+            result = self._get_decompressor().decompress(data, max_output_size=raw_size)
+        else:
+            result = zstd.decompress(data)
+        if len(result) != raw_size:
+            raise LogException('DecompressError', 'uncompressed size ' + str(len(result)) + ' does not match x-log-bodyrawsize ' + str(raw_size))
+        return result
+
+
+class DeflateCodec(object):
+    """ zlib format, level is 1~9, default is 6 """
+    name = 'deflate'
+
+    def compress(self, data, level=None):
+        return zlib.compress(data, -1 if level is None else level)
+
+    def decompress(self, data, raw_size):
+        return zlib.decompress(data, 15 + 32, max(raw_size, 1))  # accept the gzip header as well
+
+
+_codecs = {'lz4': Lz4Codec(), 'zstd': ZstdCodec(), 'deflate': DeflateCodec()}
+
+
+def register_codec(name, codec):
+    """ register or replace the codec of a compress type, e.g. a zstd codec built with another library.
+    the server only accepts lz4, zstd and deflate
+
+    :type name: string
+    :param name: value of x-log-compresstype, e.g. zstd
+
+    :type codec: object
+    :param codec: object with compress(data, level=None) and decompress(data, raw_size)
+    """
+    _codecs[name.lower()] = codec
+
+
+def get_codec(name):
+    """ codec of the compress type, e.g. get_codec('zstd').compress(data, 3)
+
+    :type name: string/CompressType
+    :param name: compress type, e.g. lz4
+
+    :return: codec
+    """
+    codec = _codecs.get(str(name).lower())
+    if codec is None:
+        raise LogException('UnsupportedCompressType', 'Unsupported compress type: ' + str(name))
+    return codec
+
+
+def lz_decompress(raw_size, data):
+    return _codecs['lz4'].decompress(data, raw_size)
+
+def lz_compresss(data):
+    return _codecs['lz4'].compress(data)
+
+def zstd_compress(data, level=None):
+    return _codecs['zstd'].compress(data, level)
 
 def zstd_decompress(raw_size, data):
-    if not zstd_available:
-        raise LogException('UnsupportedCompressType',
-                           'Unsupported compress type zstd, library zstd not installed')
-    result = zstd.decompress(data)
-    if len(result) != raw_size:
-        raise LogException('DecompressError', 'uncompressed size ' + str(len(result)) + ' does not match x-log-bodyrawsize ' + str(raw_size))
-    return result
+    return _codecs['zstd'].decompress(data, raw_size)
 
 class CompressType(Enum):
     UNCOMPRESSED = 1
@@ -60,34 +169,18 @@ class CompressType(Enum):
 
 class Compressor():
     @staticmethod
-    def compress(data, compress_type):
-        # type: (bytes, CompressType) -> bytes
-        if compress_type == CompressType.LZ4:
-            return lz_compresss(data)
-        
-        if compress_type == CompressType.ZSTD:
-            return zstd_compress(data)
-
+    def compress(data, compress_type, level=None):
+        # type: (bytes, CompressType, int) -> bytes
         if compress_type == CompressType.UNCOMPRESSED:
             return data
-
-        raise LogException('UnsupportedCompressType',
-                           'Unsupported compress type: ' + compress_type)
+        return get_codec(compress_type).compress(data, level)
 
     @staticmethod
     def decompress(data, raw_size, compress_type):
         # type: (bytes, int, CompressType) -> bytes
-        if compress_type == CompressType.LZ4:
-            return lz_decompress(raw_size, data)
-
         if compress_type == CompressType.UNCOMPRESSED:
             return data
-        
-        if compress_type == CompressType.ZSTD:
-            return zstd_decompress(raw_size, data)
-
-        raise LogException('UnsupportedCompressType',
-                           'Unsupported compress type: ' + compress_type)
+        return get_codec(compress_type).decompress(data, raw_size)
 
     @staticmethod
     def decompress_response(header, response):
@@ -102,14 +195,8 @@ class Compressor():
         if raw_size == 0:
             return six.b('')
 
-        if compress_type_str == 'lz4':
-            return Compressor.decompress(response, raw_size, CompressType.LZ4)
-
-        if compress_type_str == 'zstd':
-            return Compressor.decompress(response, raw_size, CompressType.ZSTD)
-
-        if compress_type_str in ('gzip', 'deflate'):
-            return zlib.decompress(response)
-
-        raise LogException('UnsupportedCompressType', 'Unsupported compress type: ' +
-                           compress_type_str, resp_header=header, resp_body=response)
+        codec = _codecs.get('deflate' if compress_type_str == 'gzip' else compress_type_str)
+        if codec is None:
+            raise LogException('UnsupportedCompressType', 'Unsupported compress type: ' +
+                               compress_type_str, resp_header=header, resp_body=response)
+        return codec.decompress(response, raw_size)
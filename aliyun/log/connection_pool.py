@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+import socket
+
+from requests.adapters import HTTPAdapter, DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE
+from urllib3.connection import HTTPConnection
+
+DEFAULT_TCP_KEEPALIVE_IDLE = 60
+DEFAULT_TCP_KEEPALIVE_INTERVAL = 10
+
+
+def build_socket_options(tcp_keepalive=None, socket_send_buffer=None, socket_recv_buffer=None):
+    """ socket options of the connections, including the default ones of urllib3 (TCP_NODELAY)
+
+    :type tcp_keepalive: bool/int
+    :param tcp_keepalive: enable TCP keepalive, an int is the idle seconds before the probes (60 if True)
+
+    :type socket_send_buffer: int
+    :param socket_send_buffer: SO_SNDBUF in bytes, default is the system one
+
+    :type socket_recv_buffer: int
+    :param socket_recv_buffer: SO_RCVBUF in bytes, default is the system one
+
+    :return: list of (level, option, value)
+    """
+    options = list(HTTPConnection.default_socket_options)
+    if tcp_keepalive:
+        idle = DEFAULT_TCP_KEEPALIVE_IDLE if tcp_keepalive is True else int(tcp_keepalive)
+        options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        # not available on all platforms, e.g. macOS has TCP_KEEPALIVE instead
+        if hasattr(socket, 'TCP_KEEPIDLE'):
+            options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle))
+        if hasattr(socket, 'TCP_KEEPINTVL'):
+            options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, DEFAULT_TCP_KEEPALIVE_INTERVAL))
+    if socket_send_buffer:
+        options.append((socket.SOL_SOCKET, socket.SO_SNDBUF, socket_send_buffer))
+    if socket_recv_buffer:
+        options.append((socket.SOL_SOCKET, socket.SO_RCVBUF, socket_recv_buffer))
+    return options
+
+
+class LogHTTPAdapter(HTTPAdapter):
+    """ HTTPAdapter of LogClient with configurable connection pools and socket options.
+    A pool is kept for each host, i.e. each project, pool_connections of them are cached.
+
+    :type pool_connections: int
+    :param pool_connections: count of the hosts (projects) whose pools are cached, default is 10
+
+    :type pool_maxsize: int
+    :param pool_maxsize: connections kept in the pool of a host, default is 10. set it no less than the threads
+        sharing the client, or the extra connections are discarded after use and reconnected later
+
+    :type pool_block: bool
+    :param pool_block: wait for a free connection instead of creating an extra one when the pool is used up,
+        default is False
+
+    :type socket_options: list
+    :param socket_options: list of (level, option, value), see build_socket_options
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ['socket_options']
+
+    def __init__(self, pool_connections=DEFAULT_POOLSIZE, pool_maxsize=DEFAULT_POOLSIZE, pool_block=DEFAULT_POOLBLOCK,
+                 socket_options=None):
+        self.socket_options = socket_options
+        super(LogHTTPAdapter, self).__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                             pool_block=pool_block)
+
+    def init_poolmanager(self, connections, maxsize, block=DEFAULT_POOLBLOCK, **pool_kwargs):
+        if self.socket_options is not None:
+            pool_kwargs['socket_options'] = self.socket_options
+        super(LogHTTPAdapter, self).init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+    def get_pool_stats(self):
+        """ usage of the cached pools by host
+
+        :return: dict of "scheme://host:port" to {"connections": connections created, "requests": requests sent,
+            "idle": connections idle in the pool, "maxsize": pool_maxsize}
+        """
+        stats = {}
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            queue = pool.pool
+            idle = sum(1 for conn in list(queue.queue) if conn is not None) if queue is not None else 0
+            stats['{0}://{1}:{2}'.format(pool.scheme, pool.host, pool.port)] = {
+                'connections': pool.num_connections, 'requests': pool.num_requests, 'idle': idle,
+                'maxsize': self._pool_maxsize}
+        return stats
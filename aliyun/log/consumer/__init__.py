@@ -2,3 +2,4 @@
 from .tasks import ConsumerProcessorBase, ConsumerProcessorAdaptor, ConsumerJsonProcessorBase
 from .config import LogHubConfig, CursorPosition
 from .worker import ConsumerWorker
+from .process_group import ConsumerProcessGroup
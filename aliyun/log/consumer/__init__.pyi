@@ -1,3 +1,4 @@
 from .config import CursorPosition as CursorPosition, LogHubConfig as LogHubConfig
 from .tasks import ConsumerJsonProcessorBase as ConsumerJsonProcessorBase, ConsumerProcessorAdaptor as ConsumerProcessorAdaptor, ConsumerProcessorBase as ConsumerProcessorBase
 from .worker import ConsumerWorker as ConsumerWorker
+from .process_group import ConsumerProcessGroup as ConsumerProcessGroup
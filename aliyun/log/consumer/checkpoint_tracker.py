@@ -1,14 +1,130 @@
 # -*- coding: utf-8 -*-
 
+import logging
+import threading
 import time
 
+from concurrent.futures import wait
+
 from .exceptions import CheckPointException
 from ..logexception import LogException
 from multiprocessing import RLock
 
+logger = logging.getLogger(__name__)
+
+
+class CheckpointAggregator(object):
+    """ Collect the checkpoints saved by all shards of a consumer worker and commit them in one pass every
+    commit_interval seconds, instead of one request per save. checkpoints saved multiple times of a shard within
+    an interval are coalesced into one commit of the latest one.
+
+    :type commit_interval: float
+    :param commit_interval: seconds between two commits
+
+    :type executor: Executor
+    :param executor: the commits of the shards are sent by it in parallel without blocking the caller,
+        default is to send them one by one in the caller thread
+    """
+
+    def __init__(self, commit_interval, executor=None):
+        self.commit_interval = commit_interval
+        self.executor = executor
+        self.last_commit_time = time.time()
+        self._pending = {}  # shard id -> (tracker, time of the first pending save)
+        self._futures = set()
+        self._lock = threading.Lock()
+
+        self.commit_count = 0
+        self.failed_count = 0
+        self.coalesced_count = 0
+        self.last_commit_lag = 0
+        self.max_commit_lag = 0
+
+    def add(self, tracker):
+        """ mark the checkpoint of the tracker as pending, it's committed in the next commit """
+        with self._lock:
+            if tracker.shard_id in self._pending:
+                self.coalesced_count += 1
+            else:
+                self._pending[tracker.shard_id] = (tracker, time.time())
+
+    def discard(self, tracker):
+        """ remove the pending checkpoint of the tracker, return True if it's pending """
+        with self._lock:
+            return self._pending.pop(tracker.shard_id, None) is not None
+
+    def get_pending_count(self):
+        return len(self._pending)
+
+    def get_next_commit_time(self):
+        """ time of the next commit, None if there's nothing pending """
+        return self.last_commit_time + self.commit_interval if self._pending else None
+
+    def commit(self, force=False):
+        """ commit all pending checkpoints if commit_interval is passed since last commit
+
+        :type force: bool
+        :param force: commit anyway and wait for all the commits to finish, e.g. on shutdown
+        """
+        current_time = time.time()
+        if not force and current_time < self.last_commit_time + self.commit_interval:
+            return
+        self.last_commit_time = current_time
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        for shard_id, (tracker, pending_time) in pending.items():
+            if self.executor is None:
+                self._commit_tracker(shard_id, tracker, pending_time)
+                continue
+            future = self.executor.submit(self._commit_tracker, shard_id, tracker, pending_time)
+            with self._lock:
+                self._futures.add(future)
+            future.add_done_callback(self._on_commit_done)
+
+        if force:
+            with self._lock:
+                futures = list(self._futures)
+            wait(futures)
+
+    def _on_commit_done(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _commit_tracker(self, shard_id, tracker, pending_time):
+        lag = time.time() - pending_time
+        with tracker.lock:
+            # the checkpoint of a released shard is flushed on shutdown, committing it again may overwrite the one
+            # of the consumer taking the shard over
+            if tracker.is_released():
+                return
+            try:
+                updated = tracker.flush_check_point()
+            except CheckPointException as e:
+                logger.warning('Fail to commit checkpoint of shard %s, error: %s', shard_id, e)
+                with self._lock:
+                    self.failed_count += 1
+                    # retry in the next commit unless a newer one is pending
+                    self._pending.setdefault(shard_id, (tracker, pending_time))
+                return
+        with self._lock:
+            if updated:
+                self.commit_count += 1
+            self.last_commit_lag = lag
+            self.max_commit_lag = max(self.max_commit_lag, lag)
+
+    def get_stats(self):
+        """ commit metrics: commit_count (update requests sent), failed_count, coalesced_count (saves merged into
+        a pending one), pending_count, last_commit_lag and max_commit_lag (seconds from a checkpoint saved to committed)
+        """
+        return {'commit_count': self.commit_count, 'failed_count': self.failed_count,
+                'coalesced_count': self.coalesced_count, 'pending_count': self.get_pending_count(),
+                'last_commit_lag': self.last_commit_lag, 'max_commit_lag': self.max_commit_lag}
+
+
 class ConsumerCheckpointTracker(object):
 
-    def __init__(self, loghub_client_adapter, consumer_name, shard_id):
+    def __init__(self, loghub_client_adapter, consumer_name, shard_id, aggregator=None):
         self.consumer_group_client = loghub_client_adapter
         self.consumer_name = consumer_name
         self.shard_id = shard_id
@@ -18,6 +134,9 @@ class ConsumerCheckpointTracker(object):
         self.last_persistent_checkpoint = ''
         self.default_flush_check_point_interval = 60
         self.lock = RLock()
+        # checkpoints saved as persistent are committed by it in batch if set
+        self.aggregator = aggregator
+        self._released = False
 
     def set_cursor(self, cursor):
         self.cursor = cursor
@@ -31,7 +150,10 @@ class ConsumerCheckpointTracker(object):
         else:
             self.temp_check_point = self.cursor
         if persistent:
-            self.flush_check_point()
+            if self.aggregator is not None:
+                self.aggregator.add(self)
+            else:
+                self.flush_check_point()
 
     def set_memory_check_point(self, cursor):
         self.temp_check_point = cursor
@@ -40,16 +162,36 @@ class ConsumerCheckpointTracker(object):
         self.last_persistent_checkpoint = cursor
 
     def flush_check_point(self):
+        """ persist the checkpoint now, return True if it's updated to server """
         with self.lock:
             if self.temp_check_point != '' and self.temp_check_point != self.last_persistent_checkpoint:
                 try:
                     self.consumer_group_client.update_check_point(
                         self.shard_id, self.consumer_name, self.temp_check_point)
                     self.last_persistent_checkpoint = self.temp_check_point
+                    return True
                 except LogException as e:
                     raise CheckPointException("Failed to persistent the cursor to outside system, " +
                                               self.consumer_name + ", " + str(self.shard_id)
                                               + ", " + self.temp_check_point, e)
+        return False
+
+    def flush_pending_check_point(self):
+        """ persist the checkpoint waiting for the aggregator now before the shard is released, the aggregator
+        doesn't commit it any more after that
+        """
+        if self.aggregator is None:
+            return
+        with self.lock:
+            try:
+                # also when the aggregator is committing it, in case that commit fails
+                self.aggregator.discard(self)
+                self.flush_check_point()
+            finally:
+                self._released = True
+
+    def is_released(self):
+        return self._released
 
     def flush_check(self):
         current_time = time.time()
@@ -26,7 +26,8 @@ class LogHubConfig(object):
                  cursor_start_time=None, security_token=None, max_fetch_log_group_size=None, worker_pool_size=None, shared_executor=None,
                  cursor_end_time=None, credentials_refresher=None,
                  auth_version=AUTH_VERSION_1, region='', query=None,
-                 accept_compress_type=None, processor=None):
+                 accept_compress_type=None, processor=None, prefetch_depth=None, prefetch_max_bytes=None,
+                 checkpoint_commit_interval=None, max_in_flight_bytes=None, connection_pool_options=None):
         """
 
         :param endpoint:
@@ -38,12 +39,12 @@ class LogHubConfig(object):
         :param consumer_name: suggest use format "{consumer_group_name}-{current_process_id}", give it different consumer name when you need to run this program in parallel
         :param cursor_position: This options is used for initialization, will be ignored once consumer group is created and each shard has beeen started to be consumed. normally, could ignore it.
         :param heartbeat_interval: default 20, once a client doesn't report to server * heartbeat_interval * 2 interval, server will consider it's offline and re-assign its task to another consumer. thus  don't set the heatbeat interval too small when the network badwidth or performance of consumtion is not so good.
-        :param data_fetch_interval: default 2, don't configure it too small (<1s)
+        :param data_fetch_interval: default 2, interval of fetching a shard without new data, and maximum wait between two rounds of checking the shards. a shard with data is scheduled immediately once its fetch or process task is done.
         :param in_order: default False, during consuption, when shard is splitted, if need to consume the newly splitted shard after its parent shard (read-only) is finished consumption or not. suggest keep it as False (don't care) until you have good reasion for it.
         :param cursor_start_time: Will be used when cursor_position when could be "begin", "end", "specific time format in ISO", it's log receiving time.
         :param security_token:
         :param max_fetch_log_group_size: default 1000, fetch size in each request, normally use default. maximum is 1000, could be lower. the lower the size the memory efficiency might be better.
-        :param worker_pool_size: default 2. suggest keep the default size (2), use multiple process instead, when you need to have more concurrent processing, launch this consumer for mulitple times and give them different consuer name in same consumer group. will be ignored when shared_executor is passed.
+        :param worker_pool_size: default 2. suggest keep the default size (2), use multiple process instead, when you need to have more concurrent processing, use ConsumerProcessGroup, or launch this consumer for mulitple times and give them different consuer name in same consumer group. will be ignored when shared_executor is passed.
         :param shared_executor: shared executor, if not None, worker_pool_size will be ignored
         :param cursor_end_time: cursor end time, default is None (never stop processing). could setting it as ISO time-format, when setting it as "end", it means process all logs received from start to the time when the consumer is started.
         :param auth_version: only support AUTH_VERSION_1 and AUTH_VERSION_4
@@ -53,6 +54,11 @@ class LogHubConfig(object):
         :type accept_compress_type: string
         :param accept_compress_type: The compression type used for logs retrieved from sls.
         Supported types include 'lz4' and 'zstd'. If you choose 'zstd', ensure the `zstd` library is installed via pip. The default value is 'lz4'.
+        :param prefetch_depth: default 1, count of fetched batches each shard keeps ready while the previous one is being processed. suggest 2~4 to catch up lagging shards faster when processing is slow.
+        :param prefetch_max_bytes: default 64MB, stop prefetching when the fetched data of a shard exceeds this size, it bounds the memory together with prefetch_depth.
+        :param checkpoint_commit_interval: default None (each shard commits its checkpoint once it's saved). when set, e.g. 3, checkpoints saved by all shards are coalesced and committed in one pass every such seconds, it saves lots of requests when a worker holds many shards. checkpoints are still committed immediately when a shard is released.
+        :param max_in_flight_bytes: default None (no limit). bytes budget of the fetched data (decompressed size) of all shards in a worker, counted from fetched until processed. fetching of all shards is paused once it's exceeded, it bounds the memory of a worker holding many busy shards.
+        :param connection_pool_options: default None (pool_maxsize is sized to the threads of the worker, at least 10). options of LogClient.set_connection_pool for the client of the worker, e.g. {'pool_maxsize': 32, 'tcp_keepalive': True}
 
         """
         self.endpoint = endpoint
@@ -79,3 +85,8 @@ class LogHubConfig(object):
         self.query = query
         self.accept_compress_type = accept_compress_type
         self.processor = processor
+        self.prefetch_depth = prefetch_depth or 1
+        self.prefetch_max_bytes = prefetch_max_bytes or 64 * 1024 * 1024
+        self.checkpoint_commit_interval = checkpoint_commit_interval
+        self.max_in_flight_bytes = max_in_flight_bytes
+        self.connection_pool_options = connection_pool_options
@@ -1,4 +1,4 @@
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Dict, Optional
 from enum import Enum
 
 class CursorPosition(Enum):
@@ -37,4 +37,9 @@ class LogHubConfig:
     query: Optional[str]
     accept_compress_type: Optional[str]
     processor: Optional[str]
-    def __init__(self, endpoint: str, access_key_id: str, access_key: str, project: str, logstore: str, consumer_group_name: str, consumer_name: str, cursor_position: Optional[CursorPosition] = ..., heartbeat_interval: Optional[int] = ..., data_fetch_interval: Optional[int] = ..., in_order: bool = False, cursor_start_time: Any = ..., security_token: Optional[str] = ..., max_fetch_log_group_size: Optional[int] = ..., worker_pool_size: Optional[int] = ..., shared_executor: Any = ..., cursor_end_time: Any = ..., credentials_refresher: Optional[Callable[..., Any]] = ..., auth_version: str = ..., region: str = '', query: Optional[str] = ..., accept_compress_type: Optional[str] = ..., processor: Optional[str] = ...) -> None: ...
+    prefetch_depth: int
+    prefetch_max_bytes: int
+    checkpoint_commit_interval: Optional[float]
+    max_in_flight_bytes: Optional[int]
+    connection_pool_options: Optional[Dict[str, Any]]
+    def __init__(self, endpoint: str, access_key_id: str, access_key: str, project: str, logstore: str, consumer_group_name: str, consumer_name: str, cursor_position: Optional[CursorPosition] = ..., heartbeat_interval: Optional[int] = ..., data_fetch_interval: Optional[int] = ..., in_order: bool = False, cursor_start_time: Any = ..., security_token: Optional[str] = ..., max_fetch_log_group_size: Optional[int] = ..., worker_pool_size: Optional[int] = ..., shared_executor: Any = ..., cursor_end_time: Any = ..., credentials_refresher: Optional[Callable[..., Any]] = ..., auth_version: str = ..., region: str = '', query: Optional[str] = ..., accept_compress_type: Optional[str] = ..., processor: Optional[str] = ..., prefetch_depth: Optional[int] = ..., prefetch_max_bytes: Optional[int] = ..., checkpoint_commit_interval: Optional[float] = ..., max_in_flight_bytes: Optional[int] = ..., connection_pool_options: Optional[Dict[str, Any]] = ...) -> None: ...
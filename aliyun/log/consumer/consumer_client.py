@@ -24,7 +24,7 @@ class ConsumerClient(object):
     def __init__(self, endpoint, access_key_id, access_key, project,
                  logstore, consumer_group, consumer, security_token=None, credentials_refresher=None,
                  auth_version=AUTH_VERSION_1, region='',
-                 accept_compress_type=None):
+                 accept_compress_type=None, connection_pool_options=None):
         '''
         :type endpoint: string
         :param endpoint: the endpoint of sls project
@@ -63,6 +63,9 @@ class ConsumerClient(object):
         :param accept_compress_type: The compression type used for logs retrieved from sls.
         Supported types include 'lz4' and 'zstd'. If you choose 'zstd', ensure the `zstd` library is installed via pip. The default value is 'lz4'.
 
+        :type connection_pool_options: dict
+        :param connection_pool_options: options passed to LogClient.set_connection_pool
+
         '''
         from .. import LogClient
 
@@ -72,6 +75,8 @@ class ConsumerClient(object):
             '%s-consumergroup-%s-%s' % (USER_AGENT, consumer_group, consumer))
         if credentials_refresher is not None:
             self.mclient.set_credentials_auto_refresher(credentials_refresher)
+        if connection_pool_options:
+            self.mclient.set_connection_pool(**connection_pool_options)
         self.mproject = project
         self.mlogstore = logstore
         self.mconsumer_group = consumer_group
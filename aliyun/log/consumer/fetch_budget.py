@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+
+class FetchBudget(object):
+    """ Bytes budget of the fetched data of all shards in a consumer worker, counted by the raw (decompressed) size
+    from the fetched data is received until it's processed. shards stop submitting fetch tasks when it's exhausted.
+
+    :type max_bytes: int
+    :param max_bytes: the budget in bytes
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.peak_bytes = 0
+        self.stalled_count = 0
+        self.stalled_time = 0
+        self._stall_start_time = None
+        self._lock = threading.Lock()
+
+    def acquire(self, size):
+        with self._lock:
+            self.used_bytes += size
+            self.peak_bytes = max(self.peak_bytes, self.used_bytes)
+            self._update_stall()
+
+    def release(self, size):
+        with self._lock:
+            self.used_bytes -= size
+            self._update_stall()
+
+    def _update_stall(self):
+        if self.used_bytes >= self.max_bytes:
+            if self._stall_start_time is None:
+                self._stall_start_time = time.time()
+                self.stalled_count += 1
+        elif self._stall_start_time is not None:
+            self.stalled_time += time.time() - self._stall_start_time
+            self._stall_start_time = None
+
+    def is_exhausted(self):
+        return self.used_bytes >= self.max_bytes
+
+    def get_stats(self):
+        """ used_bytes, max_bytes, peak_bytes, stalled_count (times fetching is paused) and stalled_time (seconds
+        fetching is paused in total, including the ongoing pause)
+        """
+        with self._lock:
+            stalled_time = self.stalled_time
+            if self._stall_start_time is not None:
+                stalled_time += time.time() - self._stall_start_time
+            return {'used_bytes': self.used_bytes, 'max_bytes': self.max_bytes, 'peak_bytes': self.peak_bytes,
+                    'stalled_count': self.stalled_count, 'stalled_time': stalled_time}
@@ -3,11 +3,12 @@
 
 class FetchedLogGroup(object):
 
-    def __init__(self, shard_id, data, end_cursor, log_group_count):
+    def __init__(self, shard_id, data, end_cursor, log_group_count, raw_size=0):
         self._shard_id = shard_id
         self._data = data
         self._end_cursor = end_cursor
         self._log_group_count = log_group_count
+        self._raw_size = raw_size
 
     @property
     def shard_id(self):
@@ -24,3 +25,7 @@ class FetchedLogGroup(object):
     @property
     def log_group_size(self):
         return self._log_group_count
+
+    @property
+    def raw_size(self):
+        return self._raw_size
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+import copy
+import logging
+import multiprocessing
+import sys
+import time
+from threading import Thread
+
+from .worker import ConsumerWorker
+
+logger = logging.getLogger(__name__)
+
+
+def _run_consumer_process(make_processor, consumer_option, args, kwargs, stop_event):
+    """ entry of the consumer process, run a ConsumerWorker until the group is stopped, exits with code 1 if the
+    worker stopped by itself without shutting down, e.g. its thread died of an error
+    """
+    worker = ConsumerWorker(make_processor, consumer_option, args=args, kwargs=kwargs)
+    worker.start()
+    try:
+        while worker.is_alive() and not stop_event.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    # a worker completes its tasks (cursor_end_time) by shutting down itself
+    crashed = not worker.is_alive() and not worker.shut_down_flag and not stop_event.is_set()
+    worker.shutdown()
+    worker.join()
+    if crashed:
+        sys.exit(1)
+
+
+class ConsumerProcessGroup(object):
+    """
+    Run a consumer group in multiple processes under one supervisor, each process runs a ConsumerWorker named
+    "{consumer_name}-{index}" in the same consumer group. The shards are assigned across them by the server via
+    heartbeat, each process fetches, processes and saves checkpoints of its own shards, so process() of different
+    shards runs on different cores. A process exits unexpectedly (non-zero exit code) is restarted with the same
+    consumer name, so it takes back its shards. A process exits with code 0 after its worker completes the tasks
+    (cursor_end_time is set) is not restarted, the supervisor stops when all of them are completed.
+
+    :param make_processor: class or function to create the processor, it must be picklable (defined at module level)
+    :param consumer_option: LogHubConfig, shared_executor is ignored as it cannot be shared across processes
+    :param process_count: default is cpu count, suggest no more than the shard count
+    :param args: args passed to make_processor
+    :param kwargs: kwargs passed to make_processor
+    :param restart_interval: default 10, seconds to wait before restarting an exited process
+    :param mp_context: multiprocessing context used to start processes, default is multiprocessing module itself
+    """
+
+    def __init__(self, make_processor, consumer_option, process_count=None, args=None, kwargs=None,
+                 restart_interval=10, mp_context=None):
+        self.make_processor = make_processor
+        self.option = consumer_option
+        self.process_count = process_count or multiprocessing.cpu_count()
+        self.process_args = args or ()
+        self.process_kwargs = kwargs or {}
+        self.restart_interval = restart_interval
+        self._mp = mp_context or multiprocessing
+        self._stop_event = self._mp.Event()
+        self._processes = [None] * self.process_count
+        self._exit_times = [0] * self.process_count
+        self._completed = [False] * self.process_count
+        self._supervisor = None
+        self.shut_down_flag = False
+
+    def get_consumer_name(self, index):
+        return '{0}-{1}'.format(self.option.consumer_name, index)
+
+    def _start_process(self, index):
+        option = copy.copy(self.option)
+        option.consumer_name = self.get_consumer_name(index)
+        option.shared_executor = None
+        process = self._mp.Process(target=_run_consumer_process,
+                                   args=(self.make_processor, option, self.process_args, self.process_kwargs,
+                                         self._stop_event),
+                                   name=option.consumer_name)
+        process.daemon = False
+        process.start()
+        self._processes[index] = process
+        logger.info('consumer process "%s" started, pid: %s', option.consumer_name, process.pid)
+
+    def _supervise(self):
+        while not self.shut_down_flag and not all(self._completed):
+            for index, process in enumerate(self._processes):
+                if self.shut_down_flag:
+                    break
+                if self._completed[index] or (process is not None and process.is_alive()):
+                    continue
+                if process is not None and process.exitcode == 0:
+                    self._completed[index] = True
+                    logger.info('consumer process "%s" completed, it is not restarted', self.get_consumer_name(index))
+                    continue
+                if process is not None:
+                    if self._exit_times[index] == 0:
+                        self._exit_times[index] = time.time()
+                        logger.warning('consumer process "%s" exited with code %s, restart it in %s seconds',
+                                       self.get_consumer_name(index), process.exitcode, self.restart_interval)
+                    if time.time() - self._exit_times[index] < self.restart_interval:
+                        continue
+                self._exit_times[index] = 0
+                self._start_process(index)
+            self._stop_event.wait(1)
+
+    def start(self, join=False):
+        """
+        :param join: default False, if hold on until the group is stopped by Ctrl+C or shutdown, or all the
+            processes complete
+        :return:
+        """
+        self._supervisor = Thread(target=self._supervise)
+        self._supervisor.daemon = True
+        self._supervisor.start()
+
+        if join:
+            try:
+                while self._supervisor.is_alive():
+                    self._supervisor.join(timeout=60)
+            except KeyboardInterrupt:
+                logger.info("*** try to exit **** ")
+            self.shutdown()
+
+    def shutdown(self, timeout=None):
+        """ stop all the consumer processes, they save the checkpoints before exiting
+
+        :param timeout: seconds to wait for each process, default is None (wait until exited)
+        """
+        self.shut_down_flag = True
+        self._stop_event.set()
+        if self._supervisor is not None:
+            self._supervisor.join()
+        for process in self._processes:
+            if process is not None:
+                process.join(timeout)
+
+    def is_alive(self):
+        return any(process is not None and process.is_alive() for process in self._processes)
+
+    def get_pids(self):
+        return [process.pid if process is not None else None for process in self._processes]
@@ -0,0 +1,17 @@
+from typing import Any, Dict, List, Optional, Sequence
+from .config import LogHubConfig as LogHubConfig
+
+class ConsumerProcessGroup:
+    make_processor: Any
+    option: LogHubConfig
+    process_count: int
+    process_args: Sequence[Any]
+    process_kwargs: Dict[str, Any]
+    restart_interval: float
+    shut_down_flag: bool
+    def __init__(self, make_processor: Any, consumer_option: LogHubConfig, process_count: Optional[int] = ..., args: Optional[Sequence[Any]] = ..., kwargs: Optional[Dict[str, Any]] = ..., restart_interval: float = ..., mp_context: Any = ...) -> None: ...
+    def get_consumer_name(self, index: int) -> str: ...
+    def start(self, join: bool = False) -> None: ...
+    def shutdown(self, timeout: Optional[float] = ...) -> None: ...
+    def is_alive(self) -> bool: ...
+    def get_pids(self) -> List[Optional[int]]: ...
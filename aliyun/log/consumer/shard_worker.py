@@ -2,6 +2,7 @@
 
 import copy
 import logging
+from collections import deque
 from platform import processor
 import time
 
@@ -31,7 +32,9 @@ class ShardConsumerWorkerLoggerAdapter(logging.LoggerAdapter):
 
 class ShardConsumerWorker(object):
     def __init__(self, log_client, shard_id, consumer_name, processor, cursor_position, cursor_start_time,
-                 max_fetch_log_group_size=1000, executor=None, cursor_end_time=None, query=None, consume_processor=None):
+                 max_fetch_log_group_size=1000, executor=None, cursor_end_time=None, query=None, consume_processor=None,
+                 prefetch_depth=1, prefetch_max_bytes=64 * 1024 * 1024, on_task_done=None, checkpoint_aggregator=None,
+                 fetch_budget=None, idle_fetch_interval=2):
         self.log_client = log_client
         self.shard_id = shard_id
         self.consumer_name = consumer_name
@@ -40,9 +43,13 @@ class ShardConsumerWorker(object):
         self.cursor_end_time = cursor_end_time or None
         self.processor = processor
         self.checkpoint_tracker = ConsumerCheckpointTracker(self.log_client, self.consumer_name,
-                                                            self.shard_id)
+                                                            self.shard_id, aggregator=checkpoint_aggregator)
         self.executor = executor
+        # called in executor thread once a task of this shard is done, used to wake up the consumer worker
+        self.on_task_done = on_task_done
         self.max_fetch_log_group_size = max_fetch_log_group_size
+        # wait between two fetches of a shard without new data, i.e. data_fetch_interval of the worker
+        self.idle_fetch_interval = idle_fetch_interval
 
         self.consumer_status = ConsumerStatus.INITIALIZING
         self.current_task_exist = False
@@ -53,10 +60,19 @@ class ShardConsumerWorker(object):
         self.fetch_end_cursor = None
 
         self.shutdown = False
-        self.last_fetch_log_group = None
+        # fetched data waiting to be processed, fetching goes on until it's full
+        self.prefetch_depth = max(prefetch_depth, 1)
+        self.prefetch_max_bytes = prefetch_max_bytes
+        self.fetched_log_groups = deque()
+        self.fetched_size = 0
+        # bytes budget shared by all shards of the worker, fetched data is counted until it's processed
+        self.fetch_budget = fetch_budget
+        self.processing_size = 0
 
         self.last_log_error_time = 0
         self.last_fetch_time = 0
+        # don't generate fetch task before it, it's set by throttling or failed fetching
+        self.next_fetch_time = 0
         self.last_fetch_count = 0
         self.last_fetch_size = 0
         self.rawLogGroupCountBeforeQuery = 0
@@ -70,11 +86,33 @@ class ShardConsumerWorker(object):
         self.logger = ShardConsumerWorkerLoggerAdapter(
             logging.getLogger(__name__), {"shard_consumer_worker": self})
 
+    @property
+    def last_fetch_log_group(self):
+        """ the earliest fetched data not yet processed """
+        return self.fetched_log_groups[0] if self.fetched_log_groups else None
+
+    def is_prefetch_full(self):
+        return len(self.fetched_log_groups) >= self.prefetch_depth or self.fetched_size >= self.prefetch_max_bytes
+
+    def clear_fetched_log_groups(self):
+        if self.fetch_budget is not None:
+            self.fetch_budget.release(self.fetched_size)
+        self.fetched_log_groups.clear()
+        self.fetched_size = 0
+
+    def _release_processing_size(self):
+        if self.fetch_budget is not None and self.processing_size:
+            self.fetch_budget.release(self.processing_size)
+        self.processing_size = 0
+
     def consume(self):
         self.logger.debug('consumer start consuming')
         self.check_and_generate_next_task()
-        if self.consumer_status == ConsumerStatus.PROCESSING and self.last_fetch_log_group is None:
+        if self.consumer_status == ConsumerStatus.PROCESSING and not self.is_prefetch_full():
             self.fetch_data()
+            # the process task may be idle and wait for the data just fetched
+            if self.task_future is None and self.fetched_log_groups:
+                self.check_and_generate_next_task()
 
     @staticmethod
     # get future (if failed return None)
@@ -87,7 +125,16 @@ class ShardConsumerWorker(object):
                 traceback.print_exc()
         return None
 
+    def _submit(self, fn, *args, **kwargs):
+        future = self.executor.submit(fn, *args, **kwargs)
+        if self.on_task_done is not None:
+            future.add_done_callback(self.on_task_done)
+        return future
+
     def fetch_data(self):
+        if self.fetch_data_future is None and time.time() < self.next_fetch_time:
+            return
+
         # no task or it's done
         if self.fetch_data_future is None or self.fetch_data_future.done():
             task_result = self.get_task_result(self.fetch_data_future)
@@ -99,10 +146,15 @@ class ShardConsumerWorker(object):
 
                 self.last_success_fetch_time = time.time()
 
-                self.last_fetch_log_group = FetchedLogGroup(self.shard_id,
-                                                            task_result.get_data(),
-                                                            task_result.get_cursor(),
-                                                            task_result.get_log_group_count())
+                fetched_log_group = FetchedLogGroup(self.shard_id,
+                                                    task_result.get_data(),
+                                                    task_result.get_cursor(),
+                                                    task_result.get_log_group_count(),
+                                                    task_result.get_raw_size())
+                self.fetched_log_groups.append(fetched_log_group)
+                self.fetched_size += fetched_log_group.raw_size
+                if self.fetch_budget is not None:
+                    self.fetch_budget.acquire(fetched_log_group.raw_size)
 
                 self.next_fetch_cursor = task_result.get_cursor()
                 self.last_fetch_count = task_result.get_log_group_count()
@@ -131,15 +183,24 @@ class ShardConsumerWorker(object):
                     fetch_count = self.rawLogGroupCountBeforeQuery
 
                 # throttling control, similar as Java's SDK
+                fetch_interval = 0
                 if fetch_size < 1024 * 1024 and fetch_count < 100 and fetch_count < self.max_fetch_log_group_size:
-                    is_generate_fetch_task = (time.time() - self.last_fetch_time) > 0.5
+                    fetch_interval = 0.5
                 elif fetch_size < 2 * 1024 * 1024 and fetch_count < 500 and fetch_count < self.max_fetch_log_group_size:
-                    is_generate_fetch_task = (time.time() - self.last_fetch_time) > 0.2
+                    fetch_interval = 0.2
                 elif fetch_size < 4 * 1024 * 1024 and fetch_count < 1000 and fetch_count < self.max_fetch_log_group_size:
-                    is_generate_fetch_task = (time.time() - self.last_fetch_time) > 0.05
-                if is_generate_fetch_task:
+                    fetch_interval = 0.05
+                if fetch_count == 0 and self.last_success_fetch_time:
+                    # nothing new in the shard, don't poll it faster than the idle interval
+                    fetch_interval = max(fetch_interval, self.idle_fetch_interval)
+                if fetch_interval:
+                    is_generate_fetch_task = (time.time() - self.last_fetch_time) > fetch_interval
+                if self.fetch_budget is not None and self.fetch_budget.is_exhausted():
+                    # paused until some fetched data is processed, the worker is woken up by the process task
+                    self.fetch_data_future = None
+                elif is_generate_fetch_task:
                     self.last_fetch_time = time.time()
-                    self.fetch_data_future = self.executor.submit(
+                    self.fetch_data_future = self._submit(
                         consumer_fetch_task,
                         self.log_client,
                         self.preprocessor,
@@ -151,8 +212,11 @@ class ShardConsumerWorker(object):
                         consume_processor=self.consume_processor,
                     )
                 else:
+                    self.next_fetch_time = self.last_fetch_time + fetch_interval
                     self.fetch_data_future = None
             else:
+                # retry the failed fetching later
+                self.next_fetch_time = time.time() + 1
                 self.fetch_data_future = None
 
     def check_and_generate_next_task(self):
@@ -171,6 +235,7 @@ class ShardConsumerWorker(object):
 
             task_result = self.get_task_result(self.task_future)
             self.task_future = None
+            self._release_processing_size()
 
             if task_result is not None and task_result.get_exception() is None:
 
@@ -192,8 +257,8 @@ class ShardConsumerWorker(object):
                     process_task_result = task_result
                     roll_back_checkpoint = process_task_result.get_rollback_check_point()
                     if roll_back_checkpoint:
-                        self.last_fetch_log_group = None
-                        self.logger.info("user defined to roll-back check-point, cancel current fetching task")
+                        self.clear_fetched_log_groups()
+                        self.logger.info("user defined to roll-back check-point, drop prefetched data and cancel current fetching task")
                         self.cancel_current_fetch()
                         self.next_fetch_cursor = roll_back_checkpoint
 
@@ -213,27 +278,31 @@ class ShardConsumerWorker(object):
         """
         if self.consumer_status == ConsumerStatus.INITIALIZING:
             self.current_task_exist = True
-            self.task_future = self.executor.submit(consumer_initialize_task, self.processor, self.log_client,
-                                                    self.shard_id, self.cursor_position, self.cursor_start_time, self.cursor_end_time)
+            self.task_future = self._submit(consumer_initialize_task, self.processor, self.log_client,
+                                            self.shard_id, self.cursor_position, self.cursor_start_time, self.cursor_end_time)
 
         elif self.consumer_status == ConsumerStatus.PROCESSING:
-            if self.last_fetch_log_group is not None:
-                self.checkpoint_tracker.set_cursor(self.last_fetch_log_group.end_cursor)
-                self.current_task_exist = True
+            if self.fetched_log_groups:
+                log_group = self.fetched_log_groups.popleft()
+                self.fetched_size -= log_group.raw_size
+                self.processing_size = log_group.raw_size
 
-                log_group = self.last_fetch_log_group
-                self.last_fetch_log_group = None
+                self.checkpoint_tracker.set_cursor(log_group.end_cursor)
+                self.current_task_exist = True
 
-                if self.last_fetch_count > 0:
-                    self.task_future = self.executor.submit(consumer_process_task, self.processor,
-                                                            log_group.data,
-                                                            self.checkpoint_tracker)
+                if log_group.log_group_size > 0:
+                    self.task_future = self._submit(consumer_process_task, self.processor,
+                                                    log_group.data,
+                                                    self.checkpoint_tracker)
+                else:
+                    self._release_processing_size()
 
         elif self.consumer_status == ConsumerStatus.SHUTTING_DOWN:
             self.current_task_exist = True
             self.logger.info("start to cancel fetch job")
             self.cancel_current_fetch()
-            self.task_future = self.executor.submit(consumer_shutdown_task, self.processor, self.checkpoint_tracker)
+            self.clear_fetched_log_groups()
+            self.task_future = self._submit(consumer_shutdown_task, self.processor, self.checkpoint_tracker)
 
     def cancel_current_fetch(self):
         if self.fetch_data_future is not None:
@@ -266,7 +266,7 @@ def consumer_shutdown_task(processor, check_point_tracker):
         exception = None
 
     try:
-        check_point_tracker.get_check_point()
+        check_point_tracker.flush_pending_check_point()
     except Exception:
         logger.error('Failed to flush check point', exc_info=True)
 
@@ -3,11 +3,14 @@
 
 import logging
 import time
-from threading import Thread
+from threading import Event, Thread
 
+from .checkpoint_tracker import CheckpointAggregator
 from .consumer_client import ConsumerClient
+from .fetch_budget import FetchBudget
 
 from .heart_beat import ConsumerHeatBeat
+from ..connection_pool import DEFAULT_POOLSIZE
 from .shard_worker import ShardConsumerWorker
 from concurrent.futures import ThreadPoolExecutor
 
@@ -37,13 +40,19 @@ class ConsumerWorker(Thread):
                            consumer_option.consumer_name, consumer_option.securityToken,
                            credentials_refresher=consumer_option.credentials_refresher,
                            auth_version=consumer_option.auth_version, region=consumer_option.region,
-                           accept_compress_type=consumer_option.accept_compress_type)
+                           accept_compress_type=consumer_option.accept_compress_type,
+                           connection_pool_options=self._get_connection_pool_options(consumer_option))
         self.shut_down_flag = False
         self.logger = ConsumerWorkerLoggerAdapter(
             logging.getLogger(__name__), {"consumer_worker": self})
         self.shard_consumers = {}
+        # set when a task of any shard is done, or on shutdown, to run the next step without waiting
+        self._wake_event = Event()
 
         self.last_owned_consumer_finish_time = 0
+        self.fetch_budget = None
+        if consumer_option.max_in_flight_bytes:
+            self.fetch_budget = FetchBudget(consumer_option.max_in_flight_bytes)
 
         self.consumer_client.ensure_consumer_group_created(consumer_option.consumer_group_time_out, consumer_option.in_order)
         self.heart_beat = ConsumerHeatBeat(self.consumer_client, consumer_option.heartbeat_interval,
@@ -56,6 +65,24 @@ class ConsumerWorker(Thread):
             self.own_executor = True
             self._executor = ThreadPoolExecutor(max_workers=consumer_option.worker_pool_size)
 
+        self.checkpoint_aggregator = None
+        if consumer_option.checkpoint_commit_interval:
+            # commits are sent by the executor, a slow one doesn't block scheduling the tasks of other shards
+            self.checkpoint_aggregator = CheckpointAggregator(consumer_option.checkpoint_commit_interval,
+                                                              executor=self._executor)
+
+    @staticmethod
+    def _get_connection_pool_options(consumer_option):
+        if consumer_option.connection_pool_options is not None:
+            return consumer_option.connection_pool_options
+        # fetch tasks run in the executor threads, plus the heartbeat thread. the size of a shared executor is
+        # known only for ThreadPoolExecutor, other executors fall back to worker_pool_size
+        threads = None
+        if consumer_option.shared_executor is not None:
+            threads = getattr(consumer_option.shared_executor, '_max_workers', None)
+        threads = threads or consumer_option.worker_pool_size
+        return {'pool_maxsize': max(DEFAULT_POOLSIZE, threads + 1)}
+
     @property
     def executor(self):
         return self._executor
@@ -93,6 +120,7 @@ class ConsumerWorker(Thread):
         self.heart_beat.start()
 
         while not self.shut_down_flag:
+            self._wake_event.clear()
             held_shards = self.heart_beat.get_held_shards()
 
             last_fetch_time = time.time()
@@ -107,16 +135,19 @@ class ConsumerWorker(Thread):
 
                 shard_consumer.consume()
 
+            # commit before releasing shards, their checkpoints must be persisted before others take them
+            if self.checkpoint_aggregator is not None:
+                self.checkpoint_aggregator.commit()
             self.clean_shard_consumer(held_shards)
 
             if self._need_stop():
                 self.logger.info("all owned shards complete the tasks, owned shards: {0}".format(self.shard_consumers))
                 self.shutdown()
 
-            time_to_sleep = self.option.data_fetch_interval - (time.time() - last_fetch_time)
-            while time_to_sleep > 0 and not self.shut_down_flag:
-                time.sleep(min(time_to_sleep, 1))
-                time_to_sleep = self.option.data_fetch_interval - (time.time() - last_fetch_time)
+            # wait until any task is done, a throttled fetching is due, or data_fetch_interval at most
+            time_to_wait = self._get_time_to_wait(last_fetch_time)
+            if time_to_wait > 0 and not self.shut_down_flag:
+                self._wake_event.wait(time_to_wait)
 
         # # stopping worker, need to cleanup all existing shard consumer
         self.logger.info('consumer worker "{0}" try to cleanup consumers'.format(self.option.consumer_name))
@@ -129,6 +160,21 @@ class ConsumerWorker(Thread):
         else:
             self.logger.info('executor is shared, consumer worker "{0}" stopped'.format(self.option.consumer_name))
 
+    def _on_task_done(self, future):
+        self._wake_event.set()
+
+    def _get_time_to_wait(self, last_fetch_time):
+        now = time.time()
+        time_to_wait = self.option.data_fetch_interval - (now - last_fetch_time)
+        for consumer in self.shard_consumers.values():
+            if consumer.next_fetch_time > now:
+                time_to_wait = min(time_to_wait, consumer.next_fetch_time - now)
+        if self.checkpoint_aggregator is not None:
+            next_commit_time = self.checkpoint_aggregator.get_next_commit_time()
+            if next_commit_time is not None:
+                time_to_wait = min(time_to_wait, next_commit_time - now)
+        return time_to_wait
+
     def start(self, join=False):
         """
         when calling with join=True, must call it in main thread, or else, the Keyboard Interrupt won't be caputured.
@@ -157,6 +203,8 @@ class ConsumerWorker(Thread):
             else:
                 break   # all are shutdown, exit look
 
+        if self.checkpoint_aggregator is not None:
+            self.checkpoint_aggregator.commit(force=True)
         self.shard_consumers.clear()
 
     def clean_shard_consumer(self, owned_shards):
@@ -177,9 +225,22 @@ class ConsumerWorker(Thread):
 
     def shutdown(self):
         self.shut_down_flag = True
+        self._wake_event.set()
         self.heart_beat.shutdown()
         self.logger.info('get stop signal, start to stop consumer worker "{0}"'.format(self.option.consumer_name))
 
+    def get_checkpoint_stats(self):
+        """ metrics of batched checkpoint commits, None if checkpoint_commit_interval is not set """
+        if self.checkpoint_aggregator is None:
+            return None
+        return self.checkpoint_aggregator.get_stats()
+
+    def get_fetch_budget_stats(self):
+        """ usage and stalled time of the fetched data bytes budget, None if max_in_flight_bytes is not set """
+        if self.fetch_budget is None:
+            return None
+        return self.fetch_budget.get_stats()
+
     def _get_shard_consumer(self, shard_id):
         consumer = self.shard_consumers.get(shard_id, None)
         if consumer is not None:
@@ -199,6 +260,12 @@ class ConsumerWorker(Thread):
                                        cursor_end_time=self.option.cursor_end_time,
                                        max_fetch_log_group_size=self.option.max_fetch_log_group_size,
                                        query=self.option.query,
-                                       consume_processor=self.option.processor)
+                                       consume_processor=self.option.processor,
+                                       prefetch_depth=self.option.prefetch_depth,
+                                       prefetch_max_bytes=self.option.prefetch_max_bytes,
+                                       on_task_done=self._on_task_done,
+                                       checkpoint_aggregator=self.checkpoint_aggregator,
+                                       fetch_budget=self.fetch_budget,
+                                       idle_fetch_interval=self.option.data_fetch_interval)
         self.shard_consumers[shard_id] = consumer
         return consumer
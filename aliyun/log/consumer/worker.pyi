@@ -1,7 +1,9 @@
 import logging
 from typing import Any, Dict, MutableMapping, Optional, Sequence, Tuple
 from threading import Thread
+from .checkpoint_tracker import CheckpointAggregator as CheckpointAggregator
 from .config import LogHubConfig as LogHubConfig
+from .fetch_budget import FetchBudget as FetchBudget
 
 class ConsumerWorkerLoggerAdapter(logging.LoggerAdapter):
     def process(self, msg: Any, kwargs: MutableMapping[str, Any]) -> Tuple[Any, MutableMapping[str, Any]]: ...
@@ -18,6 +20,8 @@ class ConsumerWorker(Thread):
     last_owned_consumer_finish_time: float
     heart_beat: Any
     own_executor: bool
+    checkpoint_aggregator: Optional[CheckpointAggregator]
+    fetch_budget: Optional[FetchBudget]
     def __init__(self, make_processor: Any, consumer_option: LogHubConfig, args: Optional[Sequence[Any]] = ..., kwargs: Optional[Dict[str, Any]] = ...) -> None: ...
     @property
     def executor(self) -> Any: ...
@@ -26,3 +30,5 @@ class ConsumerWorker(Thread):
     def shutdown_and_wait(self) -> None: ...
     def clean_shard_consumer(self, owned_shards: Sequence[Any]) -> None: ...
     def shutdown(self) -> None: ...
+    def get_checkpoint_stats(self) -> Optional[Dict[str, Any]]: ...
+    def get_fetch_budget_stats(self) -> Optional[Dict[str, Any]]: ...
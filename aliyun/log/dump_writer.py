@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import json
+import os
+import time
+
+import six
+
+from .compress import zstd_compress
+from .job_checkpoint import read_json, write_json_atomic
+from .logexception import LogException
+
+MANIFEST_SUFFIX = '.manifest'
+
+
+class LogDumpWriter(object):
+    """ Write logs as json lines into a file through one handle and an in-memory buffer, optionally compressed.
+    checkpoint() makes the written data durable and records it with the cursor to continue in a manifest file
+    (file_path + '.manifest'), writing is continued from the last checkpoint when it's created with resume=True.
+
+    :type file_path: string
+    :param file_path: the output file
+
+    :type compress_format: string
+    :param compress_format: None (plain text), 'gzip' or 'zstd'. the data of each checkpoint is a gzip member
+        or zstd frames, so the file is always complete at a checkpoint.
+
+    :type encoder_cls: class
+    :param encoder_cls: json encoder class, created once for all logs, default is json.JSONEncoder
+
+    :type ensure_ascii: bool
+    :param ensure_ascii: if escape the non-ASCII, default is True
+
+    :type buffer_size: int
+    :param buffer_size: bytes buffered before writing to the file, default is 1MB
+
+    :type checkpoint_interval: int
+    :param checkpoint_interval: seconds between checkpoints done by maybe_checkpoint, default is 10
+
+    :type resume: bool
+    :param resume: continue from the last checkpoint if the manifest exists, data written after it is discarded
+    """
+
+    def __init__(self, file_path, compress_format=None, encoder_cls=None, ensure_ascii=True, buffer_size=1024 * 1024,
+                 checkpoint_interval=10, resume=False):
+        if compress_format not in (None, 'gzip', 'zstd'):
+            raise LogException('InvalidParameter', 'unsupported compress format: {0}'.format(compress_format))
+        self.file_path = os.path.expanduser(file_path)
+        self.manifest_path = self.file_path + MANIFEST_SUFFIX
+        self.compress_format = compress_format
+        self.encoder = (encoder_cls or json.JSONEncoder)(ensure_ascii=ensure_ascii)
+        self.buffer_size = buffer_size
+        self.checkpoint_interval = checkpoint_interval
+        self.count = 0
+        self.last_checkpoint_time = time.time()
+
+        self.manifest = self.read_manifest(self.file_path) if resume else None
+        self._file = open(self.file_path, 'ab')
+        if self.manifest is not None:
+            # drop the data written after the last checkpoint
+            self._file.truncate(self.manifest['offset'])
+            self._file.seek(self.manifest['offset'])
+            self.count = self.manifest['count']
+        self._gzip = None
+        self._buffer = []
+        self._buffered_size = 0
+
+    @staticmethod
+    def read_manifest(file_path):
+        """ read the manifest of the last checkpoint of file_path
+
+        :return: dict, None if there's no manifest
+        """
+        return read_json(os.path.expanduser(file_path) + MANIFEST_SUFFIX)
+
+    def write_logs(self, logs):
+        """ write logs as json lines
+
+        :type logs: list
+        :param logs: list of dict
+        """
+        encode = self.encoder.encode
+        lines = []
+        for log in logs:
+            line = encode(log)
+            lines.append(line.encode('utf8') if isinstance(line, six.text_type) else line)
+        if not lines:
+            return
+        lines.append(b'')
+        data = b'\n'.join(lines)
+        self._buffer.append(data)
+        self._buffered_size += len(data)
+        self.count += len(lines) - 1
+        if self._buffered_size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """ write the buffered data to the file """
+        if not self._buffer:
+            return
+        data = b''.join(self._buffer)
+        self._buffer = []
+        self._buffered_size = 0
+        if self.compress_format == 'gzip':
+            if self._gzip is None:
+                self._gzip = gzip.GzipFile(fileobj=self._file, mode='wb')
+            self._gzip.write(data)
+        elif self.compress_format == 'zstd':
+            self._file.write(zstd_compress(data))
+        else:
+            self._file.write(data)
+
+    def checkpoint(self, **state):
+        """ flush and fsync the written data, then record it with state (e.g. next_cursor) into the manifest
+
+        :param state: json serializable values recorded in the manifest
+        """
+        self.flush()
+        if self._gzip is not None:
+            # complete the gzip member, the following data goes to a new member
+            self._gzip.close()
+            self._gzip = None
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        manifest = dict(state, offset=self._file.tell(), count=self.count)
+        write_json_atomic(self.manifest_path, manifest)
+        self.manifest = manifest
+        self.last_checkpoint_time = time.time()
+
+    def maybe_checkpoint(self, **state):
+        """ checkpoint if checkpoint_interval is passed since the last one """
+        if time.time() - self.last_checkpoint_time >= self.checkpoint_interval:
+            self.checkpoint(**state)
+
+    def close(self):
+        """ close the file, data written after the last checkpoint is flushed but not recorded in the manifest """
+        self.flush()
+        if self._gzip is not None:
+            self._gzip.close()
+            self._gzip = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -6,7 +6,8 @@ import pandas as pd
 from IPython.display import display, clear_output
 import re, time, threading, datetime
 from pandas import DataFrame
-from aliyun.log import LogClient, LogException
+from aliyun.log import LogClient, LogException, PullLogResponse
+from aliyun.log.columnar import LogColumns, TIME_NS_COLUMN
 from concurrent.futures import ThreadPoolExecutor as PoolExecutor, as_completed
 import multiprocessing
 import six
@@ -105,11 +106,11 @@ class MyMagics(Magics):
     @staticmethod
     def pull_worker(client, project_name, logstore_name, from_time, to_time, shard_id):
         res = client.pull_log(project_name, logstore_name, shard_id, from_time, to_time)
-        result = []
+        result = LogColumns()
         next_cursor = 'as from_time configured'
         try:
             for data in res:
-                result.extend(data.get_flatten_logs_json(decode_bytes=True))
+                result.extend(data.get_columns())
                 next_cursor = data.next_cursor
         except Exception as ex:
             print("dump log failed: task info {0} failed to copy data to target, next cursor: {1} detail: {2}".
@@ -128,7 +129,7 @@ class MyMagics(Magics):
         target_shards = current_shards
         worker_size = min(cpu_count, len(target_shards))
 
-        result = []
+        result = LogColumns()
         with PoolExecutor(max_workers=worker_size) as pool:
             futures = [pool.submit(MyMagics.pull_worker, client, project_name, logstore_name, from_time, to_time,
                                    shard_id=shard)
@@ -232,7 +233,16 @@ class MyMagics(Magics):
         print(u"从日志服务拉取数据(日志插入时间：{0} ~ {1})，结果将保存到变量{2}中，请稍等……".format(from_time, to_time, DEFAULT_DF_NAME))
         result, logs = self.pull_log_all(self.client(), g_default_project, g_default_logstore, from_time, to_time)
 
-        df1 = pd.DataFrame(logs)
+        df1 = logs.to_pandas()
+        # the nanosecond part is dropped on purpose, __time__ is the index of the frame
+        df1.drop(columns=[TIME_NS_COLUMN], errors='ignore', inplace=True)
+        # keep the frame of the flatten logs: object columns instead of categorical ones, bytes decoded
+        df1.columns = [PullLogResponse._b2u(name) for name in df1.columns]
+        for name in df1.columns:
+            if df1[name].dtype.name == 'category':
+                df1[name] = df1[name].astype(object)
+            if df1[name].dtype == object:
+                df1[name] = df1[name].map(PullLogResponse._b2u)
 
         # change time to date time
         if "__time__" in df1:
@@ -6,10 +6,13 @@
 
 from .logresponse import LogResponse
 from .queriedlog import QueriedLog
+from .columnar import LogColumns, TIME_COLUMN, SOURCE_COLUMN
 from .logexception import LogException
 from .util import Util
 from enum import Enum
+from itertools import chain
 import json
+import six
 
 class GetLogsResponse(LogResponse):
     """ The response of the GetLog API from log.
@@ -33,9 +36,10 @@ class GetLogsResponse(LogResponse):
         try:
             self._meta = GetLogsResponse.GetLogsResponseMeta(
                 resp.get("meta"))
-            self._logs = []
-            for log in resp["data"]:
-                self._logs.append(QueriedLog._from_dict(log))
+            # QueriedLog are created on the first get_logs, rows are enough for iter_rows and get_columns
+            self._rows = resp["data"]
+            self._logs = None
+            self._own_rows = False
 
         except Exception as ex:
             raise LogException("InvalidResponse",
@@ -101,8 +105,48 @@ class GetLogsResponse(LogResponse):
 
         :return: QueriedLog list, all log data
         """
+        if self._logs is None:
+            self._logs = [QueriedLog._from_dict(row) for row in self._rows]
         return self._logs
 
+    def iter_logs(self):
+        """ Iterate the logs of the response, unlike get_logs the QueriedLog are not kept by the response
+
+        :return: QueriedLog iterator
+        """
+        if self._logs is not None:
+            return iter(self._logs)
+        return (QueriedLog._from_dict(row) for row in self._rows)
+
+    def iter_rows(self):
+        """ Iterate the logs as the dicts returned by the server, including __time__ and __source__,
+        no QueriedLog is created. don't modify them
+
+        :return: dict iterator
+        """
+        if self._logs is not None:
+            return (log._to_dict() for log in self._logs)
+        return iter(self._rows)
+
+    def get_columns(self):
+        """ Get all logs in columnar layout, __source__ and __topic__ are dictionary encoded
+
+        :return: LogColumns, e.g. resp.get_columns().to_pandas()
+        """
+        columns = LogColumns()
+        if self._logs is not None:
+            columns.add_rows(chain(((TIME_COLUMN, log.get_time()), (SOURCE_COLUMN, log.get_source())),
+                                   six.iteritems(log.get_contents()))
+                             for log in self._logs)
+            return columns
+
+        # keep __time__ and __source__ as the first columns, __source__ is '' if missing like QueriedLog
+        columns._column(TIME_COLUMN)
+        columns._column(SOURCE_COLUMN)
+        columns.add_rows(row if SOURCE_COLUMN in row else chain(six.iteritems(row), ((SOURCE_COLUMN, ''),))
+                         for row in self._rows)
+        return columns
+
     def get_processed_rows(self):
         """ Get processed rows from the response
 
@@ -224,7 +268,15 @@ class GetLogsResponse(LogResponse):
         if other is None:
             return self
         self.get_meta().merge(other.get_meta())
-        self.get_logs().extend(other.get_logs())
+        if not self._own_rows:
+            # rows of the response body are not modified
+            self._rows = list(self._rows)
+            self._own_rows = True
+        if self._logs is None and other._logs is None:
+            self._rows.extend(other._rows)
+        else:
+            self.get_logs().extend(other.get_logs())
+            self._rows.extend(other.iter_rows())
         return self
 
     class GetLogsResponseMeta():
@@ -1,8 +1,9 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from enum import Enum
 
 from .logresponse import LogResponse
 from .queriedlog import QueriedLog
+from .columnar import LogColumns
 
 class GetLogsResponse(LogResponse):
     class QueryMode(Enum):
@@ -14,6 +15,9 @@ class GetLogsResponse(LogResponse):
     def get_count(self) -> int: ...
     def is_completed(self) -> bool: ...
     def get_logs(self) -> List[QueriedLog]: ...
+    def iter_logs(self) -> Iterator[QueriedLog]: ...
+    def iter_rows(self) -> Iterator[Dict[str, Any]]: ...
+    def get_columns(self) -> LogColumns: ...
     def get_processed_rows(self) -> int: ...
     def get_elapsed_mills(self) -> int: ...
     def get_has_sql(self) -> bool: ...
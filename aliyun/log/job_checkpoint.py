@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import errno
+import json
+import os
+
+
+def write_json_atomic(path, data):
+    """ write data as json into path via a fsynced temp file and rename, so path is always complete """
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    if os.name == 'nt' and os.path.exists(path):
+        os.remove(path)
+    os.rename(temp_path, path)
+
+
+def read_json(path):
+    """ read json from path, None if it doesn't exist """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+class ShardCheckpointStore(object):
+    """ On-disk checkpoints of a batch job over shards, e.g. copy_data or transform_data, one file per shard in
+    the directory recording the cursor to continue, the end cursor and the counts done so far.
+    use a separate directory for each job.
+
+    :type directory: string
+    :param directory: directory of the checkpoint files, created if not exists
+    """
+
+    def __init__(self, directory):
+        self.directory = os.path.expanduser(directory)
+        try:
+            os.makedirs(self.directory)
+        except OSError as ex:
+            # created by another worker process
+            if ex.errno != errno.EEXIST or not os.path.isdir(self.directory):
+                raise
+
+    def _path(self, shard_id):
+        return os.path.join(self.directory, 'shard_{0}.json'.format(shard_id))
+
+    def load(self, shard_id):
+        """ get the checkpoint of the shard
+
+        :return: dict with next_cursor, end_cursor, completed and counts, None if there's no checkpoint
+        """
+        return read_json(self._path(shard_id))
+
+    def save(self, shard_id, next_cursor, end_cursor, completed=False, **counts):
+        """ save the checkpoint of the shard, the data before next_cursor must be committed
+
+        :type shard_id: int
+        :param shard_id: shard id
+
+        :type next_cursor: string
+        :param next_cursor: the cursor to continue
+
+        :type end_cursor: string
+        :param end_cursor: the end cursor of the job
+
+        :type completed: bool
+        :param completed: if the shard is done
+
+        :param counts: counts done so far, e.g. count=100
+        """
+        checkpoint = dict(counts, next_cursor=next_cursor, end_cursor=end_cursor, completed=completed)
+        write_json_atomic(self._path(shard_id), checkpoint)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+import six
+
+from .logexception import LogException
+
+JSON_BACKENDS = ('json', 'orjson', 'ujson')
+
+_backend_name = 'json'
+_loads = json.loads
+
+
+def _import_backend(name):
+    if name == 'json':
+        return json.loads
+    try:
+        if name == 'orjson':
+            import orjson
+            return orjson.loads
+        import ujson
+        return ujson.loads
+    except ImportError:
+        raise LogException('MissingDependency',
+                           'json backend {0} is not installed, install it via "pip install {0}"'.format(name))
+
+
+def set_json_backend(backend='auto'):
+    """ set the library parsing the json responses of LogClient, it takes a visible share of the cpu when getting
+    a lot of logs via get_log/get_logs. orjson and ujson are several times faster than the standard json,
+    install them via "pip install orjson"
+
+    :type backend: string
+    :param backend: "json" (the standard library, default), "orjson", "ujson", or "auto" to use the fastest
+        installed one
+
+    :return: string, name of the backend in use
+    """
+    global _backend_name, _loads
+    if backend == 'auto':
+        for name in ('orjson', 'ujson'):
+            try:
+                return set_json_backend(name)
+            except LogException:
+                continue
+        backend = 'json'
+    if backend not in JSON_BACKENDS:
+        raise LogException('InvalidParameter', 'json backend should be one of {0}, auto: {1}'
+                           .format(', '.join(JSON_BACKENDS), backend))
+
+    _loads = _import_backend(backend)
+    _backend_name = backend
+    return backend
+
+
+def get_json_backend():
+    """ name of the json backend in use """
+    return _backend_name
+
+
+def loads(data):
+    """ parse the json text or utf-8 bytes, the invalid utf-8 bytes are ignored """
+    if isinstance(data, six.binary_type):
+        if _backend_name == 'orjson':
+            try:
+                return _loads(data)
+            except ValueError:
+                pass
+        data = data.decode('utf8', 'ignore')
+    return _loads(data)
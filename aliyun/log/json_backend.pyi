@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+from typing import Any, Tuple, Union
+
+JSON_BACKENDS: Tuple[str, ...]
+
+def set_json_backend(backend: str = ...) -> str: ...
+def get_json_backend() -> str: ...
+def loads(data: Union[str, bytes]) -> Any: ...
@@ -39,9 +39,12 @@ from .ingestion_response import *
 from .sql_instance_response import *
 from .listlogstoresresponse import ListLogstoresResponse
 from .listtopicsresponse import ListTopicsResponse
-from .logclient_operator import copy_project, list_more, query_more, pull_log_dump, copy_logstore, copy_data, \
+from .logclient_operator import copy_project, list_more, query_more, query_parallel, pull_log_dump, query_log_dump, copy_logstore, copy_data, \
     get_resource_usage, arrange_shard, transform_data, copy_dashboard, copy_alert
 from .logexception import LogException
+from .retry_policy import RetryPolicy
+from .json_backend import loads as json_loads
+from .connection_pool import LogHTTPAdapter, build_socket_options, DEFAULT_POOLSIZE, DEFAULT_POOLBLOCK
 from .logstore_config_response import *
 from .substore_config_response import *
 from .logtail_config_response import *
@@ -77,6 +80,7 @@ from .export_response import *
 from .common_response import *
 from .auth import *
 from .compress import CompressType, Compressor
+from .loggroup_encoder import encode_log_group
 from .metering_mode_response import GetLogStoreMeteringModeResponse, \
     GetMetricStoreMeteringModeResponse, UpdateLogStoreMeteringModeResponse, \
         UpdateMetricStoreMeteringModeResponse
@@ -189,6 +193,12 @@ class LogClient(object):
         self._get_logs_v2_enabled = True
         self._session = requests.Session()
         self._enable_keep_alive = True
+        self._pool_options = {}
+        self.set_connection_pool()
+        self._retry_policy = RetryPolicy()
+        self._sign_payload = True
+        self._compress_type = None
+        self._compress_levels = {}
 
     def _replace_credentials(self):
         delta = time.time() - self._last_refresh
@@ -222,6 +232,136 @@ class LogClient(object):
     def timeout(self, value):
         self._timeout = value
 
+    def set_connection_pool(self, pool_connections=None, pool_maxsize=None, pool_block=None, tcp_keepalive=None,
+                            socket_send_buffer=None, socket_recv_buffer=None):
+        """
+        configure the connection pools of the client, a pool is kept for each project host. the options not passed
+        keep their current values. call it before sending requests, the current pools are closed.
+
+        :type pool_connections: int
+        :param pool_connections: count of the project hosts whose pools are cached, default is 10. set it no less than the projects accessed by the client
+
+        :type pool_maxsize: int
+        :param pool_maxsize: connections kept in the pool of a project host, default is 10. set it no less than the threads sharing the client, or the extra connections are discarded after use and reconnected later
+
+        :type pool_block: bool
+        :param pool_block: wait for a free connection instead of creating an extra one when the pool is used up, default is False
+
+        :type tcp_keepalive: bool/int
+        :param tcp_keepalive: enable TCP keepalive on the connections, an int is the idle seconds before the probes (60 if True), default is None (system default)
+
+        :type socket_send_buffer: int
+        :param socket_send_buffer: SO_SNDBUF of the connections in bytes, default is None (system default)
+
+        :type socket_recv_buffer: int
+        :param socket_recv_buffer: SO_RCVBUF of the connections in bytes, default is None (system default)
+
+        :return: None
+        """
+        for name, value in (('pool_connections', pool_connections), ('pool_maxsize', pool_maxsize),
+                            ('pool_block', pool_block), ('tcp_keepalive', tcp_keepalive),
+                            ('socket_send_buffer', socket_send_buffer), ('socket_recv_buffer', socket_recv_buffer)):
+            if value is not None:
+                self._pool_options[name] = value
+        options = self._pool_options
+        adapter = LogHTTPAdapter(pool_connections=options.get('pool_connections', DEFAULT_POOLSIZE),
+                                 pool_maxsize=options.get('pool_maxsize', DEFAULT_POOLSIZE),
+                                 pool_block=options.get('pool_block', DEFAULT_POOLBLOCK),
+                                 socket_options=build_socket_options(options.get('tcp_keepalive'),
+                                                                     options.get('socket_send_buffer'),
+                                                                     options.get('socket_recv_buffer')))
+        old_adapters = [self._session.adapters.get(prefix) for prefix in ('http://', 'https://')]
+        for prefix in ('http://', 'https://'):
+            self._session.mount(prefix, adapter)
+        for old_adapter in old_adapters:
+            if old_adapter is not None:
+                old_adapter.close()
+
+    def get_connection_pool_stats(self):
+        """
+        get the usage of the connection pools by host, it's empty when keep alive is disabled
+
+        :return: dict of "scheme://host:port" to {"connections": connections created, "requests": requests sent, "idle": connections idle in the pool, "maxsize": maximum connections kept}
+        """
+        stats = {}
+        if not self._enable_keep_alive:
+            return stats
+        for adapter in set(self._session.adapters.values()):
+            if isinstance(adapter, LogHTTPAdapter):
+                stats.update(adapter.get_pool_stats())
+        return stats
+
+    def set_retry_policy(self, retry_policy):
+        """
+        set the policy deciding if and when a failed request is retried
+
+        :type retry_policy: RetryPolicy
+        :param retry_policy: the retry policy, e.g. RetryPolicy(max_attempts=5, retry_budget=100)
+
+        :return: None
+        """
+        self._retry_policy = retry_policy
+
+    def get_retry_policy(self):
+        """
+        get the policy deciding if and when a failed request is retried
+
+        :return: RetryPolicy
+        """
+        return self._retry_policy
+
+    def get_retry_stats(self):
+        """
+        get the counters of the retries of the client
+
+        :return: dict, see RetryPolicy.get_stats
+        """
+        return self._retry_policy.get_stats()
+
+    def set_compression(self, compress_type=None, level=None):
+        """
+        set the compression of put_log_raw and put_logs, the compress_type of PutLogsRequest takes precedence.
+        e.g. set_compression('zstd', 3) cuts the bandwidth of the cross region writes more than lz4 with more cpu
+
+        :type compress_type: string
+        :param compress_type: lz4 (default) or zstd, zstd requires "pip install zstandard" (or zstd)
+
+        :type level: int
+        :param level: compression level of compress_type, default is the one of the codec. lz4: 1~12 for the high
+            compression mode, negative for the fast mode. zstd: 1~22, negative for the faster ones, default is 1
+
+        :return: None
+        """
+        if compress_type not in (None, 'lz4', 'zstd'):
+            raise LogException('InvalidParameter', 'compress_type should be lz4 or zstd: {0}'.format(compress_type))
+        self._compress_type = CompressType.from_nullable_str(compress_type)
+        if level is None:
+            self._compress_levels.pop(str(self._compress_type), None)
+        else:
+            self._compress_levels[str(self._compress_type)] = level
+
+    def _compress_body(self, body, headers, compress_type=None, level=None):
+        """ compress body with the compress type and level of the request, or the ones set to the client """
+        compress_type = CompressType.from_nullable_str(compress_type) if compress_type else \
+            (self._compress_type or CompressType.default_compress_type())
+        if level is None:
+            level = self._compress_levels.get(str(compress_type))
+        headers['x-log-compresstype'] = str(compress_type)
+        return Compressor.compress(body, compress_type, level)
+
+    def set_sign_payload(self, sign_payload):
+        """
+        set if the request body is covered by the signature (Content-MD5 of V1, x-log-content-sha256 of V4),
+        default is True. turning it off saves hashing the large bodies of put_logs, but only do it where the server
+        accepts unsigned bodies and over https
+
+        :type sign_payload: bool
+        :param sign_payload: sign the request body or not
+
+        :return: None
+        """
+        self._sign_payload = sign_payload
+
     def set_user_agent(self, user_agent):
         """
         set user agent
@@ -262,14 +402,13 @@ class LogClient(object):
         if not resp_body:
             return None
         try:
-            if isinstance(resp_body, six.binary_type):
-                return json.loads(resp_body.decode('utf8', "ignore"))
-
-            return json.loads(resp_body)
+            result = json_loads(resp_body)
         except Exception as ex:
             raise LogException('BadResponse',
                                'Bad json format:\n"%s"' % resp_body + '\n' + repr(ex),
                                requestId, resp_status, resp_header, resp_body)
+        # json has no bytes on Py3, only Py2 needs converting the unicode of it
+        return Util.convert_unicode_to_str(result) if six.PY2 else result
 
     def _get_http_sender(self, method):
         if self._enable_keep_alive:
@@ -287,6 +426,10 @@ class LogClient(object):
 
     def _sendRequest(self, method, url, params, body, headers, respons_body_type='json'):
         (resp_status, resp_body, resp_header) = self._getHttpResponse(method, url, params, body, headers)
+        return self._handle_response(resp_status, resp_body, resp_header, respons_body_type)
+
+    @staticmethod
+    def _handle_response(resp_status, resp_body, resp_header, respons_body_type='json'):
         header = {}
         for key, value in resp_header.items():
             header[key] = value
@@ -295,14 +438,12 @@ class LogClient(object):
 
         if resp_status == 200:
             if respons_body_type == 'json':
-                exJson = self._loadJson(resp_status, resp_header, resp_body, requestId)
-                exJson = Util.convert_unicode_to_str(exJson)
+                exJson = LogClient._loadJson(resp_status, resp_header, resp_body, requestId)
                 return exJson, header
             else:
                 return resp_body, header
 
-        exJson = self._loadJson(resp_status, resp_header, resp_body, requestId)
-        exJson = Util.convert_unicode_to_str(exJson)
+        exJson = LogClient._loadJson(resp_status, resp_header, resp_body, requestId)
         if exJson is None:
             raise LogException('LogRequestError',
                                'Request is failed, got None response while status code is ' + str(resp_status) + '.',
@@ -317,7 +458,8 @@ class LogClient(object):
                                'Request is failed. Http code is ' + str(resp_status) + exJson, requestId,
                                resp_status, resp_header, resp_body)
 
-    def _send(self, method, project, body, resource, params, headers, respons_body_type='json', compute_content_hash=True):
+    def _prepare_request(self, project, body, resource, headers):
+        """ fill the common headers and return the full url of the request """
         if body:
             headers['Content-Length'] = str(len(body))
         else:
@@ -335,31 +477,74 @@ class LogClient(object):
         else:
             headers['Host'] = self._logHost
 
-        retry_times = range(10) if 'log-cli-v-' not in self._user_agent else cycle(range(10))
+        return url + resource
+
+    def _get_content_hash(self, body, compute_content_hash=True):
+        """ digest of the body to sign, computed once for all the retries """
+        if not (body and compute_content_hash and self._sign_payload):
+            return None
+        return self._auth.get_content_hash(body)
+
+    def _sign_request(self, method, resource, params, headers, body, compute_content_hash=True, content_hash=None):
+        """ sign a copy of headers and params, so that each retry is signed freshly """
+        headers2 = copy(headers)
+        params2 = copy(params)
+        if self._securityToken:
+            headers2["x-acs-security-token"] = self._securityToken
+        self._auth.sign_request(method, resource, params2, headers2, body,
+                                compute_content_hash=compute_content_hash and self._sign_payload,
+                                content_hash=content_hash)
+        return headers2, params2
+
+    def _get_retry_times(self):
+        max_attempts = self._retry_policy.max_attempts
+        return range(max_attempts) if 'log-cli-v-' not in self._user_agent else cycle(range(max_attempts))
+
+    def _get_retry_delay(self, ex, attempt, retryable=None):
+        """ seconds to wait before retrying, None if it's the last attempt or the error is not retried.
+        the cli keeps cycling the attempts, so it never reaches the last one
+        """
+        if 'log-cli-v-' not in self._user_agent and attempt + 1 >= self._retry_policy.max_attempts:
+            return None
+        return self._retry_policy.get_delay(ex, attempt, retryable=retryable)
+
+    @staticmethod
+    def _is_retryable_error(ex):
+        return RetryPolicy.is_retryable_error(ex)
+
+    def _need_refresh_credentials(self, ex):
+        if not (self._credentials_auto_refresher and
+                _is_auth_err(ex.resp_status, ex.get_error_code(), ex.get_error_message())):
+            return False
+
+        if ex.get_error_code() not in ("SecurityToken.Expired", "SecurityTokenExpired"):
+            logger.warning(
+                "request with authentication error",
+                exc_info=True,
+                extra={"error_code": "AuthenticationError"},
+            )
+        return True
+
+    def _send(self, method, project, body, resource, params, headers, respons_body_type='json', compute_content_hash=True):
+        url = self._prepare_request(project, body, resource, headers)
+        content_hash = self._get_content_hash(body, compute_content_hash)
+
         last_err = None
-        url = url + resource
-        for _ in retry_times:
+        for attempt in self._get_retry_times():
             try:
-                headers2 = copy(headers)
-                params2 = copy(params)
-                if self._securityToken:
-                    headers2["x-acs-security-token"] = self._securityToken
-                self._auth.sign_request(method, resource, params2, headers2, body, compute_content_hash=compute_content_hash)
-                return self._sendRequest(method, url, params2, body, headers2, respons_body_type)
+                headers2, params2 = self._sign_request(method, resource, params, headers, body,
+                                                       compute_content_hash=compute_content_hash,
+                                                       content_hash=content_hash)
+                result = self._sendRequest(method, url, params2, body, headers2, respons_body_type)
+                self._retry_policy.on_success()
+                return result
             except LogException as ex:
                 last_err = ex
-                if ex.get_error_code() in ('InternalServerError', 'RequestTimeout') or ex.resp_status >= 500\
-                        or (ex.get_error_code() == 'LogRequestError'
-                            and 'httpconnectionpool' in ex.get_error_message().lower()):
-                    time.sleep(1)
+                delay = self._get_retry_delay(ex, attempt)
+                if delay is not None:
+                    time.sleep(delay)
                     continue
-                elif self._credentials_auto_refresher and _is_auth_err(ex.resp_status, ex.get_error_code(), ex.get_error_message()):
-                    if ex.get_error_code() not in ("SecurityToken.Expired", "SecurityTokenExpired"):
-                        logger.warning(
-                            "request with authentication error",
-                            exc_info=True,
-                            extra={"error_code": "AuthenticationError"},
-                        )
+                elif self._need_refresh_credentials(ex):
                     self._replace_credentials()
                     continue
                 raise
@@ -402,7 +587,7 @@ class LogClient(object):
         :param logstore: the logstore name
 
         :type log_group: LogGroup
-        :param log_group: log group structure
+        :param log_group: log group structure, or the serialized LogGroup bytes to send as they are
 
         :type compress: boolean
         :param compress: compress or not, by default is True
@@ -411,22 +596,23 @@ class LogClient(object):
 
         :raise: LogException
         """
-        body = log_group.SerializeToString()
+        (resource, params, headers, body) = self._build_put_log_raw_request(logstore, log_group, compress)
+        (resp, header) = self._send('POST', project, body, resource, params, headers)
+
+        return PutLogsResponse(header, resp)
+
+    def _build_put_log_raw_request(self, logstore, log_group, compress=None):
+        body = log_group if isinstance(log_group, bytes) else log_group.SerializeToString()
         raw_body_size = len(body)
         headers = {'x-log-bodyrawsize': str(raw_body_size), 'Content-Type': 'application/x-protobuf'}
 
         need_compress = compress is None or compress
         if need_compress:
-            compress_type = CompressType.default_compress_type()
-            headers['x-log-compresstype'] = str(compress_type)
-            body = Compressor.compress(body, compress_type)
+            body = self._compress_body(body, headers)
 
         params = {}
         resource = '/logstores/' + logstore + "/shards/lb"
-
-        (resp, header) = self._send('POST', project, body, resource, params, headers)
-
-        return PutLogsResponse(header, resp)
+        return resource, params, headers, body
 
     def put_logs(self, request):
         """ Put logs to log service. up to 512000 logs up to 10MB size
@@ -439,59 +625,37 @@ class LogClient(object):
 
         :raise: LogException
         """
+        (resource, params, headers, body) = self._build_put_logs_request(request)
+        (resp, header) = self._send('POST', request.get_project(), body, resource, params, headers)
+        return PutLogsResponse(header, resp)
+
+    def _build_put_logs_request(self, request):
         if len(request.get_log_items()) > 512000:
             raise LogException('InvalidLogSize',
                                "logItems' length exceeds maximum limitation: 512000 lines. now: {0}".format(
                                    len(request.get_log_items())))
-        logGroup = LogGroup()
-        logGroup.Topic = request.get_topic()
-        if request.get_source():
-            logGroup.Source = request.get_source()
-        else:
+        source = request.get_source()
+        if not source:
             if self._source == '127.0.0.1':
                 self._source = Util.get_host_ip(request.get_project() + '.' + self._logHost)
-            logGroup.Source = self._source
-        for logItem in request.get_log_items():
-            log = logGroup.Logs.add()
-            log.Time = logItem.get_time()
-            log.Time_ns = logItem.get_time_nano_part()
-            contents = logItem.get_contents()
-            for key, value in contents:
-                content = log.Contents.add()
-                content.Key = self._get_unicode(key)
-                content.Value = self._get_binary(value)
-        if request.get_log_tags() is not None:
-            tags = request.get_log_tags()
-            for key, value in tags:
-                pb_tag = logGroup.LogTags.add()
-                pb_tag.Key = key
-                pb_tag.Value = value
-        body = logGroup.SerializeToString()
-
-        if len(body) > 10 * 1024 * 1024:  # 10 MB
-            raise LogException('InvalidLogSize',
-                               "logItems' size exceeds maximum limitation: 10 MB. now: {0} MB.".format(
-                                   len(body) / 1024.0 / 1024))
+            source = self._source
+        body = encode_log_group(request.get_log_items(), request.get_topic(), source, request.get_log_tags())
 
         headers = {'x-log-bodyrawsize': str(len(body)), 'Content-Type': 'application/x-protobuf'}
         
         need_compress = request.get_compress() is None or request.get_compress()
         if need_compress:
-            compress_type = CompressType.from_nullable_str(request.get_compress_type())
-            headers['x-log-compresstype'] = str(compress_type)
-            body = Compressor.compress(body, compress_type)
+            body = self._compress_body(body, headers, request.get_compress_type(), request.get_compress_level())
 
         params = {}
         logstore = request.get_logstore()
-        project = request.get_project()
         if request.get_hash_key() is not None:
             resource = '/logstores/' + logstore + "/shards/route"
             params["key"] = request.get_hash_key()
         else:
             resource = '/logstores/' + logstore + "/shards/lb"
 
-        (resp, header) = self._send('POST', project, body, resource, params, headers)
-        return PutLogsResponse(header, resp)
+        return resource, params, headers, body
 
     def list_logstores(self, request):
         """ List all logstores of requested project.
@@ -869,47 +1033,13 @@ class LogClient(object):
 
         ret = None
         for _c in xrange(DEFAULT_QUERY_RETRY_COUNT):
-            headers = {}
-            params = {'from': parse_timestamp(from_time),
-                      'to': parse_timestamp(to_time),
-                      'line': size,
-                      'offset': offset,
-                      'powerSql': power_sql,
-                      'accurate': accurate_query,
-                      'fromNs': from_time_nano_part,
-                      'toNs': to_time_nano_part
-                      }
-
-            if topic:
-                params['topic'] = topic
-            if query:
-                params['query'] = query
-            if scan:
-                params['session'] = 'mode=scan'
-                params['forward'] = 'true' if forward else 'false'
-            
-            if self._get_logs_v2_enabled:
-                resource = "/logstores/" + logstore + "/logs"
-                headers["Content-Type"] = "application/json"
-                params['reverse'] = reverse
-                params['forward'] = forward
-                body_str = six.b(json.dumps(params))
-                headers["x-log-bodyrawsize"] = str(len(body_str))
-                accept_encoding = str(CompressType.default_compress_type())
-                headers['Accept-Encoding'] = accept_encoding
-
-                (resp, header) = self._send("POST", project, body_str, resource, None, headers, respons_body_type=accept_encoding)
-
-                raw_data = Compressor.decompress_response(header, resp)
-                exJson = self._loadJson(200, header, raw_data, requestId=Util.h_v_td(header, 'x-log-requestid', ''))
-                exJson = Util.convert_unicode_to_str(exJson)
-                ret = GetLogsResponse(exJson, header)
-            else:
-                resource = "/logstores/" + logstore
-                params['type'] = 'log'
-                params['reverse'] = 'true' if reverse else 'false'
-                (resp, header) = self._send("GET", project, None, resource, params, headers)
-                ret = GetLogsResponse._from_v1_resp(resp, header)
+            (method, body_str, resource, params, headers, respons_body_type) = self._build_get_log_request(
+                logstore, from_time, to_time, topic=topic, query=query, reverse=reverse, offset=offset, size=size,
+                power_sql=power_sql, scan=scan, forward=forward, accurate_query=accurate_query,
+                from_time_nano_part=from_time_nano_part, to_time_nano_part=to_time_nano_part)
+            (resp, header) = self._send(method, project, body_str, resource, params, headers,
+                                        respons_body_type=respons_body_type)
+            ret = self._to_get_logs_response(resp, header)
             if ret.is_completed():
                 break
 
@@ -917,6 +1047,52 @@ class LogClient(object):
 
         return ret
 
+    def _build_get_log_request(self, logstore, from_time, to_time, topic=None, query=None, reverse=False, offset=0,
+                               size=100, power_sql=False, scan=False, forward=True, accurate_query=True,
+                               from_time_nano_part=0, to_time_nano_part=0):
+        headers = {}
+        params = {'from': parse_timestamp(from_time),
+                  'to': parse_timestamp(to_time),
+                  'line': size,
+                  'offset': offset,
+                  'powerSql': power_sql,
+                  'accurate': accurate_query,
+                  'fromNs': from_time_nano_part,
+                  'toNs': to_time_nano_part
+                  }
+
+        if topic:
+            params['topic'] = topic
+        if query:
+            params['query'] = query
+        if scan:
+            params['session'] = 'mode=scan'
+            params['forward'] = 'true' if forward else 'false'
+
+        if self._get_logs_v2_enabled:
+            resource = "/logstores/" + logstore + "/logs"
+            headers["Content-Type"] = "application/json"
+            params['reverse'] = reverse
+            params['forward'] = forward
+            body_str = six.b(json.dumps(params))
+            headers["x-log-bodyrawsize"] = str(len(body_str))
+            accept_encoding = str(CompressType.default_compress_type())
+            headers['Accept-Encoding'] = accept_encoding
+            return "POST", body_str, resource, None, headers, accept_encoding
+
+        resource = "/logstores/" + logstore
+        params['type'] = 'log'
+        params['reverse'] = 'true' if reverse else 'false'
+        return "GET", None, resource, params, headers, 'json'
+
+    def _to_get_logs_response(self, resp, header):
+        if self._get_logs_v2_enabled:
+            raw_data = Compressor.decompress_response(header, resp)
+            exJson = self._loadJson(200, header, raw_data, requestId=Util.h_v_td(header, 'x-log-requestid', ''))
+            return GetLogsResponse(exJson, header)
+
+        return GetLogsResponse._from_v1_resp(resp, header)
+
     def get_logs(self, request):
         """ Get logs from log service.
         will retry DEFAULT_QUERY_RETRY_COUNT when incomplete.
@@ -1069,6 +1245,116 @@ class LogClient(object):
             if count == 0 or is_stats_query(query) or scan_all:
                 break
 
+    def get_log_parallel(self, project, logstore, from_time, to_time, topic=None, query=None, reverse=False,
+                         power_sql=False, accurate_query=True, parallel=None, range_count=None, use_histograms=True):
+        """ Get all logs hit by the query in the time range, different with `get_log` with size=-1 which pages
+        serially, it splits [from_time, to_time) into sub ranges and pages them concurrently, the logs are merged
+        in time order.
+        Unsuccessful operation will cause an LogException.
+
+        :type project: string
+        :param project: project name
+
+        :type logstore: string
+        :param logstore: logstore name
+
+        :type from_time: int/string
+        :param from_time: the begin timestamp or format of time in readable time like "%Y-%m-%d %H:%M:%S<time_zone>" e.g. "2018-01-02 12:12:10+8:00", also support human readable string, e.g. "1 hour ago", "now", "yesterday 0:0:0", refer to https://aliyun-log-cli.readthedocs.io/en/latest/tutorials/tutorial_human_readable_datetime.html
+
+        :type to_time: int/string
+        :param to_time: the end timestamp or format of time in readable time like "%Y-%m-%d %H:%M:%S<time_zone>" e.g. "2018-01-02 12:12:10+8:00", also support human readable string, e.g. "1 hour ago", "now", "yesterday 0:0:0", refer to https://aliyun-log-cli.readthedocs.io/en/latest/tutorials/tutorial_human_readable_datetime.html
+
+        :type topic: string
+        :param topic: topic name of logs, could be None
+
+        :type query: string
+        :param query: user defined query, could be None, analytic query (with SQL) is not supported
+
+        :type reverse: bool
+        :param reverse: if reverse is set to true, the query will return the latest logs first, default is false
+
+        :type power_sql: bool
+        :param power_sql: if power_sql is set to true, the query will run on enhanced sql mode
+
+        :type accurate_query: bool
+        :param accurate_query: if accurate_query is set to true, the query will global ordered time second mode
+
+        :type parallel: int
+        :param parallel: count of sub ranges queried concurrently, default is 8
+
+        :type range_count: int
+        :param range_count: count of sub ranges to split into, default is parallel * 4
+
+        :type use_histograms: bool
+        :param use_histograms: split by the histograms of the query to make sub ranges hit similar count of logs, otherwise split the time range evenly, default is True
+
+        :return: GetLogsResponse
+
+        :raise: LogException
+        """
+        response = None
+        for ret in query_parallel(self, project, logstore, from_time, to_time, topic=topic, query=query,
+                                  reverse=reverse, power_sql=power_sql, accurate_query=accurate_query,
+                                  parallel=parallel, range_count=range_count, use_histograms=use_histograms):
+            if response is None:
+                response = ret
+            else:
+                response.merge(ret)
+        if response is None:
+            response = GetLogsResponse({'meta': {'count': 0, 'progress': 'Complete'}, 'data': []}, {})
+        return response
+
+    def get_log_all_parallel(self, project, logstore, from_time, to_time, topic=None, query=None, reverse=False,
+                             power_sql=False, accurate_query=True, parallel=None, range_count=None,
+                             use_histograms=True):
+        """ Get all logs hit by the query in the time range like `get_log_parallel`, but yield a GetLogsResponse
+        per sub range in time order instead of merging them, only a bounded count of sub ranges are kept in memory.
+        Unsuccessful operation will cause an LogException.
+
+        :type project: string
+        :param project: project name
+
+        :type logstore: string
+        :param logstore: logstore name
+
+        :type from_time: int/string
+        :param from_time: the begin timestamp or format of time in readable time like "%Y-%m-%d %H:%M:%S<time_zone>" e.g. "2018-01-02 12:12:10+8:00", also support human readable string, e.g. "1 hour ago", "now", "yesterday 0:0:0", refer to https://aliyun-log-cli.readthedocs.io/en/latest/tutorials/tutorial_human_readable_datetime.html
+
+        :type to_time: int/string
+        :param to_time: the end timestamp or format of time in readable time like "%Y-%m-%d %H:%M:%S<time_zone>" e.g. "2018-01-02 12:12:10+8:00", also support human readable string, e.g. "1 hour ago", "now", "yesterday 0:0:0", refer to https://aliyun-log-cli.readthedocs.io/en/latest/tutorials/tutorial_human_readable_datetime.html
+
+        :type topic: string
+        :param topic: topic name of logs, could be None
+
+        :type query: string
+        :param query: user defined query, could be None, analytic query (with SQL) is not supported
+
+        :type reverse: bool
+        :param reverse: if reverse is set to true, the query will return the latest logs first, default is false
+
+        :type power_sql: bool
+        :param power_sql: if power_sql is set to true, the query will run on enhanced sql mode
+
+        :type accurate_query: bool
+        :param accurate_query: if accurate_query is set to true, the query will global ordered time second mode
+
+        :type parallel: int
+        :param parallel: count of sub ranges queried concurrently, default is 8
+
+        :type range_count: int
+        :param range_count: count of sub ranges to split into, default is parallel * 4
+
+        :type use_histograms: bool
+        :param use_histograms: split by the histograms of the query to make sub ranges hit similar count of logs, otherwise split the time range evenly, default is True
+
+        :return: GetLogsResponse iterator
+
+        :raise: LogException
+        """
+        return query_parallel(self, project, logstore, from_time, to_time, topic=topic, query=query,
+                              reverse=reverse, power_sql=power_sql, accurate_query=accurate_query,
+                              parallel=parallel, range_count=range_count, use_histograms=use_histograms)
+
     def execute_logstore_sql(self, project, logstore, from_time, to_time, sql, power_sql):
         """ Execute SQL from log service.
         will retry DEFAULT_QUERY_RETRY_COUNT when incomplete.
@@ -1474,7 +1760,17 @@ class LogClient(object):
 
         :raise: LogException
         """
+        (resource, params, headers) = self._build_pull_logs_request(logstore_name, shard_id, cursor, count=count,
+                                                                    end_cursor=end_cursor, compress=compress,
+                                                                    query=query,
+                                                                    accept_compress_type=accept_compress_type,
+                                                                    processor=processor)
+        (resp, header) = self._send("GET", project_name, None, resource, params, headers, "binary")
+        return self._to_pull_log_response(resp, header)
 
+    @staticmethod
+    def _build_pull_logs_request(logstore_name, shard_id, cursor, count=None, end_cursor=None, compress=None,
+                                 query=None, accept_compress_type=None, processor=None):
         headers = {}
 
         need_compress = compress is None or compress
@@ -1503,7 +1799,10 @@ class LogClient(object):
             params['end_cursor'] = end_cursor
         if processor:
             params['processor'] = processor
-        (resp, header) = self._send("GET", project_name, None, resource, params, headers, "binary")
+        return resource, params, headers
+
+    @staticmethod
+    def _to_pull_log_response(resp, header):
         raw_size = int(Util.h_v_t(header, 'x-log-bodyrawsize'))
         if raw_size <= 0:
             return PullLogResponse(None, header)
@@ -1566,7 +1865,9 @@ class LogClient(object):
             begin_cursor = next_cursor
 
     def pull_log_dump(self, project_name, logstore_name, from_time, to_time, file_path, batch_size=None,
-                      compress=None, encodings=None, shard_list=None, no_escape=None, query=None, processor=None):
+                      compress=None, encodings=None, shard_list=None, no_escape=None, query=None, processor=None,
+                      compress_format=None, checkpoint_interval=None, resume=None, executor=None,
+                      slice_count=None):
         """ dump all logs seperatedly line into file_path, file_path, the time parameters are log received time on server side.
 
         :type project_name: string
@@ -1609,6 +1910,21 @@ class LogClient(object):
         :type processor: string
         :param processor: the consume processor which contains SPL, such as consume-processor-1, prefer to use the processor instead of query
 
+        :type compress_format: string
+        :param compress_format: compress the dumped files, None (plain text, default), 'gzip' or 'zstd'
+
+        :type checkpoint_interval: int
+        :param checkpoint_interval: seconds between checkpoints, the dumped data is fsynced and the cursor to continue is recorded in a manifest file (file path + ".manifest"), default is 10
+
+        :type resume: bool
+        :param resume: continue the dump of each shard from the last checkpoint in its manifest, shards completed are skipped, default is False
+
+        :type executor: string
+        :param executor: how to run the workers of the shards, "process" (default) runs them in a process pool and pickles the client into each process, "thread" runs them in threads sharing the client and its connection pool, which starts faster and uses much less memory for logstores of many shards as the work is mostly I/O, "hybrid" is same as "thread" here
+
+        :type slice_count: int
+        :param slice_count: split the time range of each shard into slice_count slices run as separate tasks, the idle workers take over the remaining slices of the big shards, so a hot shard doesn't dominate the total time. default is None (a task per shard). the slices are dumped into part files (file path + ".part{index}"), which are concatenated into the file of the shard in order once all are done
+
         :return: LogResponse {"total_count": 30, "files": {'file_path_1': 10, "file_path_2": 20} })
 
         :raise: LogException
@@ -1619,7 +1935,70 @@ class LogClient(object):
 
         return pull_log_dump(self, project_name, logstore_name, from_time, to_time, file_path,
                              batch_size=batch_size, compress=compress, encodings=encodings,
-                             shard_list=shard_list, no_escape=no_escape, query=query, processor=processor)
+                             shard_list=shard_list, no_escape=no_escape, query=query, processor=processor,
+                             compress_format=compress_format, checkpoint_interval=checkpoint_interval, resume=resume,
+                             executor=executor, slice_count=slice_count)
+
+    def query_log_dump(self, project_name, logstore_name, from_time, to_time, file_path, topic=None, query=None,
+                       reverse=False, power_sql=False, accurate_query=True, max_logs_per_range=10000, parallel=None,
+                       progress=None, encodings=None, no_escape=None):
+        """ dump all logs hit by the query seperatedly line into file_path in time order, the time parameters are log time.
+        [from_time, to_time) is split into sub ranges hitting at most max_logs_per_range logs each by histograms of the query,
+        the sub ranges are queried concurrently.
+
+        :type project_name: string
+        :param project_name: the Project name
+
+        :type logstore_name: string
+        :param logstore_name: the logstore name
+
+        :type from_time: int/string
+        :param from_time: the begin timestamp or format of time in readable time like "%Y-%m-%d %H:%M:%S<time_zone>" e.g. "2018-01-02 12:12:10+8:00", also support human readable string, e.g. "1 hour ago", "now", "yesterday 0:0:0", refer to https://aliyun-log-cli.readthedocs.io/en/latest/tutorials/tutorial_human_readable_datetime.html
+
+        :type to_time: int/string
+        :param to_time: the end timestamp or format of time in readable time like "%Y-%m-%d %H:%M:%S<time_zone>" e.g. "2018-01-02 12:12:10+8:00", also support human readable string, e.g. "1 hour ago", "now", "yesterday 0:0:0", refer to https://aliyun-log-cli.readthedocs.io/en/latest/tutorials/tutorial_human_readable_datetime.html
+
+        :type file_path: string
+        :param file_path: file path, e.g. "/data/dump.data"
+
+        :type topic: string
+        :param topic: topic name of logs, could be None
+
+        :type query: string
+        :param query: user defined query, could be None, analytic query (with SQL) is not supported
+
+        :type reverse: bool
+        :param reverse: if reverse is set to true, the latest logs are dumped first, default is false
+
+        :type power_sql: bool
+        :param power_sql: if power_sql is set to true, the query will run on enhanced sql mode
+
+        :type accurate_query: bool
+        :param accurate_query: if accurate_query is set to true, the query will global ordered time second mode
+
+        :type max_logs_per_range: int
+        :param max_logs_per_range: max count of logs hit by a sub range, default is 10000. a second hitting more logs is not split further.
+
+        :type parallel: int
+        :param parallel: count of sub ranges queried concurrently, default is 8
+
+        :type progress: callable
+        :param progress: called as progress(dumped_count, estimated_total_count, finished_range_count, range_count) once a sub range is dumped
+
+        :type encodings: string list
+        :param encodings: encoding like ["utf8", "latin1"] etc to dumps the logs in json format to file. default is ["utf8",]
+
+        :type no_escape: bool
+        :param no_escape: if not_escape the non-ANSI, default is to escape, set it to True if don't want it.
+
+        :return: LogResponse {"total_count": 30, "files": {'file_path': 30}, "range_count": 3})
+
+        :raise: LogException
+        """
+        return query_log_dump(self, project_name, logstore_name, from_time, to_time, file_path, topic=topic,
+                              query=query, reverse=reverse, power_sql=power_sql, accurate_query=accurate_query,
+                              max_logs_per_range=max_logs_per_range, parallel=parallel, progress=progress,
+                              encodings=encodings, no_escape=no_escape)
 
     def create_logstore(self, project_name, logstore_name,
                         ttl=30,
@@ -3949,7 +4328,8 @@ class LogClient(object):
     def copy_data(self, project, logstore, from_time, to_time=None,
                   to_client=None, to_project=None, to_logstore=None,
                   shard_list=None,
-                  batch_size=None, compress=None, new_topic=None, new_source=None):
+                  batch_size=None, compress=None, new_topic=None, new_source=None, checkpoint_dir=None,
+                  max_in_flight=None, passthrough=False, executor=None, slice_count=None):
         """
         copy data from one logstore to another one (could be the same or in different region), the time is log received time on server side.
 
@@ -3989,13 +4369,30 @@ class LogClient(object):
         :type new_source: string
         :param new_source: overwrite the copied source with the passed one
 
+        :type checkpoint_dir: string
+        :param checkpoint_dir: directory to save the checkpoint of each shard, the copying is continued from the checkpoints when it's run again with the same directory, shards completed are skipped. use a separate directory for each job. default is None (no checkpoint)
+
+        :type max_in_flight: int
+        :param max_in_flight: max put requests in flight of each shard while pulling the following data, consecutive log groups with the same topic, source and tags are merged into one request. default is 4
+
+        :type passthrough: bool
+        :param passthrough: forward the pulled log groups as serialized bytes without decoding and encoding the logs, topic and source are overwritten at the wire level. it saves most of the CPU of copying. default is False
+
+        :type executor: string
+        :param executor: how to run the workers of the shards, "process" (default) runs them in a process pool and pickles the client into each process, "thread" runs them in threads sharing the client and its connection pool, which starts faster and uses much less memory for logstores of many shards as the work is mostly I/O, "hybrid" is same as "thread" here
+
+        :type slice_count: int
+        :param slice_count: split the time range of each shard into slice_count slices run as separate tasks, the idle workers take over the remaining slices of the big shards, so a hot shard doesn't dominate the total time. default is None (a task per shard). the checkpoints are saved by slice if checkpoint_dir is set, keep the same slice_count to continue a job
+
         :return: LogResponse {"total_count": 30, "shards": {0: 10, 1: 20} })
 
         """
         return copy_data(self, project, logstore, from_time, to_time=to_time,
                          to_client=to_client, to_project=to_project, to_logstore=to_logstore,
                          shard_list=shard_list,
-                         batch_size=batch_size, compress=compress, new_topic=new_topic, new_source=new_source)
+                         batch_size=batch_size, compress=compress, new_topic=new_topic, new_source=new_source,
+                         checkpoint_dir=checkpoint_dir, max_in_flight=max_in_flight,
+                         passthrough=passthrough, executor=executor, slice_count=slice_count)
 
     def transform_data(self, project, logstore, config, from_time, to_time=None,
                        to_client=None, to_project=None, to_logstore=None,
@@ -4003,7 +4400,8 @@ class LogClient(object):
                        batch_size=None, compress=None,
                        cg_name=None, c_name=None,
                        cg_heartbeat_interval=None, cg_data_fetch_interval=None, cg_in_order=None,
-                       cg_worker_pool_size=None
+                       cg_worker_pool_size=None,
+                       checkpoint_dir=None, executor=None, slice_count=None
                        ):
         """
         transform data from one logstore to another one (could be the same or in different region), the time passed is log received time on server side. There're two mode, batch mode / consumer group mode. For Batch mode, just leave the cg_name and later options as None.
@@ -4059,6 +4457,15 @@ class LogClient(object):
         :type cg_worker_pool_size: int
         :param cg_worker_pool_size: cg_worker_pool_size, default 2
 
+        :type checkpoint_dir: string
+        :param checkpoint_dir: directory to save the checkpoint of each shard, the transforming is continued from the checkpoints when it's run again with the same directory, shards completed are skipped. use a separate directory for each job. default is None (no checkpoint). only for the batch mode, the consumer group mode saves checkpoints in the consumer group
+
+        :type executor: string
+        :param executor: how to run the workers of the shards, "process" (default) runs them in a process pool and pickles the client into each process, "thread" runs them in threads sharing the client and its connection pool, which starts faster and uses much less memory for logstores of many shards as the work is mostly I/O, "hybrid" runs them in threads and the CPU-bound transforms in a process pool. only for the batch mode
+
+        :type slice_count: int
+        :param slice_count: split the time range of each shard into slice_count slices run as separate tasks, the idle workers take over the remaining slices of the big shards, so a hot shard doesn't dominate the total time. default is None (a task per shard). only for the batch mode, the checkpoints are saved by slice if checkpoint_dir is set, keep the same slice_count to continue a job
+
         :return: LogResponse {"total_count": 30, "shards": {0: {"count": 10, "removed": 1},  2: {"count": 20, "removed": 1}} })
 
         """
@@ -4071,7 +4478,8 @@ class LogClient(object):
                               cg_heartbeat_interval=cg_heartbeat_interval,
                               cg_data_fetch_interval=cg_data_fetch_interval,
                               cg_in_order=cg_in_order,
-                              cg_worker_pool_size=cg_worker_pool_size
+                              cg_worker_pool_size=cg_worker_pool_size,
+                              checkpoint_dir=checkpoint_dir, executor=executor, slice_count=slice_count
                               )
 
     def get_resource_usage(self, project):
@@ -34,8 +34,9 @@ from .listlogstoresresponse import ListLogstoresResponse
 from .listtopicsrequest import ListTopicsRequest
 from .listtopicsresponse import ListTopicsResponse
 from .logitem import LogItem
-from .logclient_operator import ResourceUsageResponse, copy_project, list_more, query_more, pull_log_dump, copy_logstore, copy_data, get_resource_usage, arrange_shard, transform_data, copy_dashboard, copy_alert
+from .logclient_operator import ResourceUsageResponse, copy_project, list_more, query_more, query_parallel, pull_log_dump, query_log_dump, copy_logstore, copy_data, get_resource_usage, arrange_shard, transform_data, copy_dashboard, copy_alert
 from .logexception import LogException
+from .retry_policy import RetryPolicy
 from .logresponse import LogResponse
 from .logstore_config_response import CreateLogStoreResponse, DeleteLogStoreResponse, GetLogStoreResponse, ListLogStoreResponse, UpdateLogStoreResponse
 from .logtail_config_detail import ApsaraFileConfigDetail, CommonRegLogConfigDetail, FullRegFileConfigDetail, JsonFileConfigDetail, LogtailConfigGenerator, SeperatorFileConfigDetail, SimpleFileConfigDetail, SyslogConfigDetail
@@ -79,9 +80,16 @@ class LogClient(object):
     def timeout(self) -> int: ...
     @timeout.setter
     def timeout(self, value: int) -> None: ...
+    def set_connection_pool(self, pool_connections: Optional[int] = ..., pool_maxsize: Optional[int] = ..., pool_block: Optional[bool] = ..., tcp_keepalive: Optional[Union[bool, int]] = ..., socket_send_buffer: Optional[int] = ..., socket_recv_buffer: Optional[int] = ...) -> None: ...
+    def get_connection_pool_stats(self) -> Dict[str, Dict[str, int]]: ...
+    def set_retry_policy(self, retry_policy: RetryPolicy) -> None: ...
+    def get_retry_policy(self) -> RetryPolicy: ...
+    def get_retry_stats(self) -> Dict[str, Any]: ...
+    def set_compression(self, compress_type: Optional[str] = ..., level: Optional[int] = ...) -> None: ...
+    def set_sign_payload(self, sign_payload: bool) -> None: ...
     def set_user_agent(self, user_agent: str) -> None: ...
     def set_source(self, source: str) -> None: ...
-    def put_log_raw(self, project: str, logstore: str, log_group: LogGroup, compress: Optional[bool] = ...) -> PutLogsResponse: ...
+    def put_log_raw(self, project: str, logstore: str, log_group: Union[LogGroup, bytes], compress: Optional[bool] = ...) -> PutLogsResponse: ...
     def put_logs(self, request: PutLogsRequest) -> PutLogsResponse: ...
     def list_logstores(self, request: ListLogstoresRequest) -> ListLogstoresResponse: ...
     def list_topics(self, request: ListTopicsRequest) -> ListTopicsResponse: ...
@@ -95,6 +103,8 @@ class LogClient(object):
     def get_logs(self, request: GetLogsRequest) -> GetLogsResponse: ...
     def get_log_all(self, project: str, logstore: str, from_time: Union[int, str], to_time: Union[int, str], topic: Optional[str] = ..., query: Optional[str] = ..., reverse: bool = ..., offset: int = ..., power_sql: bool = ..., accurate_query: bool = ...) -> Iterator[GetLogsResponse]: ...
     def get_log_all_v2(self, project: str, logstore: str, from_time: Union[int, str], to_time: Union[int, str], topic: Optional[str] = ..., query: Optional[str] = ..., reverse: bool = ..., offset: int = ..., power_sql: bool = ..., scan: bool = ..., forward: bool = ...) -> Iterator[GetLogsResponse]: ...
+    def get_log_parallel(self, project: str, logstore: str, from_time: Union[int, str], to_time: Union[int, str], topic: Optional[str] = ..., query: Optional[str] = ..., reverse: bool = ..., power_sql: bool = ..., accurate_query: bool = ..., parallel: Optional[int] = ..., range_count: Optional[int] = ..., use_histograms: bool = ...) -> GetLogsResponse: ...
+    def get_log_all_parallel(self, project: str, logstore: str, from_time: Union[int, str], to_time: Union[int, str], topic: Optional[str] = ..., query: Optional[str] = ..., reverse: bool = ..., power_sql: bool = ..., accurate_query: bool = ..., parallel: Optional[int] = ..., range_count: Optional[int] = ..., use_histograms: bool = ...) -> Iterator[GetLogsResponse]: ...
     def execute_logstore_sql(self, project: str, logstore: str, from_time: Union[int, str], to_time: Union[int, str], sql: str, power_sql: bool) -> GetLogsResponse: ...
     def execute_project_sql(self, project: str, sql: str, power_sql: bool) -> GetLogsResponse: ...
     def submit_async_sql(self, request: SubmitAsyncSqlRequest) -> AsyncSqlResponse: ...
@@ -109,7 +119,8 @@ class LogClient(object):
     def get_end_cursor(self, project_name: str, logstore_name: str, shard_id: int) -> GetCursorResponse: ...
     def pull_logs(self, project_name: str, logstore_name: str, shard_id: int, cursor: str, count: Optional[int] = ..., end_cursor: Optional[str] = ..., compress: Optional[bool] = ..., query: Optional[str] = ..., accept_compress_type: Optional[str] = ..., processor: Optional[str] = ...) -> PullLogResponse: ...
     def pull_log(self, project_name: str, logstore_name: str, shard_id: int, from_time: Union[int, str], to_time: Union[int, str], batch_size: Optional[int] = ..., compress: Optional[bool] = ..., query: Optional[str] = ..., accept_compress_type: Optional[str] = ..., processor: Optional[str] = ...) -> Iterator[PullLogResponse]: ...
-    def pull_log_dump(self, project_name: str, logstore_name: str, from_time: Union[int, str], to_time: Union[int, str], file_path: str, batch_size: Optional[int] = ..., compress: Optional[bool] = ..., encodings: Optional[List[str]] = ..., shard_list: Optional[Union[str, List[str]]] = ..., no_escape: Optional[bool] = ..., query: Optional[str] = ..., processor: Optional[str] = ...) -> LogResponse: ...
+    def pull_log_dump(self, project_name: str, logstore_name: str, from_time: Union[int, str], to_time: Union[int, str], file_path: str, batch_size: Optional[int] = ..., compress: Optional[bool] = ..., encodings: Optional[List[str]] = ..., shard_list: Optional[Union[str, List[str]]] = ..., no_escape: Optional[bool] = ..., query: Optional[str] = ..., processor: Optional[str] = ..., compress_format: Optional[str] = ..., checkpoint_interval: Optional[int] = ..., resume: Optional[bool] = ..., executor: Optional[str] = ..., slice_count: Optional[int] = ...) -> LogResponse: ...
+    def query_log_dump(self, project_name: str, logstore_name: str, from_time: Union[int, str], to_time: Union[int, str], file_path: str, topic: Optional[str] = ..., query: Optional[str] = ..., reverse: bool = ..., power_sql: bool = ..., accurate_query: bool = ..., max_logs_per_range: int = ..., parallel: Optional[int] = ..., progress: Optional[Callable[[int, int, int, int], Any]] = ..., encodings: Optional[List[str]] = ..., no_escape: Optional[bool] = ...) -> LogResponse: ...
     def create_logstore(self, project_name: str, logstore_name: str, ttl: int = ..., shard_count: int = ..., enable_tracking: bool = ..., append_meta: bool = ..., auto_split: bool = ..., max_split_shard: int = ..., preserve_storage: bool = ..., encrypt_conf: Optional[Dict[str, Any]] = ..., telemetry_type: str = ..., hot_ttl: int = ..., mode: Optional[str] = ..., infrequent_access_ttl: int = ..., enable_modify: bool = ...) -> CreateLogStoreResponse: ...
     def delete_logstore(self, project_name: str, logstore_name: str) -> DeleteLogStoreResponse: ...
     def get_logstore(self, project_name: str, logstore_name: str) -> GetLogStoreResponse: ...
@@ -190,8 +201,8 @@ class LogClient(object):
     def copy_alert(self, from_project: str, from_alert_name: str, to_project: Optional[str] = ..., to_alert_name: Optional[str] = ..., to_client: Optional[LogClient] = ..., to_region_endpoint: Optional[str] = ...) -> None: ...
     def list_project(self, offset: int = ..., size: int = ..., project_name_pattern: Optional[str] = ..., resource_group_id: str = ..., description: Optional[str] = ...) -> ListProjectResponse: ...
     def es_migration(self, cache_path: str, hosts: str, project_name: str, indexes: Optional[str] = ..., query: Optional[str] = ..., logstore_index_mappings: Optional[str] = ..., pool_size: Optional[int] = ..., time_reference: Optional[str] = ..., source: Optional[str] = ..., topic: Optional[str] = ..., batch_size: Optional[int] = ..., wait_time_in_secs: Optional[int] = ..., auto_creation: bool = ..., retries_failed: Optional[int] = ..., cache_duration: str = ...) -> LogResponse: ...
-    def copy_data(self, project: str, logstore: str, from_time: Union[str, int], to_time: Optional[Union[str, int]] = ..., to_client: Optional[LogClient] = ..., to_project: Optional[str] = ..., to_logstore: Optional[str] = ..., shard_list: Optional[str] = ..., batch_size: Optional[int] = ..., compress: Optional[bool] = ..., new_topic: Optional[str] = ..., new_source: Optional[str] = ...) -> LogResponse: ...
-    def transform_data(self, project: str, logstore: str, config: str, from_time: Union[str, int], to_time: Optional[Union[str, int]] = ..., to_client: Optional[LogClient] = ..., to_project: Optional[str] = ..., to_logstore: Optional[str] = ..., shard_list: Optional[str] = ..., batch_size: Optional[int] = ..., compress: Optional[bool] = ..., cg_name: Optional[str] = ..., c_name: Optional[str] = ..., cg_heartbeat_interval: Optional[int] = ..., cg_data_fetch_interval: Optional[int] = ..., cg_in_order: Optional[bool] = ..., cg_worker_pool_size: Optional[int] = ...) -> LogResponse: ...
+    def copy_data(self, project: str, logstore: str, from_time: Union[str, int], to_time: Optional[Union[str, int]] = ..., to_client: Optional[LogClient] = ..., to_project: Optional[str] = ..., to_logstore: Optional[str] = ..., shard_list: Optional[str] = ..., batch_size: Optional[int] = ..., compress: Optional[bool] = ..., new_topic: Optional[str] = ..., new_source: Optional[str] = ..., checkpoint_dir: Optional[str] = ..., max_in_flight: Optional[int] = ..., passthrough: bool = ..., executor: Optional[str] = ..., slice_count: Optional[int] = ...) -> LogResponse: ...
+    def transform_data(self, project: str, logstore: str, config: str, from_time: Union[str, int], to_time: Optional[Union[str, int]] = ..., to_client: Optional[LogClient] = ..., to_project: Optional[str] = ..., to_logstore: Optional[str] = ..., shard_list: Optional[str] = ..., batch_size: Optional[int] = ..., compress: Optional[bool] = ..., cg_name: Optional[str] = ..., c_name: Optional[str] = ..., cg_heartbeat_interval: Optional[int] = ..., cg_data_fetch_interval: Optional[int] = ..., cg_in_order: Optional[bool] = ..., cg_worker_pool_size: Optional[int] = ..., checkpoint_dir: Optional[str] = ..., executor: Optional[str] = ..., slice_count: Optional[int] = ...) -> LogResponse: ...
     def get_resource_usage(self, project: Any) -> ResourceUsageResponse: ...
     def arrange_shard(self, project: str, logstore: str, count: int) -> None: ...
     def enable_alert(self, project_name: str, job_name: str) -> LogResponse: ...
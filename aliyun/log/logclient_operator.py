@@ -3,12 +3,13 @@ from .logexception import LogException
 import six
 import json
 import os
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import multiprocessing
 from .logresponse import LogResponse
 from json import JSONEncoder
 import logging
-from collections import defaultdict
+from collections import defaultdict, deque
 import time
 from .etl_core import Runner
 from .putlogsrequest import PutLogsRequest
@@ -17,10 +18,20 @@ from aliyun.log.pulllog_response import PullLogResponse
 from .consumer import *
 from multiprocessing import RLock
 from .util import base64_encodestring as b64e
+from .util import parse_timestamp, is_stats_query
+from .dump_writer import MANIFEST_SUFFIX, LogDumpWriter
+from .job_checkpoint import ShardCheckpointStore
+from .loggroup_encoder import MAX_LOG_GROUP_SIZE
+from .gethistogramsrequest import GetHistogramsRequest
 import copy
+import inspect
+import io
+import shutil
 
 
 MAX_INIT_SHARD_COUNT = 100
+MAX_PUT_LOG_COUNT = 40960
+MAX_THREAD_WORKERS = 64
 
 logger = logging.getLogger(__name__)
 
@@ -411,6 +422,177 @@ def query_more(fn, offset=0, size=100, batch_size=100, **kwargs):
     return response
 
 
+def _get_histograms(client, project, logstore, from_time, to_time, topic=None, query=None, accurate_query=True):
+    request = GetHistogramsRequest(project, logstore, from_time, to_time, topic=topic, query=query,
+                                   accurate_query=accurate_query)
+    response = None
+    for _c in range(5):
+        response = client.get_histograms(request)
+        if response.is_completed():
+            break
+        time.sleep(0.5)
+    return response.get_histograms()
+
+
+def split_query_range(client, project, logstore, from_time, to_time, topic=None, query=None, range_count=8,
+                      use_histograms=True, accurate_query=True):
+    """ split [from_time, to_time) into at most range_count continuous sub ranges, when use_histograms is True,
+    the boundaries are put on the histogram buckets to make the sub ranges hit similar count of logs,
+    otherwise the time range is split evenly.
+
+    :return: list of (from_time, to_time) in time order
+    """
+    from_time, to_time = parse_timestamp(from_time), parse_timestamp(to_time)
+    range_count = max(min(range_count, to_time - from_time), 1)
+
+    if use_histograms:
+        histograms = _get_histograms(client, project, logstore, from_time, to_time, topic=topic, query=query,
+                                     accurate_query=accurate_query)
+        total = sum(h.get_count() for h in histograms)
+        if total == 0:
+            return [(from_time, to_time)] if histograms else []
+
+        ranges = []
+        range_start, hit = from_time, 0
+        target = float(total) / range_count
+        for h in histograms:
+            hit += h.get_count()
+            # cut once the range hits its share of logs, the last one always ends at to_time
+            if hit >= target * (len(ranges) + 1) and len(ranges) < range_count - 1 \
+                    and range_start < h.get_to() < to_time:
+                ranges.append((range_start, h.get_to()))
+                range_start = h.get_to()
+        ranges.append((range_start, to_time))
+        return ranges
+
+    step = float(to_time - from_time) / range_count
+    boundaries = [from_time + int(step * i) for i in range(range_count)] + [to_time]
+    return [(boundaries[i], boundaries[i + 1]) for i in range(range_count) if boundaries[i] < boundaries[i + 1]]
+
+
+def plan_query_ranges(client, project, logstore, from_time, to_time, topic=None, query=None,
+                      max_logs_per_range=10000, accurate_query=True):
+    """ split [from_time, to_time) into continuous sub ranges hitting at most max_logs_per_range logs each,
+    the histograms of a bucket hitting more logs are got again to subdivide it until it's 1 second,
+    then adjacent small buckets are merged.
+
+    :return: list of (from_time, to_time, estimated log count) in time order
+    """
+    from_time, to_time = parse_timestamp(from_time), parse_timestamp(to_time)
+    buckets = []
+
+    def _plan(range_from, range_to):
+        histograms = _get_histograms(client, project, logstore, range_from, range_to, topic=topic, query=query,
+                                     accurate_query=accurate_query)
+        for h in histograms:
+            bucket_from, bucket_to = max(h.get_from(), range_from), min(h.get_to(), range_to)
+            if bucket_from >= bucket_to:
+                continue
+            if h.get_count() <= max_logs_per_range or bucket_to - bucket_from <= 1:
+                buckets.append((bucket_from, bucket_to, h.get_count()))
+            elif (bucket_from, bucket_to) != (range_from, range_to):
+                _plan(bucket_from, bucket_to)
+            else:
+                # histograms can't be finer for the range, split it by half
+                middle = (bucket_from + bucket_to) // 2
+                _plan(bucket_from, middle)
+                _plan(middle, bucket_to)
+
+    _plan(from_time, to_time)
+
+    ranges = []
+    for bucket_from, bucket_to, count in buckets:
+        if ranges and ranges[-1][2] + count <= max_logs_per_range:
+            ranges[-1] = (ranges[-1][0], bucket_to, ranges[-1][2] + count)
+        else:
+            # the gap between buckets (if any) hits nothing, it's taken by the previous range
+            if ranges:
+                ranges[-1] = (ranges[-1][0], bucket_from, ranges[-1][2])
+            ranges.append((bucket_from, bucket_to, count))
+    if not ranges:
+        return [(from_time, to_time, 0)] if from_time < to_time else []
+    ranges[0] = (from_time,) + ranges[0][1:]
+    ranges[-1] = ranges[-1][:1] + (to_time, ranges[-1][2])
+    return ranges
+
+
+def _iter_query_ranges(client, project, logstore, ranges, topic=None, query=None, reverse=False, power_sql=False,
+                       accurate_query=True, parallel=8):
+    """ get all logs of each (from_time, to_time) in ranges concurrently, yield the responses in order of ranges """
+    def _query_range(range_from, range_to):
+        return client.get_log(project, logstore, range_from, range_to, topic=topic, query=query, reverse=reverse,
+                              size=-1, power_sql=power_sql, accurate_query=accurate_query)
+
+    # keep a bounded window of ranges in flight, results are yielded in range order
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        futures = []
+        ranges = iter(ranges)
+        try:
+            while True:
+                while len(futures) < parallel * 2:
+                    time_range = next(ranges, None)
+                    if time_range is None:
+                        break
+                    futures.append(pool.submit(_query_range, *time_range[:2]))
+                if not futures:
+                    break
+                yield futures.pop(0).result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def query_parallel(client, project, logstore, from_time, to_time, topic=None, query=None, reverse=False,
+                   power_sql=False, accurate_query=True, parallel=None, range_count=None, use_histograms=True):
+    """ get all logs hit by the query by splitting the time range into sub ranges and paging them concurrently,
+    yield a GetLogsResponse of all logs of each sub range in time order (latest first when reverse is True)
+    """
+    if is_stats_query(query):
+        raise LogException('InvalidParameter', 'parallel query does not support analytic query: {0}'.format(query))
+
+    parallel = parallel or 8
+    ranges = split_query_range(client, project, logstore, from_time, to_time, topic=topic, query=query,
+                               range_count=range_count or parallel * 4, use_histograms=use_histograms,
+                               accurate_query=accurate_query)
+    if reverse:
+        ranges.reverse()
+
+    for response in _iter_query_ranges(client, project, logstore, ranges, topic=topic, query=query, reverse=reverse,
+                                       power_sql=power_sql, accurate_query=accurate_query, parallel=parallel):
+        yield response
+
+
+def query_log_dump(client, project, logstore, from_time, to_time, file_path, topic=None, query=None, reverse=False,
+                   power_sql=False, accurate_query=True, max_logs_per_range=10000, parallel=None, progress=None,
+                   encodings=None, no_escape=None):
+    if is_stats_query(query):
+        raise LogException('InvalidParameter', 'query log dump does not support analytic query: {0}'.format(query))
+
+    ranges = plan_query_ranges(client, project, logstore, from_time, to_time, topic=topic, query=query,
+                               max_logs_per_range=max_logs_per_range, accurate_query=accurate_query)
+    if reverse:
+        ranges.reverse()
+    estimated_count = sum(count for _f, _t, count in ranges)
+    encoder_cls = get_encoder_cls(encodings or ('utf8', 'latin1', 'gbk'))
+    ensure_ascii = not no_escape
+
+    count = 0
+    # not affected by the locale, e.g. C/POSIX can't encode non-ascii logs
+    with io.open(os.path.expanduser(file_path), "w", encoding="utf-8") as f:
+        responses = _iter_query_ranges(client, project, logstore, ranges, topic=topic, query=query, reverse=reverse,
+                                       power_sql=power_sql, accurate_query=accurate_query, parallel=parallel or 8)
+        for finished, response in enumerate(responses, 1):
+            for log in response.get_logs():
+                line = json.dumps(log._to_dict(), cls=encoder_cls, ensure_ascii=ensure_ascii)
+                f.write(line.decode('utf8') if isinstance(line, six.binary_type) else line)
+                f.write(u"\n")
+            count += response.get_count()
+            if progress is not None:
+                progress(count, estimated_count, finished, len(ranges))
+
+    return LogResponse({}, {"total_count": count, "files": {file_path: count}, "range_count": len(ranges)})
+
+
 def get_encoder_cls(encodings):
     class NonUtf8Encoder(JSONEncoder):
         def default(self, obj):
@@ -429,97 +611,309 @@ def get_encoder_cls(encodings):
 
 def dump_worker(client, project_name, logstore_name, from_time, to_time,
                 shard_id, file_path,
-                batch_size=None, compress=None, encodings=None, no_escape=None, query=None, processor=None):
-    res = client.pull_log(project_name, logstore_name, shard_id, from_time, to_time, batch_size=batch_size,
-                          compress=compress, query=query, processor=processor)
+                batch_size=None, compress=None, encodings=None, no_escape=None, query=None, processor=None,
+                compress_format=None, checkpoint_interval=None, resume=None):
     encodings = encodings or ('utf8', 'latin1', 'gbk')
-    ensure_ansi = not no_escape
+    writer = LogDumpWriter(file_path, compress_format=compress_format, encoder_cls=get_encoder_cls(encodings),
+                           ensure_ascii=not no_escape, checkpoint_interval=checkpoint_interval or 10, resume=resume)
 
-    count = 0
+    manifest = writer.manifest
     next_cursor = 'as from_time configured'
     try:
-        for data in res:
-            for log in data.get_flatten_logs_json(decode_bytes=True):
-                with open(os.path.expanduser(file_path), "a+") as f:
-                    count += 1
-                    try:
-                        if six.PY2:
-                            last_ex = None
-                            for encoding in encodings:
-                                try:
-                                    ret = json.dumps(log, encoding=encoding, ensure_ascii=ensure_ansi)
-                                    if isinstance(ret, unicode):
-                                        ret = ret.encode(encoding, errors="ignore")
-                                    f.write(ret)
-                                    f.write("\n")
-                                    break
-                                except UnicodeDecodeError as ex:
-                                    last_ex = ex
-                            else:
-                                raise last_ex
-                        else:
-                            f.write(json.dumps(log, cls=get_encoder_cls(encodings), ensure_ascii=ensure_ansi))
-                            f.write("\n")
-                    except Exception as ex:
-                        logger.error("shard: {0} Fail to dump log: {1}".format(shard_id, b64e(repr(log))), exc_info=True)
-                        raise ex
-            next_cursor = data.next_cursor
+        if manifest is not None and manifest.get('completed'):
+            return file_path, writer.count
+
+        begin_cursor, end_cursor = _get_shard_cursors(client, project_name, logstore_name, shard_id,
+                                                      from_time, to_time, manifest)
+        for res in _iter_pull_logs(client, project_name, logstore_name, shard_id, begin_cursor, end_cursor,
+                                   batch_size=batch_size, compress=compress, query=query, processor=processor):
+            writer.write_logs(res.get_flatten_logs_json(decode_bytes=True))
+            next_cursor = res.get_next_cursor()
+            if next_cursor != end_cursor:
+                writer.maybe_checkpoint(next_cursor=next_cursor, end_cursor=end_cursor)
+
+        writer.checkpoint(next_cursor=next_cursor, end_cursor=end_cursor, completed=True)
     except Exception as ex:
         logger.error("dump log failed: task info {0} failed to copy data to target, next cursor: {1} detail: {2}".
                      format(
             (project_name, logstore_name, shard_id, from_time, to_time),
             next_cursor, ex), exc_info=True)
         raise
+    finally:
+        writer.close()
 
-    return file_path, count
+    return file_path, writer.count
 
 
-def pull_log_dump(client, project_name, logstore_name, from_time, to_time, file_path, batch_size=None, compress=None,
-                  encodings=None, shard_list=None, no_escape=None, query=None, processor=None):
-    cpu_count = multiprocessing.cpu_count() * 2
+def _create_shard_executor(executor, shard_count):
+    """ create the executor to run the workers of the shards
+
+    :type executor: string
+    :param executor: "process" (default), a process per worker with the clients pickled into each one.
+        "thread", a thread per worker sharing the clients and their connection pools in this process, it starts
+        faster and uses much less memory, suitable as the work is mostly I/O.
+        "hybrid", same as "thread", and the CPU-bound transforms of transform_data run in a process pool.
+
+    :type shard_count: int
+    :param shard_count: count of the shards to run
+
+    :return: Executor
+    """
+    executor = executor or 'process'
+    if executor == 'process':
+        return ProcessPoolExecutor(max_workers=min(multiprocessing.cpu_count() * 2, shard_count))
+    if executor in ('thread', 'hybrid'):
+        return ThreadPoolExecutor(max_workers=min(MAX_THREAD_WORKERS, shard_count))
+    raise LogException('InvalidParameter', 'unsupported executor: {0}, it should be one of process, thread '
+                                           'and hybrid'.format(executor))
+
+
+def _plan_time_slices(client, project, logstore, shard_id, from_time, to_time, slice_count):
+    """ split [from_time, to_time) of the shard into slice_count time slices of the same length. the workers get the
+    cursors of the boundaries via get_cursor, so adjacent slices neither overlap nor miss any data.
+
+    :return: list of (from_time, to_time)
+    """
+    if not slice_count or slice_count <= 1:
+        return [(from_time, to_time)]
+    if from_time == 'begin':
+        begin_cursor = client.get_cursor(project, logstore, shard_id, 'begin').get_cursor()
+        begin = client.get_cursor_time(project, logstore, shard_id, begin_cursor).get_cursor_time()
+    else:
+        begin = parse_timestamp(from_time)
+    end = int(time.time()) if to_time == 'end' else parse_timestamp(to_time)
+    step = float(end - begin) / slice_count
+    if step < 1:
+        return [(from_time, to_time)]
+    times = [from_time] + [int(begin + step * i) for i in range(1, slice_count)] + [to_time]
+    return list(zip(times[:-1], times[1:]))
+
+
+def _plan_shard_slices(client, project, logstore, shards, from_time, to_time, slice_count):
+    """ plan the tasks of the shards, each shard is split into time slices if slice_count is set. the slices are
+    ordered round-robin over the shards, so the idle workers take over the remaining slices of the big shards
+    instead of waiting for them.
+
+    :return: list of (shard id, slice id, from_time, to_time), slice id is None if slice_count is not set
+    """
+    if not slice_count or slice_count <= 1:
+        return [(shard, None, from_time, to_time) for shard in shards]
+    shard_slices = [_plan_time_slices(client, project, logstore, shard, from_time, to_time, slice_count)
+                    for shard in shards]
+    tasks = []
+    for slice_id in range(max(len(slices) for slices in shard_slices) if shards else 0):
+        for shard, slices in zip(shards, shard_slices):
+            if slice_id < len(slices):
+                tasks.append((shard, slice_id, slices[slice_id][0], slices[slice_id][1]))
+    return tasks
+
+
+def _concat_files(part_paths, file_path):
+    """ concat the part files into file_path in order and remove them with their manifests """
+    with open(file_path, 'wb') as f:
+        for part_path in part_paths:
+            with open(part_path, 'rb') as part:
+                shutil.copyfileobj(part, f)
+    for part_path in part_paths:
+        for path in (part_path, part_path + MANIFEST_SUFFIX):
+            if os.path.exists(path):
+                os.remove(path)
 
+
+def pull_log_dump(client, project_name, logstore_name, from_time, to_time, file_path, batch_size=None, compress=None,
+                  encodings=None, shard_list=None, no_escape=None, query=None, processor=None,
+                  compress_format=None, checkpoint_interval=None, resume=None, executor=None, slice_count=None):
     shards = client.list_shards(project_name, logstore_name).get_shards_info()
     current_shards = [str(shard['shardID']) for shard in shards]
     target_shards = _parse_shard_list(shard_list, current_shards)
-    worker_size = min(cpu_count, len(target_shards))
+    tasks = _plan_shard_slices(client, project_name, logstore_name, target_shards, from_time, to_time, slice_count)
 
+    # the slices of a shard are dumped into part files, which are concatenated into the file of the shard in order
+    part_paths = defaultdict(list)
     result = dict()
     total_count = 0
-    with ProcessPoolExecutor(max_workers=worker_size) as pool:
-        futures = [pool.submit(dump_worker, client, project_name, logstore_name, from_time, to_time,
-                               shard_id=shard, file_path=file_path.format(shard),
-                               batch_size=batch_size, compress=compress, encodings=encodings, no_escape=no_escape, query=query, processor=processor)
-                   for shard in target_shards]
+    with _create_shard_executor(executor, len(tasks)) as pool:
+        futures = {}
+        for shard, slice_id, slice_from_time, slice_to_time in tasks:
+            shard_file_path = dump_path = file_path.format(shard)
+            if slice_id is not None:
+                dump_path = '{0}.part{1}'.format(shard_file_path, slice_id)
+                part_paths[shard_file_path].append(dump_path)
+            future = pool.submit(dump_worker, client, project_name, logstore_name, slice_from_time, slice_to_time,
+                                 shard_id=shard, file_path=dump_path,
+                                 batch_size=batch_size, compress=compress, encodings=encodings, no_escape=no_escape, query=query, processor=processor,
+                                 compress_format=compress_format, checkpoint_interval=checkpoint_interval, resume=resume)
+            futures[future] = shard_file_path
 
         for future in as_completed(futures):
-            file_path, count = future.result()
+            _, count = future.result()
             total_count += count
             if count:
-                result[file_path] = count
+                result[futures[future]] = result.get(futures[future], 0) + count
+
+    for shard_file_path, paths in six.iteritems(part_paths):
+        _concat_files(paths, shard_file_path)
 
     return LogResponse({}, {"total_count": total_count, "files": result})
 
 
+def _get_shard_cursors(client, project, logstore, shard_id, from_time, to_time, checkpoint=None):
+    """ get (begin cursor, end cursor) of the shard, continue from the checkpoint if any """
+    if checkpoint is not None:
+        return checkpoint['next_cursor'], checkpoint['end_cursor']
+    begin_cursor = client.get_cursor(project, logstore, shard_id, from_time).get_cursor()
+    end_cursor = client.get_cursor(project, logstore, shard_id, to_time).get_cursor()
+    return begin_cursor, end_cursor
+
+
+def _iter_pull_logs(client, project, logstore, shard_id, begin_cursor, end_cursor, batch_size=None, compress=None,
+                    query=None, processor=None):
+    """ same as LogClient.pull_log but between cursors, yield PullLogResponse """
+    while True:
+        res = client.pull_logs(project, logstore, shard_id, begin_cursor,
+                               count=batch_size, end_cursor=end_cursor, compress=compress, query=query,
+                               processor=processor)
+        yield res
+        next_cursor = res.get_next_cursor()
+        if next_cursor == end_cursor:
+            break
+        begin_cursor = next_cursor
+
+
+def _coalesce_log_groups(log_groups, new_topic=None, new_source=None, max_size=MAX_LOG_GROUP_SIZE,
+                         max_count=MAX_PUT_LOG_COUNT):
+    """ merge consecutive log groups with the same topic, source and tags, up to the limits of a put request,
+    the logs are appended to the first group of the merged ones """
+    merged = merged_key = None
+    merged_size = 0
+    for log_group in log_groups:
+        if new_topic is not None:
+            log_group.Topic = new_topic
+        if new_source is not None:
+            log_group.Source = new_source
+        key = (log_group.Topic, log_group.Source, tuple((tag.Key, tag.Value) for tag in log_group.LogTags))
+        size = log_group.ByteSize()
+        if merged is not None and key == merged_key and merged_size + size <= max_size \
+                and len(merged.Logs) + len(log_group.Logs) <= max_count:
+            merged.Logs.extend(log_group.Logs)
+            merged_size += size
+            continue
+        if merged is not None:
+            yield merged
+        merged, merged_key, merged_size = log_group, key, size
+    if merged is not None:
+        yield merged
+
+
+def _coalesce_raw_log_groups(log_groups, new_topic=None, new_source=None, max_size=MAX_LOG_GROUP_SIZE,
+                             max_count=MAX_PUT_LOG_COUNT):
+    """ same as _coalesce_log_groups on LazyLogGroup at the wire level, the logs are copied as they are without
+    being decoded, topic and source are patched when they are passed
+
+    :return: iterator of (serialized LogGroup bytes, log count)
+    """
+    merged = []
+    merged_key = None
+    merged_size = merged_count = 0
+
+    def _serialize(groups):
+        if len(groups) == 1:
+            return groups[0].get_raw_bytes(new_topic, new_source)
+        data = bytearray()
+        for group in groups:
+            for raw_log in group.get_raw_logs():
+                data += raw_log
+        data += groups[0].get_raw_header(new_topic, new_source)
+        return bytes(data)
+
+    for log_group in log_groups:
+        key = (log_group.topic if new_topic is None else new_topic,
+               log_group.source if new_source is None else new_source,
+               tuple(sorted(log_group.tags.items())))
+        size, count = log_group.get_raw_size(), len(log_group)
+        if merged and key == merged_key and merged_size + size <= max_size and merged_count + count <= max_count:
+            merged.append(log_group)
+            merged_size += size
+            merged_count += count
+            continue
+        if merged:
+            yield _serialize(merged), merged_count
+        merged, merged_key, merged_size, merged_count = [log_group], key, size, count
+    if merged:
+        yield _serialize(merged), merged_count
+
+
 def copy_worker(from_client, from_project, from_logstore, shard_id, from_time, to_time,
                 to_client, to_project, to_logstore, batch_size=None, compress=None,
-                new_topic=None, new_source=None):
+                new_topic=None, new_source=None, checkpoint_dir=None, max_in_flight=None, passthrough=False,
+                slice_id=None):
     next_cursor = "As from_time configured"
+    max_in_flight = max_in_flight or 4
+    checkpoint_id = shard_id if slice_id is None else '{0}.{1}'.format(shard_id, slice_id)
 
     try:
-        iter_data = from_client.pull_log(from_project, from_logstore, shard_id, from_time, to_time, batch_size=batch_size,
-                                         compress=compress)
-
-        count = 0
-        for res in iter_data:
-            for loggroup in res.get_loggroup_list().LogGroups:
-                if new_topic is not None:
-                    loggroup.Topic = new_topic
-                if new_source is not None:
-                    loggroup.Source = new_source
-                rtn = to_client.put_log_raw(to_project, to_logstore, loggroup, compress=compress)
-                count += len(loggroup.Logs)
-
-            next_cursor = res.next_cursor
+        store = ShardCheckpointStore(checkpoint_dir) if checkpoint_dir else None
+        checkpoint = store.load(checkpoint_id) if store is not None else None
+        count = checkpoint['count'] if checkpoint is not None else 0
+        if checkpoint is not None and checkpoint['completed']:
+            return shard_id, count
+
+        begin_cursor, end_cursor = _get_shard_cursors(from_client, from_project, from_logstore, shard_id,
+                                                      from_time, to_time, checkpoint)
+        next_cursor = begin_cursor
+
+        # puts in flight in order, as (future, log count, cursor after the batch if it's the batch's last put),
+        # the next batch is pulled while they are running
+        in_flight = deque()
+        done_count = [count]
+
+        def _wait_in_flight(limit):
+            while len(in_flight) > limit:
+                future, log_count, batch_cursor = in_flight.popleft()
+                future.result()
+                done_count[0] += log_count
+                # save only when all puts of the batch are done
+                if batch_cursor is not None and store is not None:
+                    store.save(checkpoint_id, batch_cursor, end_cursor, completed=batch_cursor == end_cursor,
+                               count=done_count[0])
+
+        with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+            try:
+                for res in _iter_pull_logs(from_client, from_project, from_logstore, shard_id, begin_cursor,
+                                           end_cursor, batch_size=batch_size, compress=compress):
+                    if passthrough:
+                        log_groups = list(_coalesce_raw_log_groups(res.lazy_loggroup_list,
+                                                                   new_topic=new_topic, new_source=new_source))
+                    else:
+                        log_groups = [(log_group, len(log_group.Logs)) for log_group in
+                                      _coalesce_log_groups(res.get_loggroup_list().LogGroups,
+                                                           new_topic=new_topic, new_source=new_source)]
+                    for index, (loggroup, log_count) in enumerate(log_groups):
+                        _wait_in_flight(max_in_flight - 1)
+                        future = pool.submit(to_client.put_log_raw, to_project, to_logstore, loggroup,
+                                             compress=compress)
+                        batch_cursor = res.next_cursor if index == len(log_groups) - 1 else None
+                        in_flight.append((future, log_count, batch_cursor))
+
+                    next_cursor = res.next_cursor
+                    if not log_groups and not in_flight and store is not None:
+                        store.save(checkpoint_id, next_cursor, end_cursor, completed=next_cursor == end_cursor,
+                                   count=done_count[0])
+
+                _wait_in_flight(0)
+                count = done_count[0]
+                if store is not None:
+                    store.save(checkpoint_id, next_cursor, end_cursor, completed=next_cursor == end_cursor, count=count)
+            except Exception:
+                # keep the progress of the puts done before the failure, those not started are cancelled
+                exc_info = sys.exc_info()
+                for future, _, _ in in_flight:
+                    future.cancel()
+                try:
+                    _wait_in_flight(0)
+                except Exception:
+                    pass
+                six.reraise(*exc_info)
         return shard_id, count
     except Exception as ex:
         logger.error("copy data failed: task info {0} failed to copy data to target, next cursor: {1} detail: {2}".
@@ -562,7 +956,8 @@ def _parse_shard_list(shard_list, current_shard_list):
 def copy_data(from_client, from_project, from_logstore, from_time, to_time=None,
               to_client=None, to_project=None, to_logstore=None,
               shard_list=None,
-              batch_size=None, compress=None, new_topic=None, new_source=None):
+              batch_size=None, compress=None, new_topic=None, new_source=None, checkpoint_dir=None,
+              max_in_flight=None, passthrough=False, executor=None, slice_count=None):
     """
     copy data from one logstore to another one (could be the same or in different region), the time is log received time on server side.
 
@@ -576,27 +971,28 @@ def copy_data(from_client, from_project, from_logstore, from_time, to_time=None,
     to_logstore = to_logstore or from_logstore
     to_time = to_time or "end"
 
-    cpu_count = multiprocessing.cpu_count() * 2
     shards = from_client.list_shards(from_project, from_logstore).get_shards_info()
     current_shards = [str(shard['shardID']) for shard in shards]
     target_shards = _parse_shard_list(shard_list, current_shards)
-    worker_size = min(cpu_count, len(target_shards))
+    tasks = _plan_shard_slices(from_client, from_project, from_logstore, target_shards, from_time, to_time,
+                               slice_count)
 
     result = dict()
     total_count = 0
-    with ProcessPoolExecutor(max_workers=worker_size) as pool:
+    with _create_shard_executor(executor, len(tasks)) as pool:
         futures = [pool.submit(copy_worker, from_client, from_project, from_logstore, shard,
-                               from_time, to_time,
+                               slice_from_time, slice_to_time,
                                to_client, to_project, to_logstore,
                                batch_size=batch_size, compress=compress,
-                               new_topic=new_topic, new_source=new_source)
-                   for shard in target_shards]
+                               new_topic=new_topic, new_source=new_source, checkpoint_dir=checkpoint_dir,
+                               max_in_flight=max_in_flight, passthrough=passthrough, slice_id=slice_id)
+                   for shard, slice_id, slice_from_time, slice_to_time in tasks]
 
         for future in as_completed(futures):
             partition, count = future.result()
             total_count += count
             if count:
-                result[partition] = count
+                result[partition] = result.get(partition, 0) + count
 
     return LogResponse({}, {"total_count": total_count, "shards": result})
 
@@ -760,8 +1156,12 @@ def put_logs_auto_div(client, req, div=1):
         raise ex
 
 
-def _transform_events_to_logstore(runner, events, to_client, to_project, to_logstore):
-    count = removed = processed = failed = 0
+def _transform_events(runner, events):
+    """ transform the events and group the results by minute, topic and source
+
+    :return: count, removed, dict of (minute, topic, source) to the transformed events
+    """
+    count = removed = 0
     new_events = defaultdict(list)
 
     default_time = time.time()
@@ -793,6 +1193,24 @@ def _transform_events_to_logstore(runner, events, to_client, to_project, to_logs
 
             new_events[(dt, topic, source)].append(event)
 
+    return count, removed, dict(new_events)
+
+
+# runners created in the transform processes of the hybrid executor, by config
+_process_runners = {}
+
+
+def _transform_events_in_process(config, events):
+    """ _transform_events run in the transform process pool, the runner is created once in each process """
+    runner = _process_runners.get(config)
+    if runner is None:
+        runner = _process_runners[config] = Runner(config)
+    return _transform_events(runner, events)
+
+
+def _put_transformed_events(new_events, to_client, to_project, to_logstore):
+    processed = 0
+    default_time = time.time()
     for (dt, topic, source), contents in six.iteritems(new_events):
 
         items = []
@@ -810,30 +1228,55 @@ def _transform_events_to_logstore(runner, events, to_client, to_project, to_logs
         res = put_logs_auto_div(to_client, req)
         processed += len(items)
 
-    return count, removed, processed, failed
+    return processed
+
+
+def _transform_events_to_logstore(runner, events, to_client, to_project, to_logstore):
+    count, removed, new_events = _transform_events(runner, events)
+    processed = _put_transformed_events(new_events, to_client, to_project, to_logstore)
+    return count, removed, processed, 0
 
 
 def transform_worker(from_client, from_project, from_logstore, shard_id, from_time, to_time,
                      config,
                      to_client, to_project, to_logstore, batch_size=None, compress=None,
+                     checkpoint_dir=None, transform_executor=None, slice_id=None
                      ):
     next_cursor = "As from_time configured"
+    checkpoint_id = shard_id if slice_id is None else '{0}.{1}'.format(shard_id, slice_id)
     try:
-        runner = Runner(config)
-        iter_data = from_client.pull_log(from_project, from_logstore, shard_id, from_time, to_time, batch_size=batch_size,
-                                         compress=compress)
-
+        store = ShardCheckpointStore(checkpoint_dir) if checkpoint_dir else None
+        checkpoint = store.load(checkpoint_id) if store is not None else None
         count = removed = processed = failed = 0
-        for s in iter_data:
+        if checkpoint is not None:
+            count, removed, processed, failed = (checkpoint['count'], checkpoint['removed'],
+                                                 checkpoint['processed'], checkpoint['failed'])
+            if checkpoint['completed']:
+                return shard_id, count, removed, processed, failed
+
+        runner = Runner(config) if transform_executor is None else None
+        begin_cursor, end_cursor = _get_shard_cursors(from_client, from_project, from_logstore, shard_id,
+                                                      from_time, to_time, checkpoint)
+        next_cursor = begin_cursor
+        for s in _iter_pull_logs(from_client, from_project, from_logstore, shard_id, begin_cursor, end_cursor,
+                                 batch_size=batch_size, compress=compress):
             events = s.get_flatten_logs_json_auto()
 
-            c, r, p, f = _transform_events_to_logstore(runner, events, to_client, to_project, to_logstore)
+            if transform_executor is None:
+                c, r, new_events = _transform_events(runner, events)
+            else:
+                c, r, new_events = transform_executor.submit(_transform_events_in_process, config, events).result()
+            p = _put_transformed_events(new_events, to_client, to_project, to_logstore)
+            f = 0
             count += c
             removed += r
             processed += p
             failed += f
 
             next_cursor = s.next_cursor
+            if store is not None:
+                store.save(checkpoint_id, next_cursor, end_cursor, completed=next_cursor == end_cursor,
+                           count=count, removed=removed, processed=processed, failed=failed)
         return shard_id, count, removed, processed, failed
     except Exception as ex:
         logger.error("transform data failed: task info {0} failed to copy data to target, next cursor: {1} detail: {2}".
@@ -888,7 +1331,8 @@ def transform_data(from_client, from_project, from_logstore, from_time,
                    batch_size=None, compress=None,
                    cg_name=None, c_name=None,
                    cg_heartbeat_interval=None, cg_data_fetch_interval=None, cg_in_order=None,
-                   cg_worker_pool_size=None
+                   cg_worker_pool_size=None,
+                   checkpoint_dir=None, executor=None, slice_count=None
                    ):
     """
     transform data from one logstore to another one (could be the same or in different region), the time is log received time on server side.
@@ -899,7 +1343,8 @@ def transform_data(from_client, from_project, from_logstore, from_time,
         return copy_data(from_client, from_project, from_logstore, from_time, to_time=to_time,
                          to_client=to_client, to_project=to_project, to_logstore=to_logstore,
                          shard_list=shard_list,
-                         batch_size=batch_size, compress=compress)
+                         batch_size=batch_size, compress=compress, checkpoint_dir=checkpoint_dir,
+                         executor=executor, slice_count=slice_count)
 
     to_client = to_client or from_client
 
@@ -911,34 +1356,48 @@ def transform_data(from_client, from_project, from_logstore, from_time,
 
     if not cg_name:
         # batch mode
+        if executor == 'hybrid' and inspect.ismodule(config):
+            raise LogException('InvalidParameter', 'executor "hybrid" runs the transforms in processes, the config '
+                                                   'should be the path of the config file instead of a module')
         to_time = to_time or "end"
-        cpu_count = multiprocessing.cpu_count() * 2
         shards = from_client.list_shards(from_project, from_logstore).get_shards_info()
         current_shards = [str(shard['shardID']) for shard in shards]
         target_shards = _parse_shard_list(shard_list, current_shards)
-
-        worker_size = min(cpu_count, len(target_shards))
+        tasks = _plan_shard_slices(from_client, from_project, from_logstore, target_shards, from_time, to_time,
+                                   slice_count)
 
         result = dict()
         total_count = 0
         total_removed = 0
-        with ProcessPoolExecutor(max_workers=worker_size) as pool:
-            futures = [pool.submit(transform_worker, from_client, from_project, from_logstore, shard,
-                                   from_time, to_time, config,
-                                   to_client, to_project, to_logstore,
-                                   batch_size=batch_size, compress=compress)
-                       for shard in target_shards]
-
-            for future in as_completed(futures):
-                if future.exception():
-                    logger.error("get error when transforming data: {0}".format(future.exception()))
-                else:
-                    partition, count, removed, processed, failed = future.result()
-                    total_count += count
-                    total_removed += removed
-                    if count:
-                        result[partition] = {"total_count": count, "transformed":
-                            processed, "removed": removed, "failed": failed}
+        transform_executor = None
+        if executor == 'hybrid':
+            transform_executor = ProcessPoolExecutor(max_workers=multiprocessing.cpu_count())
+        try:
+            with _create_shard_executor(executor, len(tasks)) as pool:
+                futures = [pool.submit(transform_worker, from_client, from_project, from_logstore, shard,
+                                       slice_from_time, slice_to_time, config,
+                                       to_client, to_project, to_logstore,
+                                       batch_size=batch_size, compress=compress, checkpoint_dir=checkpoint_dir,
+                                       transform_executor=transform_executor, slice_id=slice_id)
+                           for shard, slice_id, slice_from_time, slice_to_time in tasks]
+
+                for future in as_completed(futures):
+                    if future.exception():
+                        logger.error("get error when transforming data: {0}".format(future.exception()))
+                    else:
+                        partition, count, removed, processed, failed = future.result()
+                        total_count += count
+                        total_removed += removed
+                        if count:
+                            data = result.get(partition,
+                                              {"total_count": 0, "transformed": 0, "removed": 0, "failed": 0})
+                            result[partition] = {"total_count": data["total_count"] + count,
+                                                 "transformed": data["transformed"] + processed,
+                                                 "removed": data["removed"] + removed,
+                                                 "failed": data["failed"] + failed}
+        finally:
+            if transform_executor is not None:
+                transform_executor.shutdown()
 
         return LogResponse({}, {"total_count": total_count, "shards": result})
 
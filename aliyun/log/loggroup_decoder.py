@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*-
+
+import struct
+
+import six
+
+from .logexception import LogException
+from .loggroup_encoder import _encode_varint
+
+_WIRE_VARINT = 0
+_WIRE_FIXED64 = 1
+_WIRE_LENGTH_DELIMITED = 2
+_WIRE_FIXED32 = 5
+
+_unpack_fixed32 = struct.Struct('<I').unpack_from
+_missing = object()
+
+
+def _read_varint(buf, pos):
+    b = buf[pos]
+    if b < 128:
+        return b, pos + 1
+    result = 0
+    shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7f) << shift
+        if b < 128:
+            return result, pos
+        shift += 7
+
+
+def _iter_fields(buf, start, end):
+    """ yield (field_number, wire_type, value, value_end) of a message in buf[start:end],
+    value is the start offset for length-delimited fields, and the decoded number for the others.
+    """
+    pos = start
+    while pos < end:
+        tag, pos = _read_varint(buf, pos)
+        wire_type = tag & 0x7
+        if wire_type == _WIRE_LENGTH_DELIMITED:
+            length, pos = _read_varint(buf, pos)
+            value_end = pos + length
+            yield tag >> 3, wire_type, pos, value_end
+            pos = value_end
+        elif wire_type == _WIRE_VARINT:
+            value, pos = _read_varint(buf, pos)
+            yield tag >> 3, wire_type, value, pos
+        elif wire_type == _WIRE_FIXED32:
+            yield tag >> 3, wire_type, _unpack_fixed32(buf, pos)[0], pos + 4
+            pos += 4
+        elif wire_type == _WIRE_FIXED64:
+            pos += 8
+        else:
+            raise LogException('BadResponse', 'unsupported wire type {0} at offset {1}'.format(wire_type, pos))
+    if pos != end:
+        raise LogException('BadResponse', 'truncated message at offset {0}'.format(start))
+
+
+def _to_text(buf, start, end):
+    """ decode utf8 string, return bytes when it's not valid utf8 """
+    try:
+        return bytes(buf[start:end]).decode('utf8') if six.PY2 else str(buf[start:end], 'utf8')
+    except UnicodeDecodeError:
+        return bytes(buf[start:end])
+
+
+def _to_key_bytes(key):
+    if isinstance(key, six.text_type):
+        return key.encode('utf8')
+    return key
+
+
+class LazyLog(object):
+    """ A log in LogGroupList, its fields are decoded from the underlying buffer on access.
+    Attributes Time, Time_ns and Contents are kept compatible with the protobuf Log.
+    """
+
+    __slots__ = ('_buf', '_start', '_end', 'log_group', '_time', '_time_ns', '_spans')
+
+    def __init__(self, buf, start, end, log_group=None):
+        self._buf = buf
+        self._start = start
+        self._end = end
+        self.log_group = log_group
+        self._spans = None
+
+    def _index(self):
+        self._time = 0
+        self._time_ns = 0
+        spans = []
+        buf = self._buf
+        for field, wire_type, value, value_end in _iter_fields(buf, self._start, self._end):
+            if field == 2 and wire_type == _WIRE_LENGTH_DELIMITED:
+                key_span = value_span = (value, value)
+                for f, w, v, v_end in _iter_fields(buf, value, value_end):
+                    if f == 1:
+                        key_span = (v, v_end)
+                    elif f == 2:
+                        value_span = (v, v_end)
+                spans.append(key_span + value_span)
+            elif field == 1:
+                self._time = value
+            elif field == 4:
+                self._time_ns = value
+        self._spans = spans
+
+    @property
+    def time(self):
+        if self._spans is None:
+            self._index()
+        return self._time
+
+    @property
+    def time_ns(self):
+        if self._spans is None:
+            self._index()
+        return self._time_ns
+
+    def get(self, key, default=None):
+        """ get value of the key, only the value of the key is decoded
+
+        :type key: string
+        :param key: the key
+
+        :return: the value, or default if the key doesn't exist
+        """
+        if self._spans is None:
+            self._index()
+        key = _to_key_bytes(key)
+        key_len = len(key)
+        buf = self._buf
+        for key_start, key_end, value_start, value_end in self._spans:
+            if key_end - key_start == key_len and buf[key_start:key_end] == key:
+                return _to_text(buf, value_start, value_end)
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key, _missing)
+        if value is _missing:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _missing) is not _missing
+
+    def keys(self):
+        if self._spans is None:
+            self._index()
+        return [_to_text(self._buf, span[0], span[1]) for span in self._spans]
+
+    def get_contents(self):
+        """ decode all contents
+
+        :return: tuple(key-value) list
+        """
+        if self._spans is None:
+            self._index()
+        buf = self._buf
+        return [(_to_text(buf, key_start, key_end), _to_text(buf, value_start, value_end))
+                for key_start, key_end, value_start, value_end in self._spans]
+
+    def to_dict(self):
+        """ decode the log to a dict with __time__, __topic__, __source__, tags and contents,
+        same as the items of PullLogResponse.get_flatten_logs_json
+        """
+        item = {u'__time__': self.time}
+        if self.log_group is not None:
+            item[u'__topic__'] = self.log_group.topic
+            item[u'__source__'] = self.log_group.source
+        if self.time_ns:
+            item[u'__time_ns_part__'] = self.time_ns
+        if self.log_group is not None:
+            for key, value in self.log_group.tags.items():
+                item[u"__tag__:{0}".format(key)] = value
+        item.update(self.get_contents())
+        return item
+
+    @property
+    def Time(self):
+        return self.time
+
+    @property
+    def Time_ns(self):
+        return self.time_ns
+
+    @property
+    def Contents(self):
+        return [_KeyValue(key, value) for key, value in self.get_contents()]
+
+
+class _KeyValue(object):
+    __slots__ = ('Key', 'Value')
+
+    def __init__(self, key, value):
+        self.Key = key
+        self.Value = value
+
+
+class LazyLogGroup(object):
+    """ A LogGroup in LogGroupList, the logs are located on first access and decoded on demand.
+    Attributes Topic, Source, LogTags and Logs are kept compatible with the protobuf LogGroup.
+    """
+
+    def __init__(self, buf, start, end):
+        self._buf = buf
+        self._start = start
+        self._end = end
+        self._log_spans = None
+        self._tags = None
+
+    def _index(self):
+        self._topic = u''
+        self._source = u''
+        self._tag_spans = []
+        # spans of the whole fields including the tags, to copy them at the wire level
+        self._raw_log_spans = []
+        self._raw_header_spans = []
+        log_spans = []
+        buf = self._buf
+        field_start = self._start
+        for field, wire_type, value, value_end in _iter_fields(buf, self._start, self._end):
+            if field == 1 and wire_type == _WIRE_LENGTH_DELIMITED:
+                log_spans.append((value, value_end))
+                self._raw_log_spans.append((field_start, value_end))
+            else:
+                self._raw_header_spans.append((field, field_start, value_end))
+                if field == 3 and wire_type == _WIRE_LENGTH_DELIMITED:
+                    self._topic = _to_text(buf, value, value_end)
+                elif field == 4 and wire_type == _WIRE_LENGTH_DELIMITED:
+                    self._source = _to_text(buf, value, value_end)
+                elif field == 6 and wire_type == _WIRE_LENGTH_DELIMITED:
+                    self._tag_spans.append((value, value_end))
+            field_start = value_end
+        self._log_spans = log_spans
+
+    @property
+    def topic(self):
+        if self._log_spans is None:
+            self._index()
+        return self._topic
+
+    @property
+    def source(self):
+        if self._log_spans is None:
+            self._index()
+        return self._source
+
+    @property
+    def tags(self):
+        """ :return: dict, the tags of the log group """
+        if self._tags is not None:
+            return self._tags
+        if self._log_spans is None:
+            self._index()
+        tags = {}
+        for start, end in self._tag_spans:
+            key = value = u''
+            for field, wire_type, v, v_end in _iter_fields(self._buf, start, end):
+                if field == 1:
+                    key = _to_text(self._buf, v, v_end)
+                elif field == 2:
+                    value = _to_text(self._buf, v, v_end)
+            tags[key] = value
+        self._tags = tags
+        return tags
+
+    @property
+    def logs(self):
+        if self._log_spans is None:
+            self._index()
+        return [LazyLog(self._buf, start, end, self) for start, end in self._log_spans]
+
+    def __len__(self):
+        if self._log_spans is None:
+            self._index()
+        return len(self._log_spans)
+
+    def __iter__(self):
+        if self._log_spans is None:
+            self._index()
+        for start, end in self._log_spans:
+            yield LazyLog(self._buf, start, end, self)
+
+    def get_raw_size(self):
+        """ :return: int, size of the serialized LogGroup """
+        return self._end - self._start
+
+    def get_raw_logs(self):
+        """ the serialized Logs fields as they are in the buffer, without decoding
+
+        :return: list of memoryview (bytearray in py2)
+        """
+        if self._log_spans is None:
+            self._index()
+        return [self._buf[start:end] for start, end in self._raw_log_spans]
+
+    def get_raw_header(self, topic=None, source=None):
+        """ the serialized fields other than Logs, e.g. Topic, Source and LogTags, as they are in the buffer
+
+        :type topic: string
+        :param topic: overwrite the topic if it's not None
+
+        :type source: string
+        :param source: overwrite the source if it's not None
+
+        :return: bytes
+        """
+        if self._log_spans is None:
+            self._index()
+        header = bytearray()
+        for field, start, end in self._raw_header_spans:
+            if (field == 3 and topic is not None) or (field == 4 and source is not None):
+                continue
+            header += self._buf[start:end]
+        for field, value in ((3, topic), (4, source)):
+            if value is not None:
+                value = _to_key_bytes(value)
+                header += _encode_varint((field << 3) | _WIRE_LENGTH_DELIMITED)
+                header += _encode_varint(len(value))
+                header += value
+        return bytes(header)
+
+    def get_raw_bytes(self, topic=None, source=None):
+        """ the serialized LogGroup, patched at the wire level when topic or source is passed
+
+        :return: bytes
+        """
+        if topic is None and source is None:
+            return bytes(self._buf[self._start:self._end])
+        data = bytearray()
+        for raw_log in self.get_raw_logs():
+            data += raw_log
+        data += self.get_raw_header(topic, source)
+        return bytes(data)
+
+    @property
+    def Topic(self):
+        return self.topic
+
+    @property
+    def Source(self):
+        return self.source
+
+    @property
+    def LogTags(self):
+        return [_KeyValue(key, value) for key, value in self.tags.items()]
+
+    @property
+    def Logs(self):
+        return self.logs
+
+
+class LazyLogGroupList(object):
+    """ Lazy decoder of serialized LogGroupList. Only the boundaries of the log groups are indexed when it's
+    created, logs and their fields are decoded when they are accessed, the values are views of the
+    underlying buffer until then.
+    Attribute LogGroups is kept compatible with the protobuf LogGroupList.
+
+    :type data: bytes
+    :param data: the serialized LogGroupList, e.g. decompressed body of pull_logs
+
+    :raise: LogException
+    """
+
+    def __init__(self, data):
+        # py2 memoryview returns str when indexing, use bytearray to get int
+        self._buf = memoryview(data) if six.PY3 else bytearray(data)
+        self._log_groups = [LazyLogGroup(self._buf, value, value_end) for field, wire_type, value, value_end
+                            in _iter_fields(self._buf, 0, len(self._buf))
+                            if field == 1 and wire_type == _WIRE_LENGTH_DELIMITED]
+
+    def __len__(self):
+        return len(self._log_groups)
+
+    def __getitem__(self, index):
+        return self._log_groups[index]
+
+    def __iter__(self):
+        return iter(self._log_groups)
+
+    def iter_logs(self):
+        """ iterate all the logs
+
+        :return: iterator of LazyLog
+        """
+        for log_group in self:
+            for log in log_group:
+                yield log
+
+    @property
+    def LogGroups(self):
+        return self._log_groups
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+import struct
+
+import six
+
+from .logexception import LogException
+
+MAX_LOG_GROUP_SIZE = 10 * 1024 * 1024  # 10 MB
+
+# wire tags of LogGroupRaw, see log_logs_raw.proto
+_TAG_LOG_GROUP_LOGS = b'\x0a'  # field 1, length-delimited
+_TAG_LOG_GROUP_TOPIC = b'\x1a'  # field 3, length-delimited
+_TAG_LOG_GROUP_SOURCE = b'\x22'  # field 4, length-delimited
+_TAG_LOG_GROUP_TAGS = b'\x32'  # field 6, length-delimited
+_TAG_LOG_TIME = b'\x08'  # field 1, varint
+_TAG_LOG_CONTENTS = b'\x12'  # field 2, length-delimited
+_TAG_LOG_TIME_NS = b'\x25'  # field 4, fixed32
+_TAG_KEY = b'\x0a'  # field 1, length-delimited
+_TAG_VALUE = b'\x12'  # field 2, length-delimited
+
+_fixed32 = struct.Struct('<I').pack
+
+
+def _build_varints(count):
+    varints = []
+    for value in range(count):
+        buf = bytearray()
+        while value >= 128:
+            buf.append((value & 0x7f) | 0x80)
+            value >>= 7
+        buf.append(value)
+        varints.append(bytes(buf))
+    return varints
+
+
+# varints of 0 ~ 16383 (one or two bytes), covers the length of most keys and values
+_VARINT_TABLE_SIZE = 16384
+_varints = _build_varints(_VARINT_TABLE_SIZE)
+_value_headers = [_TAG_VALUE + v for v in _varints]
+_MAX_CACHED_KEYS = 4096
+
+
+def _encode_varint(value):
+    if value < _VARINT_TABLE_SIZE:
+        return _varints[value]
+    buf = bytearray()
+    while value >= 128:
+        buf.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buf.append(value)
+    return bytes(buf)
+
+
+def _to_bytes(data):
+    if isinstance(data, six.text_type):
+        return data.encode('utf-8')
+    return data
+
+
+class LogGroupEncoder(object):
+    """ Encode logs to the wire format of LogGroupRaw directly, without building protobuf objects.
+    The output is byte-to-byte identical with LogGroupRaw.SerializeToString().
+
+    :type max_size: int
+    :param max_size: maximum size of the encoded log group, default is 10 MB. LogException is raised once
+    the logs added exceed it.
+    """
+
+    def __init__(self, max_size=MAX_LOG_GROUP_SIZE):
+        self.max_size = max_size
+        self._buf = bytearray()
+        self._key_cache = {}
+
+    def _encode_key(self, key):
+        """ keys repeat across logs, cache the encoded (tag, length, key) prefix of them """
+        encoded = self._key_cache.get(key)
+        if encoded is None:
+            key_bytes = _to_bytes(key)
+            encoded = _TAG_KEY + _encode_varint(len(key_bytes)) + key_bytes
+            if len(self._key_cache) < _MAX_CACHED_KEYS:
+                self._key_cache[key] = encoded
+        return encoded
+
+    def add_log(self, timestamp, contents, time_nano_part=None):
+        """ append a log
+
+        :type timestamp: int
+        :param timestamp: log time in seconds
+
+        :type contents: tuple(key-value) list
+        :param contents: the data of the log
+
+        :type time_nano_part: int
+        :param time_nano_part: time nano part of the log, optional
+
+        :raise: LogException
+        """
+        varint = _encode_varint
+        value_headers = _value_headers
+        key_cache = self._key_cache
+
+        parts = [_TAG_LOG_TIME, varint(timestamp)]
+        append = parts.append
+        for key, value in contents:
+            encoded_key = key_cache.get(key) or self._encode_key(key)
+            if not isinstance(value, bytes):
+                value = value.encode('utf-8')
+            value_len = len(value)
+            value_header = value_headers[value_len] if value_len < _VARINT_TABLE_SIZE \
+                else _TAG_VALUE + varint(value_len)
+            append(_TAG_LOG_CONTENTS)
+            append(varint(len(encoded_key) + len(value_header) + value_len))
+            append(encoded_key)
+            append(value_header)
+            append(value)
+        if time_nano_part is not None:
+            append(_TAG_LOG_TIME_NS)
+            append(_fixed32(time_nano_part))
+        log = b''.join(parts)
+
+        buf = self._buf
+        buf += _TAG_LOG_GROUP_LOGS
+        buf += varint(len(log))
+        buf += log
+        if len(buf) > self.max_size:
+            self._check_size(len(buf))
+
+    def add_log_item(self, log_item):
+        """ append a LogItem
+
+        :type log_item: LogItem
+        :param log_item: the log
+
+        :raise: LogException
+        """
+        self.add_log(log_item.get_time(), log_item.get_contents(), log_item.get_time_nano_part())
+
+    def size(self):
+        return len(self._buf)
+
+    def _check_size(self, size):
+        if size > self.max_size:
+            raise LogException('InvalidLogSize',
+                               "logItems' size exceeds maximum limitation: 10 MB. now: {0} MB.".format(
+                                   size / 1024.0 / 1024))
+
+    def encode(self, topic=None, source=None, logtags=None):
+        """ finish the log group
+
+        :type topic: string
+        :param topic: topic of the log group
+
+        :type source: string
+        :param source: source of the log group
+
+        :type logtags: list
+        :param logtags: list of key:value tag pair , [(tag_key_1,tag_value_1) , (tag_key_2,tag_value_2)]
+
+        :return: bytes, serialized LogGroupRaw
+
+        :raise: LogException
+        """
+        tail = bytearray()
+        if topic is not None:
+            topic = _to_bytes(topic)
+            tail += _TAG_LOG_GROUP_TOPIC
+            tail += _encode_varint(len(topic))
+            tail += topic
+        if source is not None:
+            source = _to_bytes(source)
+            tail += _TAG_LOG_GROUP_SOURCE
+            tail += _encode_varint(len(source))
+            tail += source
+        for key, value in logtags or []:
+            key = _to_bytes(key)
+            value = _to_bytes(value)
+            tag = _TAG_KEY + _encode_varint(len(key)) + key + _TAG_VALUE + _encode_varint(len(value)) + value
+            tail += _TAG_LOG_GROUP_TAGS
+            tail += _encode_varint(len(tag))
+            tail += tag
+        self._check_size(len(self._buf) + len(tail))
+        return b''.join((self._buf, tail))
+
+
+def encode_log_group(log_items, topic=None, source=None, logtags=None, max_size=MAX_LOG_GROUP_SIZE):
+    """ serialize the log items to LogGroupRaw bytes
+
+    :type log_items: list<LogItem>
+    :param log_items: the logs
+
+    :return: bytes
+
+    :raise: LogException
+    """
+    encoder = LogGroupEncoder(max_size)
+    add_log = encoder.add_log
+    for log_item in log_items:
+        add_log(log_item.get_time(), log_item.get_contents(), log_item.get_time_nano_part())
+    return encoder.encode(topic, source, logtags)
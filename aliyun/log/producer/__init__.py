@@ -0,0 +1,3 @@
+from .config import ProducerConfig
+from .producer import Producer
+from .batch import ProducerResult, Attempt
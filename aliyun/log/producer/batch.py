@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+
+from concurrent.futures import Future
+
+from ..loggroup_encoder import _to_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class Attempt(object):
+    """ one attempt of sending a batch """
+
+    def __init__(self, success, request_id='', error_code='', error_message='', timestamp=None):
+        self.success = success
+        self.request_id = request_id
+        self.error_code = error_code
+        self.error_message = error_message
+        self.timestamp = timestamp or time.time()
+
+    def __str__(self):
+        return "Attempt(success={0}, request_id={1}, error_code={2}, error_message={3})".format(
+            self.success, self.request_id, self.error_code, self.error_message)
+
+
+class ProducerResult(object):
+    """ Result of sending the logs passed to one Producer.send call,
+    shared by all the futures of the same batch.
+    """
+
+    def __init__(self, attempts):
+        self.attempts = attempts
+
+    def is_successful(self):
+        return bool(self.attempts) and self.attempts[-1].success
+
+    def get_request_id(self):
+        return self.attempts[-1].request_id if self.attempts else ''
+
+    def get_error_code(self):
+        return self.attempts[-1].error_code if self.attempts else ''
+
+    def get_error_message(self):
+        return self.attempts[-1].error_message if self.attempts else ''
+
+    def get_attempts(self):
+        return self.attempts
+
+    def log_print(self):
+        print('successful', self.is_successful())
+        for attempt in self.attempts:
+            print(attempt)
+
+
+def _varint_size(value):
+    size = 1
+    while value >= 128:
+        value >>= 7
+        size += 1
+    return size
+
+
+def estimate_log_size(log_item):
+    """ size of a log item in a serialized log group, the contents are measured in utf-8 bytes as the encoder does """
+    size = 1 + _varint_size(log_item.get_time())
+    if log_item.get_time_nano_part() is not None:
+        size += 5
+    for key, value in log_item.get_contents():
+        key_size, value_size = len(_to_bytes(key)), len(_to_bytes(value))
+        content_size = 2 + _varint_size(key_size) + key_size + _varint_size(value_size) + value_size
+        size += 1 + _varint_size(content_size) + content_size
+    return 1 + _varint_size(size) + size
+
+
+class ProducerBatch(object):
+    """ logs of the same (project, logstore, topic, source, hash_key) waiting to be sent in one PutLogs call """
+
+    def __init__(self, key, created_time=None):
+        self.key = key
+        self.project, self.logstore, self.topic, self.source, self.hash_key = key
+        self.created_time = created_time or time.time()
+        self.log_items = []
+        self.size = 0
+        self.futures = []
+        self.callbacks = []
+        self.attempts = []
+
+    def try_append(self, log_items, size, max_batch_size_in_bytes, max_batch_count, callback=None):
+        """ append the logs to the batch if they fit, always succeed when the batch is empty
+
+        :return: Future, or None if the batch is full
+        """
+        if self.log_items and (self.size + size > max_batch_size_in_bytes
+                               or len(self.log_items) + len(log_items) > max_batch_count):
+            return None
+
+        self.log_items.extend(log_items)
+        self.size += size
+        future = Future()
+        self.futures.append(future)
+        self.callbacks.append(callback)
+        return future
+
+    def is_full(self, max_batch_size_in_bytes, max_batch_count):
+        return self.size >= max_batch_size_in_bytes or len(self.log_items) >= max_batch_count
+
+    def is_expired(self, linger_ms, now=None):
+        return ((now or time.time()) - self.created_time) * 1000 >= linger_ms
+
+    def complete(self):
+        result = ProducerResult(self.attempts)
+        for future in self.futures:
+            future.set_result(result)
+        for callback in self.callbacks:
+            if callback is None:
+                continue
+            try:
+                callback(result)
+            except Exception as ex:
+                logger.error("failed to call the callback of batch %s/%s: %s", self.project, self.logstore, ex,
+                             exc_info=True)
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+
+class ProducerConfig(object):
+
+    def __init__(self, total_size_in_bytes=None, max_block_sec=None, io_thread_count=None,
+                 max_batch_size_in_bytes=None, max_batch_count=None, linger_ms=None,
+                 retries=None, base_retry_backoff_ms=None, max_retry_backoff_ms=None,
+                 compress_type=None, logtags=None, compress_level=None):
+        """
+
+        :param total_size_in_bytes: default 100MB, upper limit of the logs buffered by one producer, send() blocks when it's reached.
+        :param max_block_sec: default 60, maximum time send() waits for buffer space, LogException "ProducerTimeout" is raised after it. set it to 0 to fail immediately.
+        :param io_thread_count: default 8, number of threads sending batches to the server.
+        :param max_batch_size_in_bytes: default 512KB, a batch is sent once its size reaches this value. maximum is 5MB.
+        :param max_batch_count: default 4096, a batch is sent once it holds this count of logs. maximum is 40960.
+        :param linger_ms: default 2000, a batch is sent after this time even if it's not full. minimum is 100.
+        :param retries: default 10, retry times for a batch failed with a retryable error. the server errors and timeouts are retried by the client per its RetryPolicy, they're retried here only if the client doesn't.
+        :param base_retry_backoff_ms: default 100, the first backoff before retrying, doubled on each retry.
+        :param max_retry_backoff_ms: default 50000, upper limit of the backoff.
+        :param compress_type: compress type of each batch, e.g. lz4, zstd, default is lz4.
+        :param logtags: list of key:value tag pair attached to each batch, [(tag_key_1,tag_value_1) , (tag_key_2,tag_value_2)]
+        :param compress_level: compression level of compress_type, e.g. 3 for zstd, default is the one of the codec.
+        """
+        self.total_size_in_bytes = total_size_in_bytes or 100 * 1024 * 1024
+        self.max_block_sec = 60 if max_block_sec is None else max_block_sec
+        self.io_thread_count = io_thread_count or 8
+        self.max_batch_size_in_bytes = min(max_batch_size_in_bytes or 512 * 1024, 5 * 1024 * 1024)
+        self.max_batch_count = min(max_batch_count or 4096, 40960)
+        self.linger_ms = max(linger_ms or 2000, 100)
+        self.retries = 10 if retries is None else retries
+        self.base_retry_backoff_ms = base_retry_backoff_ms or 100
+        self.max_retry_backoff_ms = max_retry_backoff_ms or 50 * 1000
+        self.compress_type = compress_type
+        self.logtags = logtags
+        self.compress_level = compress_level
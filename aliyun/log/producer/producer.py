@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+from threading import Condition, Thread
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ..logclient import LogClient
+from ..logexception import LogException
+from ..loggroup_encoder import MAX_LOG_GROUP_SIZE
+from ..logitem import LogItem
+from ..putlogsrequest import PutLogsRequest
+from .batch import Attempt, ProducerBatch, estimate_log_size
+from .config import ProducerConfig
+
+logger = logging.getLogger(__name__)
+
+_RETRYABLE_ERROR_CODES = ('WriteQuotaExceed', 'ShardWriteQuotaExceed', 'ProjectQuotaExceed')
+
+# logs of one send call are sent in one batch, they must fit in one PutLogs request
+MAX_SEND_COUNT = 40960
+
+
+class Producer(object):
+    """ Producer buffers the logs per (project, logstore, topic, source, hash_key) and sends them in batch
+    with a bounded thread pool. a batch is sent once it's full or lingers for config.linger_ms.
+
+    e.g.
+        producer = Producer(client)
+        future = producer.send(project, logstore, LogItem(contents=[('k', 'v')]), callback=on_result)
+        ...
+        producer.close()
+
+    :type client: LogClient
+    :param client: the client used to send the batches, it's shared by all the io threads.
+
+    :type config: ProducerConfig
+    :param config: producer config, default is ProducerConfig()
+    """
+
+    def __init__(self, client, config=None):
+        self.client = client
+        self.config = config or ProducerConfig()
+        self._cond = Condition()
+        self._batches = {}
+        self._buffered_size = 0
+        self._in_flight = 0
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=self.config.io_thread_count)
+        self._mover = Thread(target=self._move_expired_batches)
+        self._mover.daemon = True
+        self._mover.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def send(self, project, logstore, log_items, topic='', source=None, hash_key=None, callback=None):
+        """ buffer the logs, they will be sent with other logs of the same project, logstore, topic, source and hash_key
+
+        :type project: string
+        :param project: project name
+
+        :type logstore: string
+        :param logstore: logstore name
+
+        :type log_items: LogItem or list<LogItem>
+        :param log_items: the logs
+
+        :type topic: string
+        :param topic: topic name, default is empty
+
+        :type source: string
+        :param source: source of the logs, default is the source of the client
+
+        :type hash_key: string
+        :param hash_key: put data with set hash, the data will be send to shard whose range contains the hashKey
+
+        :type callback: function
+        :param callback: called with the ProducerResult in io thread once the logs are sent or finally failed
+
+        :return: Future, its result is a ProducerResult
+
+        :raise: LogException, InvalidLogSize if the logs are more than 10MB or 40960 logs, split them into
+            multiple send calls
+        """
+        if isinstance(log_items, LogItem):
+            log_items = [log_items]
+        size = sum(estimate_log_size(item) for item in log_items)
+        if size > MAX_LOG_GROUP_SIZE or len(log_items) > MAX_SEND_COUNT:
+            raise LogException('InvalidLogSize', "logs of one send call are sent in one batch, they should be no "
+                                                 "more than {0} bytes and {1} logs, got {2} bytes and {3} logs, "
+                                                 "split them into multiple send calls"
+                               .format(MAX_LOG_GROUP_SIZE, MAX_SEND_COUNT, size, len(log_items)))
+        if size > self.config.total_size_in_bytes:
+            raise LogException('InvalidLogSize', "logs' size {0} exceeds the producer total size {1}".format(
+                size, self.config.total_size_in_bytes))
+
+        key = (project, logstore, topic, source, hash_key)
+        with self._cond:
+            self._ensure_space(size)
+
+            batch = self._batches.get(key)
+            future = None
+            if batch is not None:
+                future = batch.try_append(log_items, size, self.config.max_batch_size_in_bytes,
+                                          self.config.max_batch_count, callback)
+                if future is None:
+                    self._submit(self._batches.pop(key))
+            if future is None:
+                batch = self._batches[key] = ProducerBatch(key)
+                future = batch.try_append(log_items, size, self.config.max_batch_size_in_bytes,
+                                          self.config.max_batch_count, callback)
+            self._buffered_size += size
+
+            if batch.is_full(self.config.max_batch_size_in_bytes, self.config.max_batch_count):
+                self._submit(self._batches.pop(key))
+
+        return future
+
+    def flush(self, timeout=None):
+        """ send all the buffered logs and wait for them to be finished
+
+        :type timeout: float
+        :param timeout: seconds to wait, default is None (wait until finished)
+
+        :return: bool, if all the logs are finished
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            for key in list(self._batches):
+                self._submit(self._batches.pop(key))
+            while self._in_flight:
+                remain = None if deadline is None else deadline - time.time()
+                if remain is not None and remain <= 0:
+                    return False
+                self._cond.wait(remain)
+        return True
+
+    def close(self, timeout=None):
+        """ stop accepting new logs, send the buffered logs and release the io threads
+
+        :type timeout: float
+        :param timeout: seconds to wait for the buffered logs, default is None (wait until finished)
+
+        :return: bool, if all the logs are finished
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        finished = self.flush(timeout)
+        self._mover.join()
+        self._executor.shutdown(wait=finished)
+        return finished
+
+    def get_buffered_size(self):
+        return self._buffered_size
+
+    def _ensure_space(self, size):
+        deadline = time.time() + self.config.max_block_sec
+        while True:
+            if self._closed:
+                raise LogException('ProducerClosed', 'the producer is closed')
+            if self._buffered_size + size <= self.config.total_size_in_bytes:
+                return
+            remain = deadline - time.time()
+            if remain <= 0:
+                raise LogException('ProducerTimeout',
+                                   "failed to get {0} bytes buffer in {1} seconds, buffered size: {2}".format(
+                                       size, self.config.max_block_sec, self._buffered_size))
+            self._cond.wait(remain)
+
+    def _submit(self, batch):
+        self._in_flight += 1
+        self._executor.submit(self._send_batch, batch)
+
+    def _move_expired_batches(self):
+        interval = self.config.linger_ms / 1000.0 / 2
+        with self._cond:
+            while not self._closed:
+                now = time.time()
+                for key, batch in list(self._batches.items()):
+                    if batch.is_expired(self.config.linger_ms, now):
+                        self._submit(self._batches.pop(key))
+                self._cond.wait(interval)
+
+    def _get_backoff(self, retry_times):
+        backoff_ms = min(self.config.base_retry_backoff_ms * (2 ** retry_times), self.config.max_retry_backoff_ms)
+        return backoff_ms / 1000.0
+
+    def _is_retryable(self, ex):
+        """ LogClient retries the server errors and timeouts of put_logs by itself (and the quota errors if its
+        retry policy does), retry only the rest here, so the retries of both don't multiply for one batch
+        """
+        get_retry_policy = getattr(self.client, 'get_retry_policy', None)
+        policy = get_retry_policy() if get_retry_policy is not None else None
+        if ex.get_error_code() in _RETRYABLE_ERROR_CODES:
+            return policy is None or not policy.retry_quota_errors
+        return LogClient._is_retryable_error(ex) and (policy is None or policy.max_attempts <= 1)
+
+    def _send_batch(self, batch):
+        request = PutLogsRequest(batch.project, batch.logstore, batch.topic, batch.source, batch.log_items,
+                                 hashKey=batch.hash_key, logtags=self.config.logtags,
+                                 compress_type=self.config.compress_type,
+                                 compress_level=self.config.compress_level)
+        try:
+            for retry_times in range(self.config.retries + 1):
+                try:
+                    resp = self.client.put_logs(request)
+                    batch.attempts.append(Attempt(True, resp.get_request_id()))
+                    break
+                except LogException as ex:
+                    batch.attempts.append(Attempt(False, ex.get_request_id(), ex.get_error_code(),
+                                                  ex.get_error_message()))
+                    if not self._is_retryable(ex) or retry_times >= self.config.retries:
+                        break
+                    logger.warning("retry to send batch of %s/%s in %s seconds: %s", batch.project, batch.logstore,
+                                   self._get_backoff(retry_times), ex)
+                    time.sleep(self._get_backoff(retry_times))
+        except Exception as ex:
+            batch.attempts.append(Attempt(False, '', 'ProducerError', str(ex)))
+
+        batch.complete()
+        with self._cond:
+            self._buffered_size -= batch.size
+            self._in_flight -= 1
+            self._cond.notify_all()
@@ -10,6 +10,8 @@ from .util import Util
 from .util import base64_encodestring as b64e
 
 from .proto import LogGroupList, LogGroupListRaw
+from .loggroup_decoder import LazyLogGroupList
+from .columnar import LogColumns
 import six
 
 DEFAULT_DECODE_LIST = ('utf8',)
@@ -35,6 +37,7 @@ class PullLogResponse(LogResponse):
         self.raw_size_before_query = int(Util.h_v_td(self.headers, 'x-log-rawdatasize', '-1'))
 
         self._loggroup_list = None
+        self._lazy_loggroup_list = None
         self._raw_uncompressed_body = resp
         self.loggroup_list_json = None
         self.flatten_logs_json = None
@@ -50,6 +53,43 @@ class PullLogResponse(LogResponse):
             self._raw_uncompressed_body = None
         return self._loggroup_list
 
+    @property
+    def lazy_loggroup_list(self):
+        """ LazyLogGroupList over the response body, logs are decoded only when accessed """
+        if self._lazy_loggroup_list is None:
+            if self._raw_uncompressed_body is not None:
+                data = self._raw_uncompressed_body
+            elif self._loggroup_list is not None:
+                data = self._loggroup_list.SerializeToString()
+            else:
+                data = b''
+            try:
+                self._lazy_loggroup_list = LazyLogGroupList(data)
+            except (LogException, IndexError) as ex:
+                raise LogException('BadResponse', 'failed to index LogGroupList: ' + str(ex)
+                                   + '\nheader:' + str(self.headers))
+        return self._lazy_loggroup_list
+
+    def iter_logs(self):
+        """ iterate the logs without decoding the whole response,
+        e.g. [log.to_dict() for log in resp.iter_logs() if log.get('level') == 'ERROR']
+
+        :return: iterator of LazyLog
+        """
+        return self.lazy_loggroup_list.iter_logs()
+
+    def get_columns(self):
+        """ get the logs in columnar layout, topic, source and tags are dictionary encoded per log group
+        instead of being copied into each log, e.g. resp.get_columns().to_pandas()
+
+        :return: LogColumns
+        """
+        columns = LogColumns()
+        for log_group in self.lazy_loggroup_list:
+            columns.add_log_group(((log.time, log.time_ns, log.get_contents()) for log in log_group),
+                                  log_group.topic, log_group.source, log_group.tags)
+        return columns
+
     def get_body(self):
         if self._body is None:
             self._body = {"next_cursor": self.next_cursor,
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
+
+from .columnar import LogColumns
+from .loggroup_decoder import LazyLog, LazyLogGroupList
 
 from .logresponse import LogResponse
 
@@ -9,6 +12,10 @@ class PullLogResponse(LogResponse):
     def __init__(self, resp: str, header: Dict[str, Any]) -> None: ...
     @property
     def loggroup_list(self) -> Any: ...
+    @property
+    def lazy_loggroup_list(self) -> LazyLogGroupList: ...
+    def iter_logs(self) -> Iterator[LazyLog]: ...
+    def get_columns(self) -> LogColumns: ...
     def get_body(self) -> Dict[str, Any]: ...
     @property
     def body(self) -> Dict[str, Any]: ...
@@ -37,10 +37,13 @@ class PutLogsRequest(LogRequest):
     :type compress_type: String
     :param compress_type: compress_type, eg lz4, zstd, default is lz4. To use zstd, pip install zstd.
 
+    :type compress_level: int
+    :param compress_level: compression level of compress_type, default is the one set by LogClient.set_compression
+
     """
 
     def __init__(self, project=None, logstore=None, topic=None, source=None, logitems=None, hashKey=None,
-                 compress=True, logtags=None, compress_type=None):
+                 compress=True, logtags=None, compress_type=None, compress_level=None):
         LogRequest.__init__(self, project)
         self.logstore = logstore
         self.topic = topic
@@ -50,6 +53,7 @@ class PutLogsRequest(LogRequest):
         self.compress = compress
         self.logtags = logtags
         self.compress_type = compress_type
+        self.compress_level = compress_level
 
     def get_compress_type(self):
         return self.compress_type
@@ -57,6 +61,12 @@ class PutLogsRequest(LogRequest):
     def set_compress_type(self, compress_type):
         self.compress_type = compress_type
 
+    def get_compress_level(self):
+        return self.compress_level
+
+    def set_compress_level(self, compress_level):
+        self.compress_level = compress_level
+
     def get_compress(self):
         return self.compress
 
@@ -6,9 +6,11 @@ from .logitem import LogItem
 from .logrequest import LogRequest
 
 class PutLogsRequest(LogRequest):
-    def __init__(self, project: Optional[str] = ..., logstore: Optional[str] = ..., topic: Optional[str] = ..., source: Optional[str] = ..., logitems: Optional[List[LogItem]] = ..., hashKey: Optional[str] = ..., compress: bool = ..., logtags: Optional[List[Tuple[str, str]]] = ..., compress_type: Optional[str] = ...) -> None: ...
+    def __init__(self, project: Optional[str] = ..., logstore: Optional[str] = ..., topic: Optional[str] = ..., source: Optional[str] = ..., logitems: Optional[List[LogItem]] = ..., hashKey: Optional[str] = ..., compress: bool = ..., logtags: Optional[List[Tuple[str, str]]] = ..., compress_type: Optional[str] = ..., compress_level: Optional[int] = ...) -> None: ...
     def get_compress_type(self) -> Optional[str]: ...
     def set_compress_type(self, compress_type: str) -> None: ...
+    def get_compress_level(self) -> Optional[int]: ...
+    def set_compress_level(self, compress_level: Optional[int]) -> None: ...
     def get_compress(self) -> bool: ...
     def set_compress(self, compress: bool) -> None: ...
     def get_logstore(self) -> str: ...
@@ -4,7 +4,7 @@
 # Copyright (C) Alibaba Cloud Computing
 # All rights reserved.
 
-import six
+
 class QueriedLog(object):
     """ The QueriedLog is a log of the GetLogsResponse which obtained from the log.
 
@@ -18,6 +18,8 @@ class QueriedLog(object):
     :param contents: log contents, content many key/value pair
     """
 
+    __slots__ = ('timestamp', 'source', 'contents')
+
     def __init__(self, timestamp, source, contents):
         self.timestamp = int(timestamp)
         self.source = source
@@ -27,13 +29,9 @@ class QueriedLog(object):
     def _from_dict(data):
         """ Initalize from dict
         """
-        source = data.get("__source__", "")
-        time = data.get("__time__", '0')
-        contents = {}
-        for key in six.iterkeys(data):
-            if key not in ['__time__', '__source__']:
-                contents[key] = data[key]
-
+        contents = dict(data)
+        source = contents.pop("__source__", "")
+        time = contents.pop("__time__", '0')
         return QueriedLog(time, source, contents)
 
     def _to_dict(self):
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+import random
+import threading
+
+QUOTA_ERROR_CODES = ('WriteQuotaExceed', 'ReadQuotaExceed', 'ShardWriteQuotaExceed', 'ShardReadQuotaExceed',
+                     'ProjectQuotaExceed', 'ExceedQPSLimitation', 'QuotaExceed')
+
+
+class RetryPolicy(object):
+    """ Decide if and when a failed request of LogClient is retried. The delay grows exponentially with jitter
+    from base_delay up to max_delay, quota errors (throttling) back off separately from quota_base_delay up to
+    quota_max_delay. Retry-After of the response is respected. Subclass it and override get_delay to customize.
+
+    :type max_attempts: int
+    :param max_attempts: maximum attempts of a request including the first one, default is 10
+
+    :type base_delay: float
+    :param base_delay: seconds to wait before the first retry of server errors and timeouts, default is 0.5
+
+    :type max_delay: float
+    :param max_delay: maximum seconds to wait between retries of server errors and timeouts, default is 10
+
+    :type retry_quota_errors: bool
+    :param retry_quota_errors: if retry the requests throttled by the quota, e.g. ShardWriteQuotaExceed,
+        default is False. the producer and the consumer back off on them by themselves, enable it only for the
+        callers that don't
+
+    :type quota_base_delay: float
+    :param quota_base_delay: seconds to wait before the first retry of quota errors, default is 1
+
+    :type quota_max_delay: float
+    :param quota_max_delay: maximum seconds to wait between retries of quota errors, default is 30
+
+    :type retry_budget: int
+    :param retry_budget: default None (no limitation). tokens of retries shared by all the requests of the client,
+        each retry takes one, each successful request gives back retry_budget_ratio of one. requests fail fast
+        without retrying once it's used up, so the retries don't pile up when the service is down.
+
+    :type retry_budget_ratio: float
+    :param retry_budget_ratio: tokens given back by a successful request, default is 0.1
+    """
+
+    def __init__(self, max_attempts=10, base_delay=0.5, max_delay=10, retry_quota_errors=False, quota_base_delay=1,
+                 quota_max_delay=30, retry_budget=None, retry_budget_ratio=0.1):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_quota_errors = retry_quota_errors
+        self.quota_base_delay = quota_base_delay
+        self.quota_max_delay = quota_max_delay
+        self.retry_budget = retry_budget
+        self.retry_budget_ratio = retry_budget_ratio
+        self._tokens = retry_budget
+        self._lock = threading.Lock()
+        self.retry_count = 0
+        self.quota_retry_count = 0
+        self.budget_exhausted_count = 0
+        self.total_delay = 0
+
+    def __getstate__(self):
+        # the client may be pickled into processes, e.g. by copy_data
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_quota_error(ex):
+        return ex.get_error_code() in QUOTA_ERROR_CODES
+
+    @staticmethod
+    def is_retryable_error(ex):
+        """ server errors, timeouts and connection errors """
+        return ex.get_error_code() in ('InternalServerError', 'RequestTimeout') or ex.resp_status >= 500 \
+            or (ex.get_error_code() == 'LogRequestError'
+                and 'httpconnectionpool' in ex.get_error_message().lower())
+
+    @staticmethod
+    def _get_retry_after(ex):
+        headers = ex.resp_header
+        if not headers or not hasattr(headers, 'get'):
+            return None
+        value = headers.get('Retry-After') or headers.get('retry-after')
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _backoff(attempt, base_delay, max_delay):
+        # equal jitter, half of the delay is fixed and half is random
+        delay = min(max_delay, base_delay * (2 ** attempt))
+        return delay / 2.0 + random.uniform(0, delay / 2.0)
+
+    def _take_token(self):
+        if self.retry_budget is None:
+            return True
+        with self._lock:
+            if self._tokens < 1:
+                self.budget_exhausted_count += 1
+                return False
+            self._tokens -= 1
+            return True
+
+    def get_delay(self, ex, attempt, retryable=None):
+        """ get the seconds to wait before retrying the failed request
+
+        :type ex: LogException
+        :param ex: the error of the attempt
+
+        :type attempt: int
+        :param attempt: index of the failed attempt, 0 for the first one
+
+        :type retryable: bool
+        :param retryable: if the error is known to be retryable, e.g. connection errors, default is to check ex
+
+        :return: float, None if it should not be retried
+        """
+        is_quota = self.retry_quota_errors and self.is_quota_error(ex)
+        if not is_quota and not (self.is_retryable_error(ex) if retryable is None else retryable):
+            return None
+        if not self._take_token():
+            return None
+
+        if is_quota:
+            delay = self._backoff(attempt, self.quota_base_delay, self.quota_max_delay)
+        else:
+            delay = self._backoff(attempt, self.base_delay, self.max_delay)
+        retry_after = self._get_retry_after(ex)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.quota_max_delay if is_quota else self.max_delay))
+
+        with self._lock:
+            self.retry_count += 1
+            self.quota_retry_count += 1 if is_quota else 0
+            self.total_delay += delay
+        return delay
+
+    def on_success(self):
+        """ called when a request succeeds, give back the retry budget """
+        if self.retry_budget is None:
+            return
+        with self._lock:
+            self._tokens = min(self.retry_budget, self._tokens + self.retry_budget_ratio)
+
+    def get_stats(self):
+        """ retry_count, quota_retry_count, budget_exhausted_count (retries denied by the budget), total_delay
+        (seconds waited before retrying) and retry_budget_tokens (None if there's no budget)
+        """
+        with self._lock:
+            return {'retry_count': self.retry_count, 'quota_retry_count': self.quota_retry_count,
+                    'budget_exhausted_count': self.budget_exhausted_count, 'total_delay': self.total_delay,
+                    'retry_budget_tokens': self._tokens}
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from typing import Any, Dict, Optional, Tuple
+
+from .logexception import LogException
+
+QUOTA_ERROR_CODES: Tuple[str, ...]
+
+class RetryPolicy:
+    max_attempts: int
+    base_delay: float
+    max_delay: float
+    retry_quota_errors: bool
+    quota_base_delay: float
+    quota_max_delay: float
+    retry_budget: Optional[int]
+    retry_budget_ratio: float
+    retry_count: int
+    quota_retry_count: int
+    budget_exhausted_count: int
+    total_delay: float
+    def __init__(self, max_attempts: int = ..., base_delay: float = ..., max_delay: float = ..., retry_quota_errors: bool = ..., quota_base_delay: float = ..., quota_max_delay: float = ..., retry_budget: Optional[int] = ..., retry_budget_ratio: float = ...) -> None: ...
+    @staticmethod
+    def is_quota_error(ex: LogException) -> bool: ...
+    @staticmethod
+    def is_retryable_error(ex: LogException) -> bool: ...
+    def get_delay(self, ex: LogException, attempt: int, retryable: Optional[bool] = ...) -> Optional[float]: ...
+    def on_success(self) -> None: ...
+    def get_stats(self) -> Dict[str, Any]: ...
@@ -77,6 +77,7 @@ packages = [
     'aliyun.log.etl_core.transform',
     'aliyun.log.etl_core.trans_comp',
     'aliyun.log.consumer',
+    'aliyun.log.producer',
     'aliyun.log.es_migration',
     'aliyun.log._proto_py2',
 ]
@@ -125,5 +126,7 @@ setup(
     long_description=long_description,
     extras_require = {
         'test': test_requirements,
+        'async': ['aiohttp'],
+        'zstd': ['zstandard'],
     },
 )
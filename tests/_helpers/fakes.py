@@ -11,6 +11,9 @@ from __future__ import absolute_import
 import json
 import re
 
+from aliyun.log import GetCursorTimeResponse, PullLogResponse
+from aliyun.log.proto import LogGroupListRaw
+
 
 def make_client(
     endpoint="cn-mock.example.com",
@@ -78,3 +81,60 @@ def mock_sls_response(rsps, method, url_pattern, status=200, body=None, headers=
         status=status,
         headers=final_headers,
     )
+
+
+class _Cursor(object):
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def get_cursor(self):
+        return self.cursor
+
+
+class FakePullClient(object):
+    """A shard of pulled logs for the batch operators: cursor i has log i,
+    pulling cursor ``fail_at`` fails once.
+    """
+
+    def __init__(self, end=6, fail_at=None):
+        self.end = end
+        self.fail_at = fail_at
+        self.pulled = []
+
+    def get_cursor(self, project, logstore, shard_id, start_time):
+        return _Cursor('0' if start_time == 'begin' else str(self.end))
+
+    def pull_logs(self, project, logstore, shard_id, cursor, count=None, end_cursor=None, **kwargs):
+        if cursor == self.fail_at:
+            self.fail_at = None
+            raise IOError('network error')
+        self.pulled.append(cursor)
+        log_group_list = LogGroupListRaw()
+        log = log_group_list.LogGroups.add().Logs.add()
+        log.Time = 1700000000
+        content = log.Contents.add()
+        content.Key = u'消息'
+        content.Value = u'值{0}'.format(cursor).encode('utf8')
+        return PullLogResponse(log_group_list.SerializeToString(),
+                               {'x-log-count': '1', 'x-log-bodyrawsize': '0', 'x-log-cursor': str(int(cursor) + 1)})
+
+
+class _FakeShards(object):
+    def get_shards_info(self):
+        return [{'shardID': 0}, {'shardID': 1}]
+
+
+class FakeSourceClient(FakePullClient):
+    """Two shards of :class:`FakePullClient`, cursor i is received at time 1000 + i."""
+    timeout = 60
+
+    def list_shards(self, project, logstore):
+        return _FakeShards()
+
+    def get_cursor(self, project, logstore, shard_id, start_time):
+        if start_time in ('begin', 'end'):
+            return FakePullClient.get_cursor(self, project, logstore, shard_id, start_time)
+        return _Cursor(str(min(max(int(start_time) - 1000, 0), self.end)))
+
+    def get_cursor_time(self, project, logstore, shard_id, cursor):
+        return GetCursorTimeResponse({'cursor_time': 1000 + int(cursor)}, {})
@@ -0,0 +1,100 @@
+# encoding: utf-8
+"""Unit tests for AsyncLogClient, served by a local aiohttp server (no SLS access)."""
+
+from __future__ import absolute_import
+
+import asyncio
+import json
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+
+from aliyun.log import AsyncLogClient, LogException, LogItem, PutLogsRequest
+from aliyun.log.compress import Compressor, CompressType
+from aliyun.log.proto import LogGroupList, LogGroupRaw
+
+
+def _run(routes, test_fn):
+    async def main():
+        app = web.Application()
+        app.add_routes(routes)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            async with AsyncLogClient("127.0.0.1:{0}".format(port), "mock-id", "mock-key") as client:
+                # send to the local server directly instead of "<project>.<endpoint>"
+                client._client._isRowIp = True
+                return await test_fn(client)
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+def test_put_logs_sends_signed_protobuf():
+    captured = {}
+
+    async def handler(request):
+        captured["headers"] = dict(request.headers)
+        body = await request.read()
+        raw_size = int(request.headers["x-log-bodyrawsize"])
+        group = LogGroupRaw()
+        group.ParseFromString(Compressor.decompress(body, raw_size, CompressType.LZ4))
+        captured["group"] = group
+        return web.Response(headers={"x-log-requestid": "req-1"})
+
+    async def test(client):
+        item = LogItem(timestamp=1700000000, contents=[("k", "v")])
+        return await client.put_logs(PutLogsRequest("mock-proj", "store-1", "topic", "src", [item]))
+
+    resp = _run([web.post("/logstores/store-1/shards/lb", handler)], test)
+
+    assert resp.get_request_id() == "req-1"
+    assert captured["headers"]["Authorization"].startswith("LOG mock-id:")
+    assert captured["group"].Topic == "topic"
+    assert captured["group"].Logs[0].Contents[0].Value == b"v"
+
+
+def test_pull_logs_decompresses_body():
+    group_list = LogGroupList()
+    group = group_list.LogGroups.add()
+    log = group.Logs.add()
+    log.Time = 1700000000
+    content = log.Contents.add()
+    content.Key = "k"
+    content.Value = "v"
+    raw = group_list.SerializeToString()
+
+    async def handler(request):
+        assert request.query["cursor"] == "MTAw"
+        return web.Response(body=Compressor.compress(raw, CompressType.LZ4),
+                            headers={"x-log-requestid": "req-2", "x-log-count": "1",
+                                     "x-log-cursor": "MTAx", "x-log-bodyrawsize": str(len(raw)),
+                                     "x-log-compresstype": "lz4"})
+
+    async def test(client):
+        return await client.pull_logs("mock-proj", "store-1", 0, "MTAw")
+
+    resp = _run([web.get("/logstores/store-1/shards/0", handler)], test)
+
+    assert resp.get_next_cursor() == "MTAx"
+    assert resp.get_flatten_logs_json()[0]["k"] == "v"
+
+
+def test_error_response_raises_logexception():
+    async def handler(request):
+        return web.Response(status=400, content_type="application/json",
+                            text=json.dumps({"errorCode": "ShardNotExist", "errorMessage": "no shard"}))
+
+    async def test(client):
+        with pytest.raises(LogException) as excinfo:
+            await client.get_cursor("mock-proj", "store-1", 9, "begin")
+        return excinfo.value
+
+    ex = _run([web.get("/logstores/store-1/shards/9", handler)], test)
+    assert ex.get_error_code() == "ShardNotExist"
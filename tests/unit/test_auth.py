@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 """Unit tests for AuthV4 signing and URI encoding."""
 
-from aliyun.log.auth import AuthV4
+from email.utils import formatdate
+
+from aliyun.log.auth import AuthV1, AuthV4, _format_gmt
 from aliyun.log.credentials import StaticCredentialsProvider
 
 
@@ -79,3 +81,23 @@ def test_sign_post_with_extra_params():
     sig = auth._do_sign_request('POST', '/logstores/hello/a+*~bb/cc', params, _common_headers(), BODY, '20220808T032330Z')
     assert sig == ('SLS4-HMAC-SHA256 Credential=acsddda21dsd/20220808/cn-hangzhou/sls/aliyun_v4_request,'
                    'Signature=2c204068e961a8813a6bcf7ac422f7fa6e9bf9a5da493e0165dfe100854d18ff')
+
+
+def test_sign_key_cached_by_secret_and_date():
+    auth = _make_auth()
+    sig = auth._do_sign_request('POST', '/logstores', _common_url_params(), _common_headers(), BODY, '20220808T032330Z')
+    cached = auth._sign_key_cache
+    assert cached[:3] == ('zxasdasdasw2', 'cn-hangzhou', '20220808')
+    assert auth._do_sign_request('POST', '/logstores', _common_url_params(), _common_headers(), BODY,
+                                 '20220808T032330Z') == sig
+    assert auth._sign_key_cache is cached
+
+    auth._do_sign_request('POST', '/logstores', {}, {}, BODY, '20220809T000000Z')
+    assert auth._sign_key_cache[2] == '20220809'
+
+
+def test_v1_date_is_rfc1123():
+    assert _format_gmt(1659929010) == 'Mon, 08 Aug 2022 03:23:30 GMT'
+    for timestamp in (0, 951782400, 1659929010, 4102444799):
+        assert _format_gmt(timestamp) == formatdate(timestamp, usegmt=True)
+    assert AuthV1._getGMT().endswith(' GMT')
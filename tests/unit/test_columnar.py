@@ -0,0 +1,107 @@
+# encoding: utf-8
+from __future__ import absolute_import
+
+import pytest
+
+from aliyun.log import GetLogsResponse, PullLogResponse
+from aliyun.log.columnar import DictionaryColumn, LogColumns
+from aliyun.log.proto import LogGroupListRaw
+
+
+def _pull_log_response():
+    log_group_list = LogGroupListRaw()
+    for i, keys in enumerate((('a', 'b'), ('b', 'c'))):
+        log_group = log_group_list.LogGroups.add()
+        log_group.Topic = 'topic'
+        log_group.Source = 'source-{0}'.format(i)
+        tag = log_group.LogTags.add()
+        tag.Key = 'host'
+        tag.Value = 'host-{0}'.format(i)
+        for j in range(2):
+            log = log_group.Logs.add()
+            log.Time = 1700000000 + i * 10 + j
+            for key in keys:
+                content = log.Contents.add()
+                content.Key = key
+                content.Value = '{0}{1}{2}'.format(key, i, j).encode('utf8')
+    return PullLogResponse(log_group_list.SerializeToString(),
+                           {'x-log-count': '2', 'x-log-bodyrawsize': '0', 'x-log-cursor': 'cursor'})
+
+
+def test_pull_log_response_columns():
+    columns = _pull_log_response().get_columns()
+
+    assert len(columns) == 4
+    assert list(columns['__time__']) == [1700000000, 1700000001, 1700000010, 1700000011]
+    assert columns['__topic__'].dictionary == ['topic']
+    assert list(columns['__topic__'].codes) == [0, 0, 0, 0]
+    assert columns['__source__'].to_list() == ['source-0', 'source-0', 'source-1', 'source-1']
+    assert columns['__tag__:host'].to_list() == ['host-0', 'host-0', 'host-1', 'host-1']
+    assert columns['a'] == ['a00', 'a01', None, None]
+    assert columns['b'] == ['b00', 'b01', 'b10', 'b11']
+    assert columns['c'] == [None, None, 'c10', 'c11']
+
+
+def test_log_columns_concat_merges_dictionaries():
+    first = LogColumns()
+    first.add_log_group([(1, 0, [('k', 'v1')])], topic='t1', tags={'x': '1'})
+    second = LogColumns()
+    second.add_log_group([(2, 0, {'other': 'v2'})], topic='t2')
+    second.add_log_group([(3, 0, [('k', 'v3')])], topic='t1')
+
+    merged = LogColumns.concat([first, second])
+    assert merged.to_dict() == {
+        '__time__': [1, 2, 3],
+        '__time_ns_part__': [0, 0, 0],
+        'k': ['v1', None, 'v3'],
+        '__topic__': ['t1', 't2', 't1'],
+        '__tag__:x': ['1', None, None],
+        'other': [None, 'v2', None],
+    }
+    assert merged['__topic__'].dictionary == ['t1', 't2']
+
+
+def test_get_logs_response_columns():
+    resp = GetLogsResponse({'meta': {'count': 2, 'progress': 'Complete'},
+                            'data': [{'__time__': '100', '__source__': 's', 'k': 'v', '__topic__': 't'},
+                                     {'__time__': '101', '__source__': 's', 'k': 'v2', 'dup': 'x'}]}, {})
+    columns = resp.get_columns()
+    assert list(columns['__time__']) == [100, 101]
+    assert isinstance(columns['__source__'], DictionaryColumn)
+    assert columns['__source__'].dictionary == ['s']
+    assert columns['__topic__'].to_list() == ['t', None]
+    assert columns['k'] == ['v', 'v2']
+    assert columns['dup'] == [None, 'x']
+
+
+def test_get_logs_response_lazy_logs():
+    data = [{'__time__': '100', '__source__': 's', 'k': 'v'}, {'__time__': '101', 'k': 'v2'}]
+    resp = GetLogsResponse({'meta': {'count': 2, 'progress': 'Complete'}, 'data': data}, {})
+    assert list(resp.iter_rows()) == data
+    assert [(log.get_time(), log.get_source(), log.get_contents()) for log in resp.iter_logs()] \
+        == [(100, 's', {'k': 'v'}), (101, '', {'k': 'v2'})]
+    assert list(resp.get_columns()['__time__']) == [100, 101]
+    assert resp.get_columns()['__source__'].to_list() == ['s', '']
+    assert resp._logs is None
+
+    other = GetLogsResponse({'meta': {'count': 1, 'progress': 'Complete'},
+                             'data': [{'__time__': '102', '__source__': 's', 'k': 'v3'}]}, {})
+    resp.merge(other)
+    assert len(data) == 2
+    assert [row['k'] for row in resp.iter_rows()] == ['v', 'v2', 'v3']
+
+    logs = resp.get_logs()
+    assert resp.get_logs() is logs and not hasattr(logs[0], '__dict__')
+    logs[0].contents['k'] = 'changed'
+    assert [row['k'] for row in resp.iter_rows()] == ['changed', 'v2', 'v3']
+    assert resp.get_columns()['k'] == ['changed', 'v2', 'v3']
+    assert resp.get_columns()['__source__'].to_list() == ['s', '', 's']
+    assert data[0]['k'] == 'v'
+
+
+def test_log_columns_to_pandas():
+    pandas = pytest.importorskip('pandas')
+    df = _pull_log_response().get_columns().to_pandas()
+    assert str(df['__time__'].dtype) == 'int64'
+    assert isinstance(df['__source__'].dtype, pandas.CategoricalDtype)
+    assert df['b'].tolist() == ['b00', 'b01', 'b10', 'b11']
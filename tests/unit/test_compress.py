@@ -1,4 +1,12 @@
-from aliyun.log.compress import Compressor, CompressType
+import gzip
+import zlib
+
+import pytest
+
+from aliyun.log import LogException, PutLogsRequest, LogItem
+from aliyun.log.compress import Compressor, CompressType, get_codec, zstd_available
+
+from tests._helpers.fakes import make_client
 
 
 def test_lz4():
@@ -9,3 +17,43 @@ def test_lz4():
         compressed, raw_size, CompressType.LZ4)
 
     assert text == uncompressed, "The decompressed data does not match the original"
+
+
+def test_compress_levels():
+    text = b'sadsadsa189634o2??ASBKHD' * 100
+    compress_types = [CompressType.LZ4] + ([CompressType.ZSTD] if zstd_available else [])
+    for compress_type in compress_types:
+        for level in (None, -3, 1, 9):
+            compressed = Compressor.compress(text, compress_type, level)
+            assert Compressor.decompress(compressed, len(text), compress_type) == text
+
+    header = {'x-log-compresstype': 'deflate', 'x-log-bodyrawsize': str(len(text))}
+    assert Compressor.decompress_response(header, get_codec('deflate').compress(text, 9)) == text
+    header['x-log-compresstype'] = 'gzip'
+    assert Compressor.decompress_response(header, zlib.compress(text)) == text
+    assert Compressor.decompress_response(header, gzip.compress(text)) == text
+
+    with pytest.raises(LogException):
+        get_codec('snappy')
+
+
+def test_logclient_compression():
+    client = make_client()
+    _, _, headers, body = client._build_put_log_raw_request('store-1', b'x' * 1000)
+    assert headers['x-log-compresstype'] == 'lz4'
+
+    client.set_compression('lz4', 9)
+    request = PutLogsRequest('mock-proj', 'store-1', '', 'src', [LogItem(1700000000, [('k', 'v' * 1000)])])
+    _, _, headers, high_body = client._build_put_logs_request(request)
+    request.set_compress_level(-10)
+    _, _, headers, fast_body = client._build_put_logs_request(request)
+    assert headers['x-log-compresstype'] == 'lz4'
+    assert len(high_body) < len(fast_body)
+
+    with pytest.raises(LogException):
+        client.set_compression('snappy')
+    if zstd_available:
+        client.set_compression('zstd', 3)
+        _, _, headers, body = client._build_put_log_raw_request('store-1', b'x' * 1000)
+        assert headers['x-log-compresstype'] == 'zstd'
+        assert Compressor.decompress(body, 1000, CompressType.ZSTD) == b'x' * 1000
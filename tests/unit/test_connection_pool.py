@@ -0,0 +1,60 @@
+# encoding: utf-8
+from __future__ import absolute_import
+
+import socket
+import threading
+
+import pytest
+from six.moves import BaseHTTPServer
+
+from aliyun.log import LogClient
+from aliyun.log.connection_pool import LogHTTPAdapter, build_socket_options
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_build_socket_options():
+    options = build_socket_options(tcp_keepalive=30, socket_send_buffer=1024)
+    assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in options
+    assert (socket.SOL_SOCKET, socket.SO_SNDBUF, 1024) in options
+    if hasattr(socket, 'TCP_KEEPIDLE'):
+        assert (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30) in options
+    assert build_socket_options() == [(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)]
+
+
+def test_connection_pool_reuses_connections(server):
+    client = LogClient('http://127.0.0.1:{0}'.format(server.server_port), 'id', 'key')
+    client.set_connection_pool(pool_maxsize=4, tcp_keepalive=True)
+    client.set_connection_pool(pool_block=True)
+    adapter = client._session.get_adapter('http://127.0.0.1')
+    assert isinstance(adapter, LogHTTPAdapter)
+    assert (adapter._pool_maxsize, adapter._pool_block) == (4, True)
+
+    for _ in range(3):
+        assert client._session.get('http://127.0.0.1:{0}/'.format(server.server_port)).content == b'{}'
+
+    stats = client.get_connection_pool_stats()
+    assert stats == {'http://127.0.0.1:{0}'.format(server.server_port): {'connections': 1, 'requests': 3,
+                                                                         'idle': 1, 'maxsize': 4}}
@@ -0,0 +1,100 @@
+# encoding: utf-8
+from __future__ import absolute_import
+
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from aliyun.log.consumer import ConsumerProcessGroup, LogHubConfig
+from aliyun.log.consumer import process_group
+
+if 'fork' not in multiprocessing.get_all_start_methods():
+    pytest.skip('fork start method is required', allow_module_level=True)
+
+
+class _FakeConsumerWorker(threading.Thread):
+    """ records the consumer name into a file named by the pid, exits on shutdown or when told by the test,
+    "done" completes the tasks like cursor_end_time does, "crash" stops like a thread died of an error
+    """
+
+    def __init__(self, make_processor, consumer_option, args=None, kwargs=None):
+        super(_FakeConsumerWorker, self).__init__()
+        self.option = consumer_option
+        self.stopped = threading.Event()
+        self.shut_down_flag = False
+
+    def run(self):
+        path = os.path.join(self.option.logstore, str(os.getpid()))
+        with open(path, 'w') as f:
+            f.write(self.option.consumer_name)
+        while not self.stopped.wait(0.05):
+            if os.path.exists(path + '.exit'):
+                with open(path + '.exit') as f:
+                    if f.read() == 'done':
+                        self.shut_down_flag = True
+                return
+
+    def shutdown(self):
+        with open(os.path.join(self.option.logstore, str(os.getpid()) + '.shutdown'), 'w'):
+            pass
+        self.shut_down_flag = True
+        self.stopped.set()
+
+
+def _wait(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.05)
+    assert condition()
+
+
+def test_consumer_process_group_restarts_and_shuts_down(tmp_path, monkeypatch):
+    monkeypatch.setattr(process_group, 'ConsumerWorker', _FakeConsumerWorker)
+    # the logstore is only used by the fake worker as the directory to record into
+    option = LogHubConfig('endpoint', 'ak', 'sk', 'project', str(tmp_path), 'group', 'consumer')
+    group = ConsumerProcessGroup(object, option, process_count=2, restart_interval=0,
+                                 mp_context=multiprocessing.get_context('fork'))
+    group.start()
+
+    _wait(lambda: all(pid is not None and (tmp_path / str(pid)).exists() for pid in group.get_pids()))
+    pids = group.get_pids()
+    assert sorted((tmp_path / str(pid)).read_text() for pid in pids) == ['consumer-0', 'consumer-1']
+    assert option.consumer_name == 'consumer'
+
+    # the first process exits unexpectedly, it's restarted with the same consumer name
+    (tmp_path / (str(pids[0]) + '.exit')).write_text('crash')
+    _wait(lambda: group.get_pids()[0] != pids[0] and (tmp_path / str(group.get_pids()[0])).exists())
+    assert (tmp_path / str(group.get_pids()[0])).read_text() == (tmp_path / str(pids[0])).read_text()
+
+    group.shutdown(timeout=10)
+    assert not group.is_alive()
+    for pid in group.get_pids():
+        assert (tmp_path / (str(pid) + '.shutdown')).exists()
+
+
+def test_consumer_process_group_does_not_restart_completed_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(process_group, 'ConsumerWorker', _FakeConsumerWorker)
+    option = LogHubConfig('endpoint', 'ak', 'sk', 'project', str(tmp_path), 'group', 'consumer')
+    group = ConsumerProcessGroup(object, option, process_count=2, restart_interval=0,
+                                 mp_context=multiprocessing.get_context('fork'))
+    group.start()
+
+    _wait(lambda: all(pid is not None and (tmp_path / str(pid)).exists() for pid in group.get_pids()))
+    pids = group.get_pids()
+
+    # the first process completes its tasks and exits with 0, it's not restarted
+    (tmp_path / (str(pids[0]) + '.exit')).write_text('done')
+    _wait(lambda: group._completed[0])
+    assert group._processes[0].exitcode == 0
+    time.sleep(0.5)
+    assert group.get_pids() == pids
+    assert group._supervisor.is_alive()
+
+    # the supervisor stops once all of them complete, so start(join=True) returns
+    (tmp_path / (str(pids[1]) + '.exit')).write_text('done')
+    _wait(lambda: not group._supervisor.is_alive())
+    assert group.get_pids() == pids
+    assert not group.is_alive()
@@ -0,0 +1,296 @@
+# encoding: utf-8
+from __future__ import absolute_import
+
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from aliyun.log.consumer import ConsumerProcessorBase, ConsumerWorker, CursorPosition, LogHubConfig
+from aliyun.log import LogException
+from aliyun.log.consumer.checkpoint_tracker import CheckpointAggregator, ConsumerCheckpointTracker
+from aliyun.log.consumer.exceptions import CheckPointException
+from aliyun.log.consumer.fetch_budget import FetchBudget
+from aliyun.log.consumer.shard_worker import ShardConsumerWorker
+
+
+class _FakePullLogResponse(object):
+    def __init__(self, cursor, next_cursor):
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+
+    def get_loggroup_list(self):
+        return self.cursor
+
+    def get_next_cursor(self):
+        return self.next_cursor
+
+    def get_raw_size(self):
+        return 5 * 1024 * 1024  # large enough to skip fetch throttling
+
+    def get_loggroup_count(self):
+        return 1000
+
+
+class _FakeConsumerClient(object):
+    mproject = 'proj'
+    mlogstore = 'store'
+    mconsumer_group = 'group'
+    mconsumer = 'consumer'
+
+    def __init__(self):
+        self.pulled = []
+        self.checkpoints = []
+
+    def get_check_point(self, shard_id):
+        return {'checkpoint': 'c0'}
+
+    def pull_logs(self, shard_id, cursor, count=None, end_cursor=None, query=None, processor=None):
+        self.pulled.append(cursor)
+        return _FakePullLogResponse(cursor, 'c{0}'.format(int(cursor[1:]) + 1))
+
+    def update_check_point(self, shard_id, consumer_name, cursor):
+        self.checkpoints.append(cursor)
+
+
+class _BlockingProcessor(ConsumerProcessorBase):
+    def __init__(self):
+        super(_BlockingProcessor, self).__init__()
+        self.released = threading.Event()
+        self.processed = []
+
+    def process(self, log_groups, check_point_tracker):
+        self.released.wait(10)
+        self.processed.append(log_groups)
+        check_point_tracker.save_check_point(True)
+
+
+def _consume_until(worker, condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        worker.consume()
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_shard_worker_prefetches_while_processing():
+    client = _FakeConsumerClient()
+    processor = _BlockingProcessor()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        worker = ShardConsumerWorker(client, 0, 'consumer', processor, CursorPosition.BEGIN_CURSOR, 'begin',
+                                     executor=executor, prefetch_depth=3)
+
+        # the first batch is being processed, 3 more are fetched and queued, and one is in flight
+        _consume_until(worker, lambda: len(worker.fetched_log_groups) == 3)
+        time.sleep(0.1)
+        worker.consume()
+        assert processor.processed == []
+        assert len(worker.fetched_log_groups) == 3
+        assert client.pulled == ['c0', 'c1', 'c2', 'c3', 'c4']
+
+        processor.released.set()
+        _consume_until(worker, lambda: len(processor.processed) >= 6)
+        worker.shut_down()
+        _consume_until(worker, worker.is_shutdown)
+
+    assert processor.processed[:6] == ['c0', 'c1', 'c2', 'c3', 'c4', 'c5']
+    assert client.checkpoints[:6] == ['c1', 'c2', 'c3', 'c4', 'c5', 'c6']
+
+
+def test_shard_worker_notifies_task_done_and_throttles_small_fetch():
+    class _SmallResponse(_FakePullLogResponse):
+        def get_raw_size(self):
+            return 100
+
+        def get_loggroup_count(self):
+            return 1
+
+    client = _FakeConsumerClient()
+    client.pull_logs = lambda shard_id, cursor, **kwargs: _SmallResponse(cursor, cursor)
+    processor = _BlockingProcessor()
+    processor.released.set()
+    done = threading.Event()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        worker = ShardConsumerWorker(client, 0, 'consumer', processor, CursorPosition.BEGIN_CURSOR, 'begin',
+                                     executor=executor, on_task_done=lambda future: done.set())
+        worker.consume()
+        assert done.wait(5)
+
+        _consume_until(worker, lambda: worker.next_fetch_time > 0)
+        assert worker.next_fetch_time == worker.last_fetch_time + 0.5
+        assert worker.fetch_data_future is None
+
+
+def test_shard_worker_polls_idle_shard_by_idle_fetch_interval():
+    class _EmptyResponse(_FakePullLogResponse):
+        def get_raw_size(self):
+            return 0
+
+        def get_loggroup_count(self):
+            return 0
+
+    client = _FakeConsumerClient()
+    client.pull_logs = lambda shard_id, cursor, **kwargs: _EmptyResponse(cursor, cursor)
+    processor = _BlockingProcessor()
+    processor.released.set()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        worker = ShardConsumerWorker(client, 0, 'consumer', processor, CursorPosition.BEGIN_CURSOR, 'begin',
+                                     executor=executor, idle_fetch_interval=3)
+        _consume_until(worker, lambda: worker.next_fetch_time > 0)
+        assert worker.next_fetch_time == worker.last_fetch_time + 3
+
+
+def test_checkpoint_aggregator_coalesces_commits_of_shards():
+    client = _FakeConsumerClient()
+    client.update_check_point = lambda shard_id, consumer_name, cursor: client.checkpoints.append((shard_id, cursor))
+    aggregator = CheckpointAggregator(commit_interval=60)
+    processors = [_BlockingProcessor() for _ in range(2)]
+    for processor in processors:
+        processor.released.set()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        workers = [ShardConsumerWorker(client, shard, 'consumer', processors[shard], CursorPosition.BEGIN_CURSOR,
+                                       'begin', executor=executor, checkpoint_aggregator=aggregator)
+                   for shard in range(2)]
+        for worker in workers:
+            _consume_until(worker, lambda: len(processors[worker.shard_id].processed) >= 3)
+        assert client.checkpoints == []
+        assert aggregator.get_pending_count() == 2
+        assert aggregator.coalesced_count >= 4
+
+        aggregator.commit()
+        assert client.checkpoints == []
+        aggregator.commit(force=True)
+        assert sorted(shard for shard, cursor in client.checkpoints) == [0, 1]
+        stats = aggregator.get_stats()
+        assert stats['commit_count'] == 2
+        assert stats['pending_count'] == 0
+        assert stats['max_commit_lag'] > 0
+
+        # the pending checkpoint is committed right away when the shard is released
+        worker = workers[0]
+        _consume_until(worker, lambda: aggregator.get_pending_count() == 1)
+        worker.shut_down()
+        _consume_until(worker, worker.is_shutdown)
+        assert aggregator.get_pending_count() == 0
+        assert client.checkpoints[-1] == (0, worker.checkpoint_tracker.get_check_point())
+        workers[1].shut_down()
+        _consume_until(workers[1], workers[1].is_shutdown)
+
+
+class _FakeTracker(object):
+    def __init__(self, shard_id, flush):
+        self.shard_id = shard_id
+        self.flush_check_point = flush
+        self.lock = threading.RLock()
+
+    def is_released(self):
+        return False
+
+
+def test_checkpoint_aggregator_commits_in_executor():
+    release = threading.Event()
+    committed = []
+
+    def slow_flush(shard_id):
+        def flush():
+            assert release.wait(5)
+            committed.append(shard_id)
+            return True
+        return flush
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        aggregator = CheckpointAggregator(commit_interval=60, executor=executor)
+        for shard in range(3):
+            aggregator.add(_FakeTracker(shard, slow_flush(shard)))
+        # the commits are sent in the executor, the caller isn't blocked by the slow ones
+        aggregator.last_commit_time = 0
+        aggregator.commit()
+        assert committed == [] and aggregator.get_pending_count() == 0
+
+        # a forced commit waits for the ones in flight
+        release.set()
+        aggregator.commit(force=True)
+        assert sorted(committed) == [0, 1, 2]
+        assert aggregator.get_stats()['commit_count'] == 3
+
+
+def test_checkpoint_aggregator_drops_released_shards():
+    client = _FakeConsumerClient()
+    failures = [LogException('InternalServerError', 'error')] * 2
+
+    def update_check_point(shard_id, consumer_name, cursor):
+        if failures:
+            raise failures.pop()
+        client.checkpoints.append(cursor)
+
+    client.update_check_point = update_check_point
+    aggregator = CheckpointAggregator(commit_interval=60)
+    tracker = ConsumerCheckpointTracker(client, 'consumer', 0, aggregator=aggregator)
+    tracker.save_check_point(True, 'c5')
+
+    # the failed commit is retried later
+    aggregator.commit(force=True)
+    assert aggregator.get_pending_count() == 1
+
+    # the shard is released while the endpoint still fails, it's not committed after that
+    try:
+        tracker.flush_pending_check_point()
+    except CheckPointException:
+        pass
+    assert tracker.is_released()
+    aggregator.add(tracker)
+    aggregator.commit(force=True)
+    assert client.checkpoints == []
+    assert aggregator.get_pending_count() == 0
+
+
+def test_fetch_budget_pauses_fetching_of_all_shards():
+    budget = FetchBudget(6 * 1024 * 1024)
+    clients = [_FakeConsumerClient() for _ in range(2)]
+    processors = [_BlockingProcessor() for _ in range(2)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        workers = [ShardConsumerWorker(clients[shard], shard, 'consumer', processors[shard],
+                                       CursorPosition.BEGIN_CURSOR, 'begin', executor=executor, prefetch_depth=3,
+                                       fetch_budget=budget)
+                   for shard in range(2)]
+
+        # 5MB is being processed and another 5MB is fetched, fetching is paused
+        _consume_until(workers[0], budget.is_exhausted)
+        for _ in range(20):
+            for worker in workers:
+                worker.consume()
+            time.sleep(0.01)
+        assert clients[0].pulled == ['c0', 'c1']
+        assert clients[1].pulled == []
+        assert budget.used_bytes == 10 * 1024 * 1024
+        assert budget.get_stats()['stalled_count'] == 1
+
+        for processor in processors:
+            processor.released.set()
+        deadline = time.time() + 10
+        while not clients[1].pulled and time.time() < deadline:
+            for worker in workers:
+                worker.consume()
+            time.sleep(0.01)
+        assert clients[1].pulled
+        for worker in workers:
+            worker.shut_down()
+            _consume_until(worker, worker.is_shutdown)
+
+    stats = budget.get_stats()
+    assert stats['used_bytes'] == 0
+    assert stats['peak_bytes'] >= 10 * 1024 * 1024
+    assert stats['stalled_time'] > 0
+
+
+def test_connection_pool_sized_by_shared_executor():
+    def pool_size(shared_executor):
+        option = LogHubConfig('endpoint', 'ak', 'sk', 'project', 'logstore', 'group', 'consumer',
+                              worker_pool_size=40, shared_executor=shared_executor)
+        return ConsumerWorker._get_connection_pool_options(option)['pool_maxsize']
+
+    with ThreadPoolExecutor(max_workers=30) as executor:
+        assert pool_size(executor) == 31
+    # the size of other executors is unknown, worker_pool_size is used
+    assert pool_size(object()) == 41
+    assert pool_size(None) == 41
@@ -0,0 +1,95 @@
+# encoding: utf-8
+from __future__ import absolute_import
+
+import pytest
+
+from aliyun.log import LogException
+from aliyun.log.job_checkpoint import ShardCheckpointStore
+from aliyun.log.logclient_operator import _coalesce_log_groups, copy_data, copy_worker, transform_data
+from aliyun.log.proto import LogGroupListRaw, LogGroupRaw
+from tests._helpers.fakes import FakePullClient, FakeSourceClient
+
+
+def test_copy_worker_resumes_from_checkpoint_store(tmp_path):
+    class _FakeTargetClient(object):
+        def __init__(self):
+            self.values = []
+
+        def put_log_raw(self, project, logstore, log_group, compress=None):
+            self.values.append(log_group.Logs[0].Contents[0].Value)
+
+    checkpoint_dir = str(tmp_path / 'checkpoints')
+    from_client, to_client = FakePullClient(fail_at='3'), _FakeTargetClient()
+    with pytest.raises(IOError):
+        copy_worker(from_client, 'p', 'l', 1, 'begin', 'end', to_client, 'p2', 'l2', checkpoint_dir=checkpoint_dir)
+    assert ShardCheckpointStore(checkpoint_dir).load(1) == {'next_cursor': '3', 'end_cursor': '6',
+                                                            'completed': False, 'count': 3}
+
+    assert copy_worker(from_client, 'p', 'l', 1, 'begin', 'end', to_client, 'p2', 'l2',
+                       checkpoint_dir=checkpoint_dir) == (1, 6)
+    assert to_client.values == [u'值{0}'.format(i) for i in range(6)]
+    assert ShardCheckpointStore(checkpoint_dir).load(1)['completed']
+
+
+def _make_log_groups():
+    log_group_list = LogGroupListRaw()
+    for topic, tag in [('a', 'x'), ('a', 'x'), ('a', 'y'), ('b', 'y'), ('b', 'y'), ('b', 'y')]:
+        log_group = log_group_list.LogGroups.add()
+        log_group.Topic = topic
+        log_tag = log_group.LogTags.add()
+        log_tag.Key, log_tag.Value = 'k', tag
+        log_group.Logs.add().Time = 1700000000
+    return log_group_list.LogGroups
+
+
+def test_coalesce_log_groups_by_topic_source_and_tags():
+    merged = list(_coalesce_log_groups(_make_log_groups(), max_count=2))
+    assert [(g.Topic, g.LogTags[0].Value, len(g.Logs)) for g in merged] == \
+        [('a', 'x', 2), ('a', 'y', 1), ('b', 'y', 2), ('b', 'y', 1)]
+
+    merged = list(_coalesce_log_groups(_make_log_groups(), new_topic='c'))
+    assert [(g.Topic, g.LogTags[0].Value, len(g.Logs)) for g in merged] == [('c', 'x', 2), ('c', 'y', 4)]
+
+
+def test_copy_worker_passthrough_raw_bytes(tmp_path):
+    class _FakeRawTargetClient(object):
+        def __init__(self):
+            self.log_groups = []
+
+        def put_log_raw(self, project, logstore, log_group, compress=None):
+            assert isinstance(log_group, bytes)
+            self.log_groups.append(LogGroupRaw.FromString(log_group))
+
+    to_client = _FakeRawTargetClient()
+    assert copy_worker(FakePullClient(), 'p', 'l', 1, 'begin', 'end', to_client, 'p2', 'l2',
+                       new_topic='t', passthrough=True, checkpoint_dir=str(tmp_path)) == (1, 6)
+    assert [(g.Topic, g.Logs[0].Contents[0].Value) for g in to_client.log_groups] == \
+        [('t', u'值{0}'.format(i).encode('utf8')) for i in range(6)]
+    assert ShardCheckpointStore(str(tmp_path)).load(1)['completed']
+
+
+def test_copy_data_in_threads_sharing_clients():
+    class _FakeRawTargetClient(object):
+        timeout = 60
+
+        def __init__(self):
+            self.counts = []
+
+        def put_log_raw(self, project, logstore, log_group, compress=None):
+            self.counts.append(len(LogGroupRaw.FromString(log_group).Logs))
+
+    # the fakes are local classes, they'd fail to be pickled into processes
+    to_client = _FakeRawTargetClient()
+    res = copy_data(FakeSourceClient(), 'p', 'l', 'begin', to_client=to_client, passthrough=True, executor='thread')
+    assert res.get_body() == {'total_count': 12, 'shards': {'0': 6, '1': 6}}
+    assert to_client.counts == [1] * 12
+
+    with pytest.raises(LogException):
+        copy_data(FakeSourceClient(), 'p', 'l', 'begin', to_client=to_client, executor='fiber')
+
+
+def test_transform_data_hybrid_rejects_module_config():
+    # a module can't be pickled into the transform processes
+    with pytest.raises(LogException) as excinfo:
+        transform_data(FakeSourceClient(), 'p', 'l', 'begin', config=pytest, executor='hybrid')
+    assert excinfo.value.get_error_code() == 'InvalidParameter'
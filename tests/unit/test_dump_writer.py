@@ -0,0 +1,66 @@
+# encoding: utf-8
+from __future__ import absolute_import
+
+import gzip
+import json
+import os
+
+import pytest
+
+from aliyun.log.dump_writer import LogDumpWriter
+from aliyun.log.logclient_operator import _plan_shard_slices, dump_worker, pull_log_dump
+from tests._helpers.fakes import FakePullClient, FakeSourceClient
+
+
+@pytest.mark.parametrize('compress_format', [None, 'gzip'])
+def test_dump_writer_resumes_from_checkpoint(tmp_path, compress_format):
+    file_path = str(tmp_path / 'dump.data')
+    with LogDumpWriter(file_path, compress_format=compress_format, buffer_size=10) as writer:
+        writer.write_logs([{'k': 'v1'}, {'k': 'v2'}])
+        writer.checkpoint(next_cursor='c1')
+        writer.write_logs([{'k': 'lost'}])
+
+    with LogDumpWriter(file_path, compress_format=compress_format, resume=True) as writer:
+        assert writer.manifest['next_cursor'] == 'c1'
+        assert writer.count == 2
+        writer.write_logs([{'k': 'v3'}])
+        writer.checkpoint(next_cursor='c2')
+
+    opener = gzip.open if compress_format == 'gzip' else open
+    with opener(file_path, 'rb') as f:
+        assert [json.loads(line)['k'] for line in f.read().splitlines()] == ['v1', 'v2', 'v3']
+    assert LogDumpWriter.read_manifest(file_path)['count'] == 3
+
+
+def test_dump_worker_resumes_after_failure(tmp_path):
+    file_path = str(tmp_path / 'dump_0.data')
+    client = FakePullClient(fail_at='4')
+    with pytest.raises(IOError):
+        dump_worker(client, 'p', 'l', 'begin', 'end', 0, file_path, no_escape=True, checkpoint_interval=-1)
+    assert LogDumpWriter.read_manifest(file_path)['next_cursor'] == '4'
+
+    assert dump_worker(client, 'p', 'l', 'begin', 'end', 0, file_path, no_escape=True, resume=True) == (file_path, 6)
+    assert client.pulled == ['0', '1', '2', '3', '4', '5']
+    with open(file_path, encoding='utf8') as f:
+        assert [json.loads(line)[u'消息'] for line in f] == [u'值{0}'.format(i) for i in range(6)]
+
+    # a completed dump is skipped
+    assert dump_worker(client, 'p', 'l', 'begin', 'end', 0, file_path, resume=True) == (file_path, 6)
+    assert len(client.pulled) == 6
+
+
+def test_pull_log_dump_slices_in_shard_order(tmp_path):
+    client = FakeSourceClient()
+    assert _plan_shard_slices(client, 'p', 'l', ['0', '1'], 'begin', 1006, 3) == [
+        ('0', 0, 'begin', 1002), ('1', 0, 'begin', 1002), ('0', 1, 1002, 1004), ('1', 1, 1002, 1004),
+        ('0', 2, 1004, 1006), ('1', 2, 1004, 1006)]
+
+    file_path = str(tmp_path / 'dump_{0}.data')
+    res = pull_log_dump(client, 'p', 'l', 'begin', 1006, file_path, executor='thread', slice_count=3)
+    assert res.get_body() == {'total_count': 12, 'files': {file_path.format(0): 6, file_path.format(1): 6}}
+    assert sorted(client.pulled) == sorted([str(i) for i in range(6)] * 2)
+
+    for shard in range(2):
+        with open(file_path.format(shard), 'rb') as f:
+            assert [json.loads(line.decode('utf8'))[u'消息'] for line in f] == [u'值{0}'.format(i) for i in range(6)]
+    assert sorted(os.listdir(str(tmp_path))) == ['dump_0.data', 'dump_1.data']
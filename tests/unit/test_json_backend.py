@@ -0,0 +1,46 @@
+# encoding: utf-8
+from __future__ import absolute_import
+
+import re
+
+import pytest
+import responses
+
+from aliyun.log import LogException, get_json_backend, set_json_backend
+from aliyun.log.json_backend import loads
+
+from tests._helpers.fakes import make_client, mock_sls_response
+
+
+@pytest.fixture
+def json_backend():
+    yield
+    set_json_backend('json')
+
+
+def test_json_backend_loads(json_backend):
+    assert get_json_backend() == 'json'
+    assert loads(b'{"a": [1, "\xe4\xbd\xa0\xff"]}') == {'a': [1, u'你']}
+
+    pytest.importorskip('orjson')
+    assert set_json_backend('auto') == 'orjson'
+    assert loads(b'{"a": [1, "\xe4\xbd\xa0"]}') == {'a': [1, u'你']}
+    assert loads(b'{"a": [1, "\xe4\xbd\xa0\xff"]}') == {'a': [1, u'你']}
+    assert loads(u'{"a": 1.5}') == {'a': 1.5}
+
+
+def test_json_backend_invalid(json_backend):
+    with pytest.raises(LogException) as excinfo:
+        set_json_backend('simplejson')
+    assert excinfo.value.get_error_code() == 'InvalidParameter'
+    assert get_json_backend() == 'json'
+
+
+@responses.activate
+def test_logclient_uses_json_backend(json_backend):
+    pytest.importorskip('orjson')
+    set_json_backend('orjson')
+    client = make_client()
+    mock_sls_response(responses, "GET", re.compile(r"https?://mock-proj\.cn-mock\.example\.com.*?/shards/0"),
+                      body={"cursor": "MTQ0NzI5OTYwNjg5NjYzMjM1Ng=="})
+    assert client.get_cursor("mock-proj", "store-1", 0, "begin").get_cursor() == "MTQ0NzI5OTYwNjg5NjYzMjM1Ng=="
@@ -111,6 +111,40 @@ def test_put_logs_signs_request():
     assert captured["body"]
 
 
+@responses.activate
+def test_put_logs_hashes_body_once_across_retries(monkeypatch):
+    """The Content-MD5 is computed once and reused by the retries, set_sign_payload(False) skips it."""
+    monkeypatch.setattr("aliyun.log.logclient.time.sleep", lambda delay: None)
+    client = make_client(endpoint="cn-mock.example.com", project="mock-proj")
+    hashes = []
+    get_content_hash = client._auth.get_content_hash
+    monkeypatch.setattr(client._auth, "get_content_hash", lambda body: hashes.append(body) or get_content_hash(body))
+
+    md5s = []
+
+    def request_callback(request):
+        md5s.append(request.headers.get("Content-MD5"))
+        if len(md5s) == 1:
+            return (500, {"x-log-requestid": "mock-request-id"}, error_response("InternalServerError", "error"))
+        return (200, {"x-log-requestid": "mock-request-id"}, "")
+
+    responses.add_callback(
+        responses.POST,
+        re.compile(r"https?://mock-proj\.cn-mock\.example\.com.*?/logstores/store-1/shards/lb"),
+        callback=request_callback,
+    )
+
+    item = LogItem(timestamp=1700000000, contents=[("k", "v")])
+    client.put_logs(PutLogsRequest("mock-proj", "store-1", "topic", "src", [item]))
+    assert len(hashes) == 1
+    assert len(md5s) == 2 and md5s[0] and md5s[0] == md5s[1]
+
+    client.set_sign_payload(False)
+    client.put_logs(PutLogsRequest("mock-proj", "store-1", "topic", "src", [item]))
+    assert len(hashes) == 1
+    assert md5s[2] is None
+
+
 @responses.activate
 def test_error_response_raises_logexception():
     """A 400 with the SLS error envelope is converted to LogException with the right errorCode."""
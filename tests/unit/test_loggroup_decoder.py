@@ -0,0 +1,83 @@
+# encoding: utf-8
+from __future__ import absolute_import
+
+from aliyun.log import PullLogResponse
+from aliyun.log.loggroup_decoder import LazyLogGroupList
+from aliyun.log.proto import LogGroupListRaw, LogGroupRaw
+
+
+def _make_log_group_list():
+    log_group_list = LogGroupListRaw()
+    for i in range(2):
+        log_group = log_group_list.LogGroups.add()
+        log_group.Topic = 'topic-{0}'.format(i)
+        log_group.Source = '10.0.0.{0}'.format(i)
+        tag = log_group.LogTags.add()
+        tag.Key = 'host'
+        tag.Value = 'host-{0}'.format(i)
+        for j in range(3):
+            log = log_group.Logs.add()
+            log.Time = 1700000000 + j
+            log.Time_ns = j
+            for key, value in (('level', 'ERROR' if j == 1 else 'INFO'), (u'消息', u'值{0}'.format(j)),
+                               ('big', 'x' * 300), ('bin', b'\xff\xfe')):
+                content = log.Contents.add()
+                content.Key = key
+                content.Value = value.encode('utf8') if not isinstance(value, bytes) else value
+    return log_group_list.SerializeToString()
+
+
+def test_lazy_log_group_list_access():
+    groups = LazyLogGroupList(_make_log_group_list())
+    assert len(groups) == 2
+    assert groups[1].topic == 'topic-1'
+    assert groups[1].source == '10.0.0.1'
+    assert groups[1].tags == {'host': 'host-1'}
+
+    logs = list(groups.iter_logs())
+    assert len(logs) == 6
+    assert logs[1].time == 1700000001
+    assert logs[1].time_ns == 1
+    assert logs[1]['level'] == 'ERROR'
+    assert logs[1].get(u'消息') == u'值1'
+    assert logs[1].get('big') == 'x' * 300
+    assert logs[1].get('bin') == b'\xff\xfe'
+    assert logs[1].get('missing') is None
+    assert 'missing' not in logs[1]
+    assert logs[1].keys() == ['level', u'消息', 'big', 'bin']
+
+
+def test_pull_log_response_iter_logs():
+    resp = PullLogResponse(_make_log_group_list(), {'x-log-count': '2', 'x-log-bodyrawsize': '0',
+                                                     'x-log-cursor': 'cursor'})
+    errors = [log.to_dict() for log in resp.iter_logs() if log.get('level') == 'ERROR']
+    assert len(errors) == 2
+
+    assert errors[1] == {'__time__': 1700000001, '__time_ns_part__': 1, '__topic__': 'topic-1',
+                         '__source__': '10.0.0.1', '__tag__:host': 'host-1', 'level': 'ERROR',
+                         u'消息': u'值1', 'big': 'x' * 300, 'bin': b'\xff\xfe'}
+
+    flatten = PullLogResponse.loggroups_to_flattern_list(resp.lazy_loggroup_list)
+    assert len(flatten) == resp.get_log_count() == 6
+    assert flatten[4]['__topic__'] == 'topic-1'
+    assert flatten[4][u'消息'] == u'值1'
+
+
+def test_lazy_log_group_raw_bytes():
+    data = _make_log_group_list()
+    groups = LazyLogGroupList(data)
+    assert groups[0].get_raw_bytes() in data and groups[1].get_raw_bytes() in data
+
+    log_group = LogGroupRaw()
+    log_group.ParseFromString(groups[1].get_raw_bytes(topic=u'新主题'))
+    assert log_group.Topic == u'新主题'
+    assert log_group.Source == '10.0.0.1'
+    assert [(tag.Key, tag.Value) for tag in log_group.LogTags] == [('host', 'host-1')]
+    assert [log.Time for log in log_group.Logs] == [1700000000, 1700000001, 1700000002]
+    assert log_group.Logs[1].Contents[1].Value == u'值1'.encode('utf8')
+
+    raw = bytearray()
+    for raw_log in groups[0].get_raw_logs() + groups[1].get_raw_logs():
+        raw += raw_log
+    log_group.ParseFromString(bytes(raw) + groups[0].get_raw_header(source='10.0.0.9'))
+    assert (log_group.Topic, log_group.Source, len(log_group.Logs)) == ('topic-0', '10.0.0.9', 6)
@@ -0,0 +1,52 @@
+# encoding: utf-8
+from __future__ import absolute_import
+
+import pytest
+
+from aliyun.log import LogException, LogItem
+from aliyun.log.loggroup_encoder import LogGroupEncoder, encode_log_group
+from aliyun.log.proto import LogGroupRaw
+
+
+def _serialize_with_protobuf(log_items, topic, source, logtags):
+    log_group = LogGroupRaw()
+    log_group.Topic = topic
+    log_group.Source = source
+    for item in log_items:
+        log = log_group.Logs.add()
+        log.Time = item.get_time()
+        log.Time_ns = item.get_time_nano_part()
+        for key, value in item.get_contents():
+            content = log.Contents.add()
+            content.Key = key
+            content.Value = value.encode('utf-8') if not isinstance(value, bytes) else value
+    for key, value in logtags:
+        tag = log_group.LogTags.add()
+        tag.Key = key
+        tag.Value = value
+    return log_group.SerializeToString()
+
+
+def test_encode_log_group_matches_protobuf():
+    log_items = [
+        LogItem(timestamp=1700000000, time_nano_part=123456789, contents=[('k', 'v'), (u'中文', u'值')]),
+        LogItem(timestamp=1700000001, time_nano_part=0, contents=[('long', 'x' * 200), ('huge', 'y' * 20000)]),
+        LogItem(timestamp=1700000002, time_nano_part=1, contents=[('bin', b'\x00\xff'), ('k' * 130, '')]),
+        LogItem(timestamp=1700000003, time_nano_part=2, contents=[]),
+    ]
+    logtags = [('__tag__', 'value'), ('t' * 300, 'v')]
+
+    expected = _serialize_with_protobuf(log_items, 'topic', '127.0.0.1', logtags)
+    assert encode_log_group(log_items, 'topic', '127.0.0.1', logtags) == expected
+
+    parsed = LogGroupRaw()
+    parsed.ParseFromString(expected)
+    assert parsed.Logs[0].Contents[1].Key == u'中文'
+
+
+def test_log_group_encoder_size_limit():
+    encoder = LogGroupEncoder(max_size=1024)
+    encoder.add_log_item(LogItem(timestamp=1700000000, contents=[('k', 'v' * 500)]))
+    with pytest.raises(LogException) as ex:
+        encoder.add_log_item(LogItem(timestamp=1700000000, contents=[('k', 'v' * 600)]))
+    assert ex.value.get_error_code() == 'InvalidLogSize'
@@ -0,0 +1,143 @@
+# encoding: utf-8
+from __future__ import absolute_import
+
+import threading
+
+import pytest
+
+from aliyun.log import LogException, LogItem, RetryPolicy
+from aliyun.log.loggroup_encoder import MAX_LOG_GROUP_SIZE, LogGroupEncoder
+from aliyun.log.producer import Producer, ProducerConfig
+from aliyun.log.producer.batch import estimate_log_size
+
+
+class _FakeResponse(object):
+    def __init__(self, request_id):
+        self.request_id = request_id
+
+    def get_request_id(self):
+        return self.request_id
+
+
+class _FakeClient(object):
+    def __init__(self, errors=None):
+        self.requests = []
+        self.errors = list(errors or [])
+        self.lock = threading.Lock()
+
+    def put_logs(self, request):
+        with self.lock:
+            if self.errors:
+                raise self.errors.pop(0)
+            self.requests.append(request)
+            return _FakeResponse('req-{0}'.format(len(self.requests)))
+
+
+def _item(i):
+    return LogItem(timestamp=1700000000, contents=[('index', str(i))])
+
+
+def test_producer_batches_by_key_and_count():
+    client = _FakeClient()
+    config = ProducerConfig(max_batch_count=10, linger_ms=60 * 1000)
+    results = []
+    with Producer(client, config) as producer:
+        futures = [producer.send('proj', 'store', _item(i), topic='t', callback=results.append) for i in range(25)]
+        futures.append(producer.send('proj', 'store', _item(100), topic='other'))
+
+    assert [len(r.get_log_items()) for r in client.requests if r.get_topic() == 't'] == [10, 10, 5]
+    assert [len(r.get_log_items()) for r in client.requests if r.get_topic() == 'other'] == [1]
+    assert all(f.result().is_successful() for f in futures)
+    assert len(results) == 25
+    assert producer.get_buffered_size() == 0
+
+
+def test_producer_retries_retryable_errors():
+    client = _FakeClient(errors=[LogException('WriteQuotaExceed', 'quota exceed', 'r1', 403),
+                                 LogException('InternalServerError', 'error', 'r2', 500)])
+    config = ProducerConfig(base_retry_backoff_ms=1, linger_ms=100)
+    producer = Producer(client, config)
+    future = producer.send('proj', 'store', [_item(1), _item(2)], hash_key='00000000000000000000000000000000')
+    result = future.result(timeout=10)
+    producer.close()
+
+    assert result.is_successful()
+    assert len(result.get_attempts()) == 3
+    assert client.requests[0].get_hash_key() == '00000000000000000000000000000000'
+
+
+class _FakeRetryingClient(_FakeClient):
+    def __init__(self, errors=None, retry_policy=None):
+        super(_FakeRetryingClient, self).__init__(errors)
+        self.retry_policy = retry_policy
+
+    def get_retry_policy(self):
+        return self.retry_policy
+
+
+@pytest.mark.parametrize('retry_policy, attempts', [
+    (RetryPolicy(), [False]),
+    (RetryPolicy(max_attempts=1), [False, True]),
+])
+def test_producer_leaves_server_errors_to_client_retries(retry_policy, attempts):
+    client = _FakeRetryingClient([LogException('InternalServerError', 'error', 'r1', 500)], retry_policy)
+    producer = Producer(client, ProducerConfig(base_retry_backoff_ms=1, linger_ms=100))
+    result = producer.send('proj', 'store', _item(1)).result(timeout=10)
+    producer.close()
+    assert [attempt.success for attempt in result.get_attempts()] == attempts
+
+
+@pytest.mark.parametrize('retry_policy, attempts', [
+    (RetryPolicy(), [False, True]),
+    (RetryPolicy(retry_quota_errors=True), [False]),
+])
+def test_producer_retries_quota_errors_unless_client_does(retry_policy, attempts):
+    client = _FakeRetryingClient([LogException('ShardWriteQuotaExceed', 'quota exceed', 'r1', 403)], retry_policy)
+    producer = Producer(client, ProducerConfig(base_retry_backoff_ms=1, linger_ms=100))
+    result = producer.send('proj', 'store', _item(1)).result(timeout=10)
+    producer.close()
+    assert [attempt.success for attempt in result.get_attempts()] == attempts
+
+
+def test_producer_gives_up_non_retryable_errors():
+    client = _FakeClient(errors=[LogException('Unauthorized', 'denied', 'r1', 401)])
+    producer = Producer(client, ProducerConfig(linger_ms=100))
+    result = producer.send('proj', 'store', _item(1)).result(timeout=10)
+    producer.close()
+
+    assert not result.is_successful()
+    assert result.get_error_code() == 'Unauthorized'
+    assert len(result.get_attempts()) == 1
+    assert not client.requests
+
+
+def test_producer_rejects_oversized_send():
+    client = _FakeClient()
+    with Producer(client, ProducerConfig(linger_ms=60 * 1000)) as producer:
+        big = LogItem(timestamp=1700000000, contents=[('k', 'v' * (11 * 1024 * 1024))])
+        with pytest.raises(LogException) as excinfo:
+            producer.send('proj', 'store', big)
+        assert excinfo.value.get_error_code() == 'InvalidLogSize'
+        with pytest.raises(LogException) as excinfo:
+            producer.send('proj', 'store', [_item(i) for i in range(40961)])
+        assert excinfo.value.get_error_code() == 'InvalidLogSize'
+        assert producer.get_buffered_size() == 0
+    assert client.requests == []
+
+
+def test_estimate_log_size_counts_utf8_bytes():
+    for item in [_item(1), LogItem(timestamp=1700000000, contents=[(u'键', u'值' * 1000)], time_nano_part=1),
+                 LogItem(timestamp=1700000000, contents=[('k', b'v' * 200), (u'中文', u'值' * 100000)])]:
+        encoder = LogGroupEncoder()
+        encoder.add_log_item(item)
+        assert estimate_log_size(item) == encoder.size()
+
+    # fewer characters than the limit, but more bytes once encoded
+    client = _FakeClient()
+    with Producer(client, ProducerConfig(linger_ms=60 * 1000)) as producer:
+        cjk = LogItem(timestamp=1700000000, contents=[('k', u'值' * (MAX_LOG_GROUP_SIZE // 2))])
+        with pytest.raises(LogException) as excinfo:
+            producer.send('proj', 'store', cjk)
+        assert excinfo.value.get_error_code() == 'InvalidLogSize'
+        assert producer.get_buffered_size() == 0
+    assert client.requests == []
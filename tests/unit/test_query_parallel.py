@@ -0,0 +1,124 @@
+# encoding: utf-8
+from __future__ import absolute_import
+
+import json
+import threading
+import time
+
+import pytest
+
+from aliyun.log import GetLogsResponse, LogClient, LogException
+from aliyun.log.gethistogramsresponse import GetHistogramsResponse
+from aliyun.log.logclient_operator import plan_query_ranges, split_query_range
+
+
+class _FakeQueryClient(object):
+    """ one log per second in [1000, 1100), histograms are buckets of 10 seconds """
+
+    def __init__(self):
+        self.ranges = []
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def get_histograms(self, request):
+        data = [{'from': t, 'to': t + 10, 'count': 0 if t < 1050 else 10, 'progress': 'Complete'}
+                for t in range(request.get_from(), request.get_to(), 10)]
+        return GetHistogramsResponse(data, {'x-log-progress': 'Complete'})
+
+    def get_log(self, project, logstore, from_time, to_time, topic=None, query=None, reverse=False, size=100,
+                **kwargs):
+        with self.lock:
+            self.ranges.append((from_time, to_time))
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.02)
+        times = range(max(from_time, 1050), to_time)
+        if reverse:
+            times = reversed(times)
+        data = [{'__time__': str(t), '__source__': '', 'k': 'v'} for t in times]
+        with self.lock:
+            self.running -= 1
+        return GetLogsResponse({'meta': {'count': len(data), 'progress': 'Complete'}, 'data': data}, {})
+
+
+def test_split_query_range_by_histograms():
+    client = _FakeQueryClient()
+    assert split_query_range(client, 'p', 'l', 1000, 1100, range_count=5) == \
+        [(1000, 1060), (1060, 1070), (1070, 1080), (1080, 1090), (1090, 1100)]
+    assert split_query_range(client, 'p', 'l', 1000, 1100, range_count=4, use_histograms=False) == \
+        [(1000, 1025), (1025, 1050), (1050, 1075), (1075, 1100)]
+
+
+@pytest.mark.parametrize('reverse', [False, True])
+def test_get_log_parallel_merges_in_time_order(reverse):
+    client = LogClient('cn-hangzhou.log.aliyuncs.com', 'ak', 'sk')
+    fake = _FakeQueryClient()
+    client.get_histograms = fake.get_histograms
+    client.get_log = fake.get_log
+
+    response = client.get_log_parallel('p', 'l', 1000, 1100, query='*', reverse=reverse, parallel=3, range_count=5)
+    times = [int(log.get_time()) for log in response.get_logs()]
+    assert times == sorted(range(1050, 1100), reverse=reverse)
+    assert response.get_count() == 50
+    assert sorted(fake.ranges) == [(1000, 1060), (1060, 1070), (1070, 1080), (1080, 1090), (1090, 1100)]
+    assert 1 < fake.max_running <= 3
+
+    with pytest.raises(LogException):
+        client.get_log_parallel('p', 'l', 1000, 1100, query='* | select count(1)')
+
+
+class _SkewedQueryClient(_FakeQueryClient):
+    """ 1 log per second, 100 logs per second in [1050, 1055), histograms split a range into 10 buckets at most """
+
+    @staticmethod
+    def _count(second):
+        return 100 if 1050 <= second < 1055 else 1
+
+    def get_histograms(self, request):
+        start, end = request.get_from(), request.get_to()
+        step = max((end - start) // 10, 1)
+        data = [{'from': t, 'to': min(t + step, end), 'count': sum(self._count(s) for s in range(t, min(t + step, end))),
+                 'progress': 'Complete'} for t in range(start, end, step)]
+        return GetHistogramsResponse(data, {'x-log-progress': 'Complete'})
+
+    def get_log(self, project, logstore, from_time, to_time, topic=None, query=None, reverse=False, size=100,
+                **kwargs):
+        self.ranges.append((from_time, to_time))
+        times = [t for t in range(from_time, to_time) for _i in range(self._count(t))]
+        if reverse:
+            times.reverse()
+        data = [{'__time__': str(t), '__source__': '', u'消息': u'值'} for t in times]
+        return GetLogsResponse({'meta': {'count': len(data), 'progress': 'Complete'}, 'data': data}, {})
+
+
+def test_plan_query_ranges_subdivides_dense_buckets():
+    ranges = plan_query_ranges(_SkewedQueryClient(), 'p', 'l', 1000, 1200, max_logs_per_range=150)
+    assert ranges[0][0] == 1000 and ranges[-1][1] == 1200
+    assert all(ranges[i][1] == ranges[i + 1][0] for i in range(len(ranges) - 1))
+    assert all(count <= 150 for _f, _t, count in ranges)
+    assert sum(count for _f, _t, count in ranges) == 695
+    # the dense seconds are split into their own ranges, while sparse ones are merged
+    assert ranges == [(1000, 1051, 150), (1051, 1052, 100), (1052, 1053, 100), (1053, 1054, 100),
+                      (1054, 1100, 145), (1100, 1200, 100)]
+
+
+def test_query_log_dump(tmp_path):
+    client = LogClient('cn-hangzhou.log.aliyuncs.com', 'ak', 'sk')
+    fake = _SkewedQueryClient()
+    client.get_histograms = fake.get_histograms
+    client.get_log = fake.get_log
+    progress = []
+    file_path = str(tmp_path / 'dump.data')
+
+    response = client.query_log_dump('p', 'l', 1000, 1200, file_path, query='*', reverse=True,
+                                     max_logs_per_range=150, parallel=4,
+                                     progress=lambda *args: progress.append(args), no_escape=True)
+    assert response.body['total_count'] == 695
+    assert response.body['files'] == {file_path: 695}
+    assert progress[-1] == (695, 695, response.body['range_count'], response.body['range_count'])
+
+    with open(file_path, encoding='utf8') as f:
+        logs = [json.loads(line) for line in f]
+    assert [int(log['__time__']) for log in logs] == sorted((int(log['__time__']) for log in logs), reverse=True)
+    assert logs[0][u'消息'] == u'值'
@@ -0,0 +1,78 @@
+# encoding: utf-8
+from __future__ import absolute_import
+
+import pickle
+import re
+
+import pytest
+import responses
+
+from aliyun.log import LogException, LogItem, PutLogsRequest, RetryPolicy
+
+from tests._helpers.fakes import error_response, make_client, mock_sls_response
+
+
+def test_retry_policy_backoff():
+    policy = RetryPolicy(base_delay=1, max_delay=4, retry_quota_errors=True, quota_base_delay=2, quota_max_delay=60)
+    assert policy.get_delay(LogException('ParameterInvalid', 'bad', resp_status=400), 0) is None
+    assert 0.5 <= policy.get_delay(LogException('InternalServerError', 'error', resp_status=500), 0) <= 1
+    assert 2 <= policy.get_delay(LogException('InternalServerError', 'error', resp_status=500), 5) <= 4
+    assert 8 <= policy.get_delay(LogException('ShardWriteQuotaExceed', 'quota', resp_status=403), 3) <= 16
+    assert policy.get_delay(LogException('RequestTimeout', 'timeout', resp_status=500,
+                                         resp_header={'Retry-After': '3'}), 0) == 3
+    assert policy.get_delay(LogException('LogRequestError', 'reset'), 0, retryable=True) is not None
+
+    stats = policy.get_stats()
+    assert (stats['retry_count'], stats['quota_retry_count'], stats['retry_budget_tokens']) == (5, 1, None)
+
+    policy = RetryPolicy()
+    assert policy.get_delay(LogException('ShardWriteQuotaExceed', 'quota', resp_status=403), 0) is None
+
+
+def test_retry_policy_budget():
+    policy = pickle.loads(pickle.dumps(RetryPolicy(retry_budget=2, retry_budget_ratio=0.5)))
+    error = LogException('InternalServerError', 'error', resp_status=500)
+    assert policy.get_delay(error, 0) is not None
+    assert policy.get_delay(error, 0) is not None
+    assert policy.get_delay(error, 0) is None
+    policy.on_success()
+    policy.on_success()
+    assert policy.get_delay(error, 0) is not None
+    assert policy.get_stats()['budget_exhausted_count'] == 1
+
+
+@responses.activate
+def test_logclient_retries_quota_errors(monkeypatch):
+    delays = []
+    monkeypatch.setattr('aliyun.log.logclient.time.sleep', delays.append)
+    client = make_client()
+    client.set_retry_policy(RetryPolicy(retry_quota_errors=True))
+    url = re.compile(r"https?://mock-proj\.cn-mock\.example\.com.*?/logstores/store-1/shards/lb")
+    mock_sls_response(responses, "POST", url, status=403, body=error_response("ShardWriteQuotaExceed", "quota"))
+    mock_sls_response(responses, "POST", url, status=200)
+
+    client.put_logs(PutLogsRequest("mock-proj", "store-1", "", "", [LogItem(1700000000, [("k", "v")])]))
+    assert len(delays) == 1 and 0.5 <= delays[0] <= 1
+    assert client.get_retry_stats()['quota_retry_count'] == 1
+
+    client.set_retry_policy(RetryPolicy())
+    mock_sls_response(responses, "POST", url, status=403, body=error_response("ShardWriteQuotaExceed", "quota"))
+    with pytest.raises(LogException):
+        client.put_logs(PutLogsRequest("mock-proj", "store-1", "", "", [LogItem(1700000000, [("k", "v")])]))
+
+
+@responses.activate
+def test_logclient_last_attempt_does_not_sleep(monkeypatch):
+    delays = []
+    monkeypatch.setattr('aliyun.log.logclient.time.sleep', delays.append)
+    client = make_client()
+    client.set_retry_policy(RetryPolicy(max_attempts=3, retry_budget=10))
+    url = re.compile(r"https?://mock-proj\.cn-mock\.example\.com.*?/logstores/store-1/shards/lb")
+    mock_sls_response(responses, "POST", url, status=500, body=error_response("InternalServerError", "error"))
+
+    with pytest.raises(LogException):
+        client.put_logs(PutLogsRequest("mock-proj", "store-1", "", "", [LogItem(1700000000, [("k", "v")])]))
+    assert len(responses.calls) == 3
+    assert len(delays) == 2
+    stats = client.get_retry_stats()
+    assert (stats['retry_count'], stats['retry_budget_tokens']) == (2, 8)